@@ -0,0 +1,193 @@
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QUrl
+from PySide6.QtGui import QDesktopServices
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTreeView, QHeaderView
+
+from src.doc_hub.core.containers import container_path
+from src.doc_hub.core.database import get_read_session
+from src.doc_hub.core.duplicate_index import DuplicateIndex
+
+PAGE_SIZE = 200
+COLUMNS = ["File", "Copies", "Size", "Wasted"]
+
+
+def _format_size(size_bytes) -> str:
+    size_bytes = size_bytes or 0
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    elif size_bytes < 1024 ** 2:
+        return f"{size_bytes / 1024:.1f} KB"
+    elif size_bytes < 1024 ** 3:
+        return f"{size_bytes / 1024 ** 2:.1f} MB"
+    return f"{size_bytes / 1024 ** 3:.1f} GB"
+
+
+class DuplicateGroupModel(QAbstractItemModel):
+    """
+    Two-level model over ``duplicate_group``. Groups are fetched a page at a
+    time as the view scrolls and a group's files only when it is expanded.
+    Group rows have internal id 0; file rows carry their group's row + 1.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._groups = []
+        self._files = {}
+        self.total_groups = 0
+        self.total_files = 0
+        self.wasted_bytes = 0
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self._groups = []
+        self._files = {}
+        session = get_read_session()
+        try:
+            self.total_groups, self.total_files, self.wasted_bytes = DuplicateIndex.summary(session)
+        finally:
+            session.close()
+        self.endResetModel()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._groups)
+        if parent.internalId() == 0 and parent.column() == 0:
+            return len(self._files.get(parent.row(), []))
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._groups) or self.total_groups > 0
+        return parent.internalId() == 0 and parent.column() == 0
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return len(self._groups) < self.total_groups
+        return parent.internalId() == 0 and parent.row() not in self._files
+
+    def fetchMore(self, parent):
+        session = get_read_session()
+        try:
+            if not parent.isValid():
+                page = [
+                    (g.content_hash, g.file_count, g.file_size, g.wasted_bytes)
+                    for g in DuplicateIndex.groups(session, len(self._groups), PAGE_SIZE)
+                ]
+                if not page:
+                    self.total_groups = len(self._groups)
+                    return
+                self.beginInsertRows(QModelIndex(), len(self._groups), len(self._groups) + len(page) - 1)
+                self._groups.extend(page)
+                self.endInsertRows()
+            else:
+                row = parent.row()
+                files = [
+                    (f.file_path, f.file_size, f.date_modified)
+                    for f in DuplicateIndex.files(session, self._groups[row][0])
+                ]
+                if not files:
+                    self._files[row] = []
+                    return
+                self.beginInsertRows(parent, 0, len(files) - 1)
+                self._files[row] = files
+                self.endInsertRows()
+        finally:
+            session.close()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if index.internalId() == 0:
+            content_hash, count, size, wasted = self._groups[index.row()]
+            if role == Qt.DisplayRole:
+                return [f"{content_hash[:12]}…", str(count), _format_size(size), _format_size(wasted)][column]
+            if role == Qt.ToolTipRole and column == 0:
+                return content_hash
+            return None
+
+        path, size, modified = self._files[index.internalId() - 1][index.row()]
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return path
+            if column == 2:
+                return _format_size(size)
+            if column == 3:
+                return modified.strftime("%Y-%m-%d %H:%M") if modified else ""
+            return ""
+        if role == Qt.ToolTipRole and column == 0:
+            return path
+        if role == Qt.UserRole:
+            return path
+        return None
+
+
+class DuplicateBrowserDialog(QDialog):
+    """Browses duplicate groups straight from the catalog; double-click a file to open it."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Duplicate Files")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.model = DuplicateGroupModel(self)
+        self.view = QTreeView()
+        self.view.setModel(self.model)
+        self.view.setUniformRowHeights(True)
+        self.view.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.view.doubleClicked.connect(self.open_file)
+        layout.addWidget(self.view)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        buttons.addWidget(refresh_button)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+        self.update_summary()
+
+    def refresh(self):
+        self.model.reload()
+        self.update_summary()
+
+    def update_summary(self):
+        if not self.model.total_groups:
+            self.summary_label.setText("No duplicate files in the catalog.")
+            return
+        self.summary_label.setText(
+            f"{self.model.total_groups} group(s), {self.model.total_files} files, "
+            f"{_format_size(self.model.wasted_bytes)} in redundant copies"
+        )
+
+    def open_file(self, index):
+        path = index.siblingAtColumn(0).data(Qt.UserRole)
+        if path:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(container_path(path)))
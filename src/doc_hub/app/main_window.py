@@ -20,14 +20,18 @@ from PySide6.QtWidgets import (QMainWindow, QGraphicsDropShadowEffect, QWidget,
 from offline_ai.auto_launcher import launch_local_model
 from src.doc_hub.workers.duplicate_worker import DuplicateWorker
 from src.doc_hub.workers.index_worker import IndexWorker
+from src.doc_hub.app.duplicate_browser_dialog import DuplicateBrowserDialog
 from src.doc_hub.app.settings_window import SettingsWindow
 from src.doc_hub.app.tag_picker_dialog import TagPickerDialog
 from src.doc_hub.app.type_picker_dialog import TypePickerDialog
 from src.doc_hub.core.ai_service import AIService
 from src.doc_hub.workers.ai_worker import AIWorker
 from src.doc_hub.core.background_manager import BackgroundManager
+from src.doc_hub.core.containers import container_path, read_member
 from src.doc_hub.workers.organizer_worker import OrganizerWorker
+from src.doc_hub.core.page_store import PAGED_TYPES
 from src.doc_hub.core.search_service import SearchService
+from src.doc_hub.core.skip_cache import REASON_LABELS
 from src.doc_hub.workers.search_worker import SearchWorker
 from src.doc_hub.core.syntax_highlighter import Highlighter
 from src.doc_hub.ui.main_window_ui import Ui_MainWindow
@@ -35,6 +39,11 @@ from src.doc_hub.core.resource_utils import resource_path
 
 TREE_SITTER_LIB = "build/my-languages.so"
 
+# Paged previews open on the matched page with this many pages either side
+# and load this many more whenever the view scrolls near either end.
+PREVIEW_PAGE_CONTEXT = 1
+PREVIEW_PAGE_BATCH = 3
+
 TS_LANG_MAP = {
     ".py": "python",
     ".js": "javascript",
@@ -66,6 +75,8 @@ class MainWindow(QMainWindow):
         super().__init__()
         self._initialized = False
         self._is_populating = None
+        self._paged_preview = None
+        self._loading_pages = False
         self.undo_log_pending = None
         self.dot_count = None
         self.typing_timer = None
@@ -137,6 +148,9 @@ class MainWindow(QMainWindow):
         dup_action = QAction("Find Duplicates", self)
         dup_action.triggered.connect(self.trigger_find_duplicates)
         tools_menu.addAction(dup_action)
+        skipped_action = QAction("Skipped Files", self)
+        skipped_action.triggered.connect(self.show_skipped_files)
+        tools_menu.addAction(skipped_action)
 
         self.setStatusBar(self.statusBar() if self.statusBar() else QStatusBar())
 
@@ -221,6 +235,7 @@ class MainWindow(QMainWindow):
         self.ui.results_table.itemSelectionChanged.connect(self.update_preview_from_selection)
         self.ui.results_table.itemDoubleClicked.connect(self.open_file_from_table)
         self.ui.explorer_tree_view.selectionModel().selectionChanged.connect(self.update_preview_from_selection)
+        self.ui.file_preview_text.verticalScrollBar().valueChanged.connect(self.on_preview_scrolled)
         self.ui.explorer_tree_view.doubleClicked.connect(self.open_file_from_tree)
 
         self.ui.results_table.itemSelectionChanged.connect(self.clear_ai_chat)
@@ -525,9 +540,11 @@ class MainWindow(QMainWindow):
         copy_action = QAction("📋  Copy Path", self)
         ai_summary_action = QAction("🧠  Open with AI Summary", self)
 
-        open_action.triggered.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(file_path)))
+        # Archive and mailbox members open as their container.
+        disk_path = container_path(file_path)
+        open_action.triggered.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(disk_path)))
         reveal_action.triggered.connect(
-            lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(str(Path(file_path).parent))))
+            lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(str(Path(disk_path).parent))))
         try:
             copy_action.triggered.connect(lambda: pyperclip.copy(file_path))
         except Exception:
@@ -557,7 +574,8 @@ class MainWindow(QMainWindow):
             except Exception:
                 tags = [t.strip() for t in raw_tags.split(",")]
 
-        content_preview = textwrap.shorten(record.extracted_content or "", width=400, placeholder="...")
+        content = self.search_service.get_file_content(file_path) or ""
+        content_preview = textwrap.shorten(content, width=400, placeholder="...")
 
         dlg = QDialog(self)
         dlg.setWindowTitle(f"AI Summary — {file_name}")
@@ -632,12 +650,12 @@ class MainWindow(QMainWindow):
         button_row.addWidget(close_btn)
         layout.addLayout(button_row)
 
-        open_btn.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(file_path)))
+        open_btn.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(container_path(file_path))))
 
         def reanalyze_and_update():
             try:
                 self.ai_service.model_choice = self.model_selector.currentText()
-                tags_str, summary_text = self.ai_service.get_tags_and_summary(record.extracted_content or "")
+                tags_str, summary_text = self.ai_service.get_tags_and_summary(content)
                 summary_box.setPlainText(summary_text or "No AI summary available.")
                 if tags_str:
                     nonlocal_tag_label = None
@@ -664,8 +682,9 @@ class MainWindow(QMainWindow):
             self.ai_service.model_choice = self.model_selector.currentText()
 
             self.ui.preview_tab_widget.setCurrentWidget(self.ui.tab_ai_chat)
-            if record and record.extracted_content:
-                self.ui.file_preview_text.setText(record.extracted_content)
+            if content:
+                self._paged_preview = None
+                self.ui.file_preview_text.setText(content)
                 self.ui.ai_chat_area.clear()
                 self.ui.ai_question_input.setFocus()
                 self.ui.ai_chat_area.append(
@@ -865,8 +884,20 @@ class MainWindow(QMainWindow):
             layout.addWidget(details)
             layout.addWidget(summary)
 
-            card.mousePressEvent = (lambda fp=file.file_path, ft=file.file_type:
-                                    (lambda e: self.update_preview_pane(fp, ft)))()
+            if file.search_snippet:
+                snippet = QLabel(f"“{file.search_snippet}”")
+                snippet.setTextFormat(Qt.RichText)
+                snippet.setWordWrap(True)
+                snippet.setStyleSheet("color:#cfd1d5; font-size:11px;")
+                layout.addWidget(snippet)
+
+            if file.matched_pages:
+                pages = QLabel(self.format_matched_pages(file.matched_pages))
+                pages.setStyleSheet("color:#2f80ed; font-size:11px;")
+                layout.addWidget(pages)
+
+            card.mousePressEvent = (lambda fp=file.file_path, ft=file.file_type, pg=file.matched_pages:
+                                    (lambda e: self.update_preview_pane(fp, ft, pg[0] if pg else None)))()
 
             self.results_card_layout.addWidget(card, row, col)
             col += 1
@@ -955,10 +986,22 @@ class MainWindow(QMainWindow):
             layout.addWidget(details)
             layout.addWidget(summary)
 
-            def make_onclick(fp, ft):
-                return lambda e: self.update_preview_pane(fp, ft)
+            if file.search_snippet:
+                snippet = QLabel(f"“{file.search_snippet}”")
+                snippet.setTextFormat(Qt.RichText)
+                snippet.setWordWrap(True)
+                snippet.setStyleSheet("color:#cfd1d5; font-size:11px;")
+                layout.addWidget(snippet)
+
+            if file.matched_pages:
+                pages = QLabel(self.format_matched_pages(file.matched_pages))
+                pages.setStyleSheet("color:#2f80ed; font-size:11px;")
+                layout.addWidget(pages)
+
+            def make_onclick(fp, ft, pg):
+                return lambda e: self.update_preview_pane(fp, ft, pg[0] if pg else None)
 
-            card.mousePressEvent = make_onclick(file.file_path, file.file_type)
+            card.mousePressEvent = make_onclick(file.file_path, file.file_type, file.matched_pages)
 
             self.results_card_layout.addWidget(card, row, col)
             col += 1
@@ -981,14 +1024,15 @@ class MainWindow(QMainWindow):
             self.ui.search_bar.text(),
             self.excluded_file_types
         )
-        all_text = " ".join([r.extracted_content or "" for r in results])
+        contents = self.search_service.get_file_contents(results)
+        all_text = " ".join(contents.get(r.file_path, "") for r in results)
         summary, tags = self.ai_service.get_tags_and_summary(all_text)
         QMessageBox.information(self, "AI Insights",
                                 f"<b>Summary:</b> {summary}<br><br><b>Top Tags:</b> {tags}")
 
     def open_tag_picker(self):
-        all_tags = self.search_service.get_all_tags()
-        dialog = TagPickerDialog(all_tags, self.selected_tags, self)
+        tag_counts = dict(self.search_service.get_tag_counts())
+        dialog = TagPickerDialog(list(tag_counts), self.selected_tags, self, counts=tag_counts)
         dialog.tags_selected.connect(self.on_tags_selected)
         dialog.show()
         try:
@@ -997,8 +1041,8 @@ class MainWindow(QMainWindow):
             pass
 
     def open_type_picker(self):
-        all_types = self.search_service.get_all_file_types()
-        dialog = TypePickerDialog(all_types, self.excluded_file_types, self)
+        type_counts = dict(self.search_service.get_type_counts())
+        dialog = TypePickerDialog(list(type_counts), self.excluded_file_types, self, counts=type_counts)
         dialog.types_selected.connect(self.on_types_selected)
         dialog.show()
         try:
@@ -1093,6 +1137,9 @@ class MainWindow(QMainWindow):
             name_item = QTableWidgetItem(file.file_name)
             name_item.setData(0x0100, file.file_path)
             name_item.setData(0x0101, file.file_type)
+            name_item.setData(0x0102, file.matched_pages)
+            if file.matched_pages:
+                name_item.setToolTip(self.format_matched_pages(file.matched_pages))
             type_item = QTableWidgetItem(file.file_type)
             badge = file.file_type.upper().replace('.', '')
             type_item.setText(f"● {badge}")
@@ -1133,6 +1180,7 @@ class MainWindow(QMainWindow):
     def update_preview_from_selection(self):
         file_path = None
         file_type = None
+        page = None
 
         sender = self.sender()
         if sender == self.ui.results_table:
@@ -1145,6 +1193,8 @@ class MainWindow(QMainWindow):
                 return
             file_path = name_item.data(0x0100)
             file_type = name_item.data(0x0101)
+            matched_pages = name_item.data(0x0102)
+            page = matched_pages[0] if matched_pages else None
 
         else:
             current_index = self.ui.explorer_tree_view.currentIndex()
@@ -1156,9 +1206,10 @@ class MainWindow(QMainWindow):
             file_record = self.search_service.get_file_preview(file_path)
             file_type = file_record.file_type if file_record else "unsupported"
 
-        self.update_preview_pane(file_path, file_type)
+        self.update_preview_pane(file_path, file_type, page)
 
-    def update_preview_pane(self, file_path: str | None, file_type: str | None):
+    def update_preview_pane(self, file_path: str | None, file_type: str | None, page: int | None = None):
+        self._paged_preview = None
         if not file_path:
             self.ui.preview_stack.setCurrentWidget(self.ui.page_default)
             return
@@ -1169,7 +1220,11 @@ class MainWindow(QMainWindow):
 
         if file_type == "image":
             self.highlighter.set_language(None)
-            pixmap = QPixmap(file_path)
+            if container_path(file_path) != file_path:
+                pixmap = QPixmap()
+                pixmap.loadFromData(read_member(file_path) or b"")
+            else:
+                pixmap = QPixmap(file_path)
             scaled_pixmap = pixmap.scaled(
                 self.ui.image_preview_label.size(),
                 Qt.KeepAspectRatio,
@@ -1186,8 +1241,18 @@ class MainWindow(QMainWindow):
         else:
 
             file_record = self.search_service.get_file_preview(file_path)
+            page_count = self.search_service.get_page_count(file_path) if file_type in PAGED_TYPES else 0
+            content = None
+            if file_record and page_count <= 1:
+                content = self.search_service.get_file_content(file_path)
 
-            if file_record and file_record.extracted_content:
+            if file_record and page_count > 1:
+
+                self.highlighter.set_language(None)
+                self.show_paged_preview(file_record, page_count, page or 1)
+                has_text_content = True
+
+            elif content:
 
                 self.highlighter.set_language(
                     file_record.file_path,
@@ -1226,7 +1291,7 @@ class MainWindow(QMainWindow):
 
                                 white-space: pre-wrap;
 
-                                line-height: 1.4;">{file_record.extracted_content}</pre>
+                                line-height: 1.4;">{content}</pre>
 
                     """
 
@@ -1234,7 +1299,7 @@ class MainWindow(QMainWindow):
 
                 else:
 
-                    self.ui.file_preview_text.setText(file_record.extracted_content)
+                    self.ui.file_preview_text.setText(content)
 
                 has_text_content = True
 
@@ -1252,6 +1317,81 @@ class MainWindow(QMainWindow):
         else:
             self.ui.ai_chat_area.setPlaceholderText("Ask a question about the document in the 'Preview' tab...")
 
+    @staticmethod
+    def format_matched_pages(pages: list[int]) -> str:
+        label = "page" if len(pages) == 1 else "pages"
+        return f"Matches on {label} " + ", ".join(str(p) for p in sorted(pages))
+
+    @staticmethod
+    def _page_header(page: int, page_count: int) -> str:
+        return f"── Page {page} / {page_count} ──"
+
+    def _format_pages(self, pages: dict[int, str], first: int, last: int, page_count: int) -> str:
+        return "\n\n".join(
+            f"{self._page_header(n, page_count)}\n{pages.get(n, '')}" for n in range(first, last + 1)
+        )
+
+    def show_paged_preview(self, file_record, page_count: int, page: int):
+        """
+        Shows a few pages around ``page`` instead of the whole document;
+        ``on_preview_scrolled`` loads the neighbours as the reader scrolls.
+        """
+        page = min(max(page, 1), page_count)
+        first = max(1, page - PREVIEW_PAGE_CONTEXT)
+        last = min(page_count, page + PREVIEW_PAGE_CONTEXT)
+        pages = self.search_service.get_pages(file_record.file_path, first, last)
+        header = f"AI Summary: {file_record.ai_summary}\n\n" if file_record.ai_summary else ""
+
+        self._loading_pages = True
+        try:
+            self.ui.file_preview_text.setPlainText(header + self._format_pages(pages, first, last, page_count))
+            cursor = self.ui.file_preview_text.document().find(self._page_header(page, page_count))
+            if not cursor.isNull():
+                cursor.clearSelection()
+                self.ui.file_preview_text.setTextCursor(cursor)
+                bar = self.ui.file_preview_text.verticalScrollBar()
+                bar.setValue(self.ui.file_preview_text.cursorRect(cursor).top() + bar.value())
+        finally:
+            self._loading_pages = False
+        self._paged_preview = {
+            "path": file_record.file_path, "count": page_count, "first": first, "last": last,
+        }
+
+    @Slot(int)
+    def on_preview_scrolled(self, value: int):
+        state = self._paged_preview
+        if not state or self._loading_pages:
+            return
+        bar = self.ui.file_preview_text.verticalScrollBar()
+        margin = bar.pageStep() // 2
+        self._loading_pages = True
+        try:
+            if value >= bar.maximum() - margin and state["last"] < state["count"]:
+                first = state["last"] + 1
+                last = min(state["count"], state["last"] + PREVIEW_PAGE_BATCH)
+                pages = self.search_service.get_pages(state["path"], first, last)
+                cursor = QTextCursor(self.ui.file_preview_text.document())
+                cursor.movePosition(QTextCursor.End)
+                cursor.insertText("\n\n" + self._format_pages(pages, first, last, state["count"]))
+                state["last"] = last
+            elif value <= margin and state["first"] > 1:
+                first = max(1, state["first"] - PREVIEW_PAGE_BATCH)
+                last = state["first"] - 1
+                pages = self.search_service.get_pages(state["path"], first, last)
+                document = self.ui.file_preview_text.document()
+                top = document.find(self._page_header(state["first"], state["count"]))
+                if top.isNull():
+                    return
+                # Keep the text under the reader where it was while pages grow above it.
+                old_maximum = bar.maximum()
+                cursor = QTextCursor(document)
+                cursor.setPosition(top.selectionStart())
+                cursor.insertText(self._format_pages(pages, first, last, state["count"]) + "\n\n")
+                bar.setValue(value + bar.maximum() - old_maximum)
+                state["first"] = first
+        finally:
+            self._loading_pages = False
+
     @Slot()
     def clear_ai_chat(self):
         self.ui.ai_chat_area.clear()
@@ -1262,7 +1402,11 @@ class MainWindow(QMainWindow):
         if not user_question:
             return
 
-        document_content = self.ui.file_preview_text.toPlainText()
+        if self._paged_preview:
+            # Only some pages are on screen; the question is about the whole document.
+            document_content = self.search_service.get_file_content(self._paged_preview["path"]) or ""
+        else:
+            document_content = self.ui.file_preview_text.toPlainText()
 
         if not document_content:
             self.on_ai_error("There is no document content to ask questions about.")
@@ -1404,7 +1548,7 @@ class MainWindow(QMainWindow):
         if name_item:
             file_path = name_item.data(0x0100)
             if file_path:
-                QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+                QDesktopServices.openUrl(QUrl.fromLocalFile(container_path(file_path)))
 
     def open_file_from_tree(self, index):
         if self.file_system_model.isDir(index):
@@ -1769,8 +1913,7 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Duplicate Scan", "A duplicate scan is already running.")
             return
 
-        selected_path = getattr(self, "current_directory", ".")
-        self.duplicate_thread = DuplicateWorker([selected_path])
+        self.duplicate_thread = DuplicateWorker()
         self.duplicate_thread.progress.connect(lambda msg: self.statusBar().showMessage(msg))
         self.duplicate_thread.finished.connect(self.on_duplicates_finished)
         try:
@@ -1778,45 +1921,32 @@ class MainWindow(QMainWindow):
         except RuntimeError:
             QMessageBox.warning(self, "Thread Error", "Could not start duplicate scan thread.")
 
-    def on_duplicates_finished(self, success, message, report_path):
+    def on_duplicates_finished(self, success, message):
         self.statusBar().showMessage(message)
         if not success:
             QMessageBox.critical(self, "Duplicate Scan Failed", message)
             return
+        self.show_duplicate_results()
 
-        QMessageBox.information(self, "Duplicate Scan Complete", f"{message}\n\nReport: {report_path}")
-        self.show_duplicate_results(report_path)
-
-    def show_duplicate_results(self, report_path):
+    def show_duplicate_results(self):
         try:
-            report = json.loads(Path(report_path).read_text(encoding="utf-8"))
-            duplicates = report.get("duplicate_groups", {})
-
-            dialog = QDialog(self)
-            dialog.setWindowTitle("Duplicate Files Report")
-            layout = QVBoxLayout(dialog)
-            layout.addWidget(QLabel(f"Generated at: {report.get('generated_at')}"))
-
-            table = QTableWidget()
-            table.setColumnCount(3)
-            table.setHorizontalHeaderLabels(["Hash", "File Path", "Size (KB)"])
-            rows = sum(len(v) for v in duplicates.values())
-            table.setRowCount(rows)
-
-            r = 0
-            for hash_val, files in duplicates.items():
-                for f in files:
-                    table.setItem(r, 0, QTableWidgetItem(hash_val[:12] + "…"))
-                    table.setItem(r, 1, QTableWidgetItem(f["path"]))
-                    table.setItem(r, 2, QTableWidgetItem(str(round(f["size"] / 1024, 2))))
-                    r += 1
-
-            table.resizeColumnsToContents()
-            layout.addWidget(table)
-            dialog.resize(900, 600)
+            dialog = DuplicateBrowserDialog(self)
             dialog.exec()
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load duplicate report:\n{e}")
+            QMessageBox.critical(self, "Error", f"Failed to load duplicate groups:\n{e}")
+
+    def show_skipped_files(self):
+        summary = SearchService.get_skip_summary()
+        if not summary:
+            QMessageBox.information(self, "Skipped Files", "Every scanned file was indexed.")
+            return
+        total = sum(count for _, count in summary)
+        lines = [f"{REASON_LABELS.get(reason, reason)}: {count}" for reason, count in summary]
+        QMessageBox.information(
+            self,
+            "Skipped Files",
+            f"{total} scanned file(s) were not indexed and are skipped until they change:\n\n" + "\n".join(lines),
+        )
 
     def closeEvent(self, event):
         print("Closing application... shutting down threads.")
@@ -1827,9 +1957,13 @@ class MainWindow(QMainWindow):
         self.ai_thread.wait()
 
         if self.manager.indexer_thread and self.manager.indexer_thread.isRunning():
+            if self.manager.indexer_worker:
+                self.manager.indexer_worker.stop()
             self.manager.indexer_thread.quit()
             self.manager.indexer_thread.wait()
 
+        self.manager.shutdown()
+
         event.accept()
 
     @Slot(str)
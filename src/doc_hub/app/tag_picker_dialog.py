@@ -4,12 +4,13 @@ from PySide6.QtCore import Qt, Signal, QPoint
 class TagPickerDialog(QWidget):
     tags_selected = Signal(set)
 
-    def __init__(self, all_tags: list[str], selected_tags: set[str], parent=None):
+    def __init__(self, all_tags: list[str], selected_tags: set[str], parent=None, counts: dict[str, int] | None = None):
         super().__init__(parent)
         self.setWindowTitle("Filter by Tags")
         self.setMinimumSize(420, 500)
         self.all_tags = all_tags or []
         self.selected_tags = set(selected_tags or set())
+        self.counts = counts or {}
 
         self.setStyleSheet("""
             QWidget {
@@ -92,7 +93,9 @@ class TagPickerDialog(QWidget):
     def populate_tags(self):
         self.tag_list.clear()
         for tag in sorted(self.all_tags):
-            item = QListWidgetItem(tag)
+            label = f"{tag}  ({self.counts[tag]})" if tag in self.counts else tag
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, tag)
             if tag in self.selected_tags:
                 item.setSelected(True)
             self.tag_list.addItem(item)
@@ -112,7 +115,7 @@ class TagPickerDialog(QWidget):
             self.tag_list.item(i).setSelected(False)
 
     def emit_selection(self):
-        selected = {self.tag_list.item(i).text()
+        selected = {self.tag_list.item(i).data(Qt.UserRole)
                     for i in range(self.tag_list.count())
                     if self.tag_list.item(i).isSelected()}
         self.tags_selected.emit(selected)
@@ -4,12 +4,13 @@ from PySide6.QtCore import Qt, Signal, QPoint
 class TypePickerDialog(QWidget):
     types_selected = Signal(set)
 
-    def __init__(self, all_types: list[str], excluded_types: set[str], parent=None):
+    def __init__(self, all_types: list[str], excluded_types: set[str], parent=None, counts: dict[str, int] | None = None):
         super().__init__(parent)
         self.setWindowTitle("Filter by File Types")
         self.setMinimumSize(420, 500)
         self.all_types = all_types or []
         self.excluded_types = set(excluded_types or set())
+        self.counts = counts or {}
 
         self.setStyleSheet("""
             QWidget {
@@ -92,7 +93,9 @@ class TypePickerDialog(QWidget):
     def populate_types(self):
         self.type_list.clear()
         for file_type in sorted(self.all_types):
-            item = QListWidgetItem(file_type)
+            label = f"{file_type}  ({self.counts[file_type]})" if file_type in self.counts else file_type
+            item = QListWidgetItem(label)
+            item.setData(Qt.UserRole, file_type)
             if file_type not in self.excluded_types:
                 item.setSelected(True)
             self.type_list.addItem(item)
@@ -112,7 +115,7 @@ class TypePickerDialog(QWidget):
             self.type_list.item(i).setSelected(False)
 
     def emit_selection(self):
-        selected = {self.type_list.item(i).text()
+        selected = {self.type_list.item(i).data(Qt.UserRole)
                     for i in range(self.type_list.count())
                     if self.type_list.item(i).isSelected()}
         excluded = set(self.all_types) - selected
@@ -1,7 +1,11 @@
 from PySide6.QtCore import QObject, QThread, QTimer, QFileSystemWatcher, Signal, Slot
 from PySide6.QtWidgets import QStatusBar
 from src.doc_hub.core.file_indexer import FileIndexWorker
-from src.doc_hub.core.database import get_session, WatchedFolder
+from src.doc_hub.core.database import get_read_session, WatchedFolder
+from src.doc_hub.core.fs_watcher import RecursiveWatcher, watchdog_available
+from src.doc_hub.workers.enrichment_worker import EnrichmentWorker
+
+FALLBACK_RESCAN_MS = 10 * 60 * 1000
 
 
 class BackgroundManager(QObject):
@@ -14,6 +18,10 @@ class BackgroundManager(QObject):
         self.indexer_thread = None
         self.indexer_worker = None
 
+        self.pending_changed = set()
+        self.pending_removed = set()
+        self.pending_moves = []
+
         self.watcher = QFileSystemWatcher(self)
         self.scan_timer = QTimer(self)
 
@@ -24,6 +32,35 @@ class BackgroundManager(QObject):
         self.watcher.directoryChanged.connect(self.request_scan)
         self.watcher.fileChanged.connect(self.request_scan)
 
+        # Folders the recursive watcher could not cover are rescanned periodically.
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setInterval(FALLBACK_RESCAN_MS)
+        self.rescan_timer.timeout.connect(self.run_full_scan)
+
+        self.fs_watcher = None
+        if watchdog_available():
+            self.fs_watcher = RecursiveWatcher(self)
+            self.fs_watcher.paths_changed.connect(self.queue_changes)
+            self.fs_watcher.watch_degraded.connect(self.on_watch_degraded)
+        else:
+            print("[Watcher] watchdog not installed, using top-level folder watching.")
+
+        self.enrichment_thread = QThread(self)
+        self.enrichment_worker = EnrichmentWorker()
+        self.enrichment_worker.moveToThread(self.enrichment_thread)
+        self.enrichment_worker.progress.connect(self.update_status_bar)
+        self.enrichment_worker.finished.connect(self.enrichment_thread.quit)
+        self.enrichment_thread.started.connect(self.enrichment_worker.run)
+        self.enrichment_thread.start()
+
+    def shutdown(self):
+        if self.fs_watcher is not None:
+            self.fs_watcher.stop()
+        if self.enrichment_thread.isRunning():
+            self.enrichment_worker.stop()
+            self.enrichment_thread.quit()
+            self.enrichment_thread.wait(3000)
+
     @Slot()
     def request_scan(self):
         try:
@@ -33,7 +70,7 @@ class BackgroundManager(QObject):
         self.scan_timer.start()
 
     def update_watcher_paths(self):
-        session = get_session()
+        session = get_read_session()
         try:
             old_paths = self.watcher.directories()
             if old_paths:
@@ -42,16 +79,56 @@ class BackgroundManager(QObject):
             folders = session.query(WatchedFolder).all()
             new_paths = [f.file_path for f in folders if f.file_path]
 
+            if self.fs_watcher is not None:
+                self.fs_watcher.set_roots(new_paths)
+                new_paths = sorted(self.fs_watcher.degraded_roots)
+                if new_paths:
+                    self.rescan_timer.start()
+                else:
+                    self.rescan_timer.stop()
+
             if new_paths:
                 self.watcher.addPaths(new_paths)
                 print(f"[Watcher] Now watching: {new_paths}")
-            else:
+            elif self.fs_watcher is None:
                 print("[Watcher] No folders to watch.")
         except Exception as e:
             print(f"Error updating watcher paths: {e}")
         finally:
             session.close()
 
+    @Slot(str, str)
+    def on_watch_degraded(self, root: str, reason: str):
+        self.update_status_bar(f"Watching {root} without live updates: {reason}")
+
+    @Slot(list, list, list)
+    def queue_changes(self, changed: list, removed: list, moved: list):
+        for path in removed:
+            self.pending_changed.discard(path)
+            self.pending_removed.add(path)
+        for path in changed:
+            self.pending_removed.discard(path)
+            self.pending_changed.add(path)
+        self.pending_moves.extend(moved)
+
+        if not (self.indexer_thread and self.indexer_thread.isRunning()):
+            self.run_incremental_update()
+
+    @Slot()
+    def run_incremental_update(self):
+        if not (self.pending_changed or self.pending_removed or self.pending_moves):
+            return
+        if self.indexer_thread and self.indexer_thread.isRunning():
+            return
+
+        worker = self._start_indexer("run_changes", prepare=lambda w: w.set_changes(
+            sorted(self.pending_changed), sorted(self.pending_removed), list(self.pending_moves)
+        ))
+        if worker is not None:
+            self.pending_changed.clear()
+            self.pending_removed.clear()
+            self.pending_moves.clear()
+
     @Slot()
     def run_full_scan(self):
         if self.indexer_thread and self.indexer_thread.isRunning():
@@ -61,6 +138,16 @@ class BackgroundManager(QObject):
                 pass
             return
 
+        if self._start_indexer("run_scan") is not None:
+            try:
+                self.status_bar.showMessage("Starting scan...")
+            except RuntimeError:
+                pass
+
+    def _start_indexer(self, slot_name: str, prepare=None):
+        if self.indexer_thread and self.indexer_thread.isRunning():
+            return None
+
         if self.indexer_thread:
             try:
                 self.indexer_thread.quit()
@@ -72,6 +159,8 @@ class BackgroundManager(QObject):
 
         self.indexer_thread = QThread(parent=self)
         self.indexer_worker = FileIndexWorker()
+        if prepare is not None:
+            prepare(self.indexer_worker)
         self.indexer_worker.moveToThread(self.indexer_thread)
 
         self.indexer_worker.progress_updated.connect(self.update_status_bar)
@@ -80,13 +169,9 @@ class BackgroundManager(QObject):
         self.indexer_worker.finished.connect(self.indexer_thread.quit)
         self.indexer_thread.finished.connect(self.indexer_thread.deleteLater)
 
-        self.indexer_thread.started.connect(self.indexer_worker.run_scan)
+        self.indexer_thread.started.connect(getattr(self.indexer_worker, slot_name))
         self.indexer_thread.start()
-
-        try:
-            self.status_bar.showMessage("Starting scan...")
-        except RuntimeError:
-            pass
+        return self.indexer_worker
 
     @Slot(str)
     def update_status_bar(self, message: str):
@@ -115,4 +200,7 @@ class BackgroundManager(QObject):
         except Exception as e:
             print(f"Watcher update failed after scan: {e}")
 
+        self.enrichment_worker.wake()
         self.scan_finished.emit()
+
+        QTimer.singleShot(0, self.run_incremental_update)
@@ -0,0 +1,140 @@
+import os
+from datetime import datetime, UTC
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.containers import split_member_path
+from src.doc_hub.core.database import IndexedFile
+from src.doc_hub.core.file_processing import extractor_key, is_container
+from src.doc_hub.core.path_index import member_bounds, subtree_bounds
+from src.doc_hub.core.skip_cache import SkipCache
+
+MTIME_TOLERANCE = 0.001
+
+
+def _timestamp(value: datetime | None) -> float | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+class CatalogSnapshot:
+    """
+    In-memory map of ``file_path -> (file_size, mtime)`` for every catalog row
+    under the scanned roots. Walkers consult it with plain ``stat`` data, so
+    unchanged files never reach the database. Entries are removed as they
+    are seen; whatever is left after a walk no longer exists on disk.
+    Files in the skip cache are tracked the same way, so a file that had
+    nothing to index is not extracted again until it or its extractor changes.
+
+    Archive and mailbox members are never walked. They are kept per
+    container and count as seen when their container is unchanged, or are
+    handed to the container's extraction with ``take_members``.
+    """
+
+    def __init__(self, entries: dict[str, tuple[int | None, float | None]] | None = None,
+                 skipped: dict[str, tuple] | None = None):
+        self._entries = {}
+        self._skipped = {}
+        # container -> {member_path: (size, mtime, extractor)}; ``extractor``
+        # is set for skip cache entries and ``None`` for catalog rows.
+        self._members = {}
+        for path, (size, mtime) in (entries or {}).items():
+            container, name = split_member_path(path)
+            if name is None:
+                self._entries[path] = (size, mtime)
+            else:
+                self._members.setdefault(container, {})[path] = (size, mtime, None)
+        for path, entry in (skipped or {}).items():
+            container, name = split_member_path(path)
+            if name is None:
+                self._skipped[path] = entry
+            else:
+                self._members.setdefault(container, {})[path] = entry
+
+    @classmethod
+    def load(cls, session: Session, roots: list[str], files: list[str] = ()) -> "CatalogSnapshot":
+        entries = {}
+        files = list(files)
+        for start in range(0, len(files), 500):
+            query = (
+                select(IndexedFile.file_path, IndexedFile.file_size, IndexedFile.date_modified)
+                .where(IndexedFile.file_path.in_(files[start:start + 500]))
+            )
+            for path, size, modified in session.execute(query):
+                entries[path] = (size, _timestamp(modified))
+        bounds = [subtree_bounds(root) for root in roots]
+        bounds += [member_bounds(path) for path in files if is_container(path)]
+        for low, high in bounds:
+            query = (
+                select(IndexedFile.file_path, IndexedFile.file_size, IndexedFile.date_modified)
+                .where(IndexedFile.file_path >= low, IndexedFile.file_path < high)
+                .execution_options(yield_per=5000)
+            )
+            for path, size, modified in session.execute(query):
+                entries[path] = (size, _timestamp(modified))
+        return cls(entries, SkipCache.load(session, roots, files))
+
+    def __len__(self):
+        return len(self._entries) + sum(
+            1 for members in self._members.values() for entry in members.values() if entry[2] is None
+        )
+
+    def skipped_count(self) -> int:
+        return len(self._skipped) + sum(
+            1 for members in self._members.values() for entry in members.values() if entry[2] is not None
+        )
+
+    def check(self, path: str, size: int, mtime: float) -> tuple[bool, bool]:
+        """
+        Returns ``(known, unchanged)`` and marks the path as seen. ``known``
+        means the path has a catalog row; a cached skip only counts as
+        unchanged.
+        """
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            skipped = self._skipped.pop(path, None)
+            if skipped is None:
+                return False, False
+            known_size, known_mtime, extractor = skipped
+            known = False
+            unchanged = (
+                known_size == size
+                and known_mtime is not None
+                and abs(known_mtime - mtime) < MTIME_TOLERANCE
+                and extractor == extractor_key(path)
+            )
+        else:
+            known_size, known_mtime = entry
+            known = True
+            unchanged = (
+                known_size == size
+                and known_mtime is not None
+                and abs(known_mtime - mtime) < MTIME_TOLERANCE
+            )
+        if unchanged:
+            self._members.pop(path, None)
+        return known, unchanged
+
+    def take_members(self, container: str) -> dict[str, tuple]:
+        """Marks the members of ``container`` as seen and returns them, see ``extract_container_task``."""
+        return self._members.pop(container, {})
+
+    def _unseen_members(self, skipped: bool):
+        for members in self._members.values():
+            for path, entry in members.items():
+                if (entry[2] is not None) == skipped:
+                    yield path
+
+    def unseen(self, excluded_dirs: list[str] = ()) -> list[str]:
+        prefixes = tuple(os.path.join(d, "") for d in excluded_dirs)
+        paths = [*self._entries, *self._unseen_members(skipped=False)]
+        return [p for p in paths if not (prefixes and p.startswith(prefixes))]
+
+    def unseen_skipped(self, excluded_dirs: list[str] = ()) -> list[str]:
+        prefixes = tuple(os.path.join(d, "") for d in excluded_dirs)
+        paths = [*self._skipped, *self._unseen_members(skipped=True)]
+        return [p for p in paths if not (prefixes and p.startswith(prefixes))]
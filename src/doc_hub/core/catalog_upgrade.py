@@ -0,0 +1,15 @@
+from src.doc_hub.core.path_index import DirectoryIndex
+from src.doc_hub.core.tag_store import TagStore
+
+
+def upgrade_catalog():
+    """
+    Fills tables and columns added after a catalog was created. Run once at
+    startup, after ``database`` has created the schema; both backfills return
+    straight away on an up-to-date catalog.
+    """
+    try:
+        TagStore.backfill()
+        DirectoryIndex.backfill()
+    except Exception as e:
+        print(f" Catalog upgrade failed: {e}")
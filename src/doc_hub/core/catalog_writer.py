@@ -0,0 +1,209 @@
+import os
+import time
+from datetime import datetime, UTC
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.content_store import ContentStore
+from src.doc_hub.core.database import IndexedFile
+from src.doc_hub.core.enrichment_queue import EnrichmentQueue
+from src.doc_hub.core.file_processing import extractor_key
+from src.doc_hub.core.image_similarity import SimilarImageIndex
+from src.doc_hub.core.near_duplicates import NearDuplicateIndex
+from src.doc_hub.core.page_store import PAGED_TYPES, PageStore
+from src.doc_hub.core.path_index import DirectoryIndex, parent_dir
+from src.doc_hub.core.skip_cache import SkipCache
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_DELAY_MS = 2000
+UPSERT_CHUNK_SIZE = 500
+
+# Columns a rescan overwrites. Tags and summaries belong to the enrichment
+# worker and survive a content change until it re-runs.
+_SCAN_COLUMNS = (
+    "file_name", "file_type", "file_size", "date_modified", "date_indexed", "parent_dir", "directory_id",
+    "content_hash", "inode", "content_truncated",
+)
+
+_TOUCH = (
+    update(IndexedFile.__table__)
+    .where(IndexedFile.__table__.c.file_path == bindparam("path"))
+    .values(
+        file_size=bindparam("size"),
+        date_modified=bindparam("modified"),
+        inode=bindparam("ino"),
+    )
+)
+
+
+class CatalogBatchWriter:
+    """
+    Collects extracted files and writes them to the catalog with one
+    ``INSERT ... ON CONFLICT(file_path) DO UPDATE`` per batch. A batch is
+    written once it holds ``batch_size`` files or its oldest file has waited
+    ``max_delay_ms``. The search index is committed together with each
+    batch so a crash never leaves catalog rows the index has not seen.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        index_service,
+        index_writer,
+        directories: DirectoryIndex | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_delay_ms: int = DEFAULT_MAX_DELAY_MS,
+    ):
+        self.session = session
+        self.index_service = index_service
+        self.index_writer = index_writer
+        self.directories = directories or DirectoryIndex()
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self._pending = []
+        self._touched = []
+        self._skipped = []
+        self._oldest = None
+
+    def __len__(self):
+        return len(self._pending) + len(self._touched) + len(self._skipped)
+
+    def add(self, path: str, size: int, mtime: float, display_type: str, content: str, ai_eligible: bool,
+            content_hash: str | None = None, inode: int | None = None, features: dict | None = None,
+            content_truncated: bool = False):
+        if not len(self):
+            self._oldest = time.monotonic()
+        self._pending.append(
+            (path, size, mtime, display_type, content, ai_eligible, content_hash, inode, features or {},
+             content_truncated)
+        )
+
+    def touch(self, path: str, size: int, mtime: float, inode: int | None = None):
+        """Records new stat data for a file whose content hash did not change."""
+        if not len(self):
+            self._oldest = time.monotonic()
+        self._touched.append({
+            "path": path,
+            "size": size,
+            "modified": datetime.fromtimestamp(mtime, UTC),
+            "ino": inode,
+        })
+
+    def skip(self, path: str, size: int, mtime: float, reason: str):
+        """Records a file that produced nothing to index, see ``SkipCache``."""
+        if not len(self):
+            self._oldest = time.monotonic()
+        self._skipped.append({
+            "file_path": path,
+            "file_size": size,
+            "mtime": mtime,
+            "extractor": extractor_key(path),
+            "reason": reason,
+        })
+
+    def due(self) -> bool:
+        if not len(self):
+            return False
+        return len(self) >= self.batch_size or time.monotonic() - self._oldest >= self.max_delay
+
+    def commit(self):
+        """Commits the search index, then the catalog transaction."""
+        self.index_writer = self.index_service.renew_writer(self.index_writer, session=self.session)
+        self.session.commit()
+
+    def rollback(self):
+        """Drops the failed batch from the search index as well as the catalog transaction."""
+        self.session.rollback()
+        self.directories.forget()
+        self.index_service.cancel_writer(self.index_writer)
+        self.index_writer = self.index_service.get_writer(session=self.session)
+
+    def flush(self) -> list[str]:
+        """Writes the pending batch; returns the paths written, or ``[]`` if the batch failed."""
+        if not len(self):
+            return []
+        batch, self._pending = self._pending, []
+        touched, self._touched = self._touched, []
+        skipped, self._skipped = self._skipped, []
+        self._oldest = None
+
+        try:
+            now = datetime.now(UTC)
+            dir_ids = self.directories.ids_for(self.session, {parent_dir(item[0]) for item in batch})
+            rows = []
+            contents = {}
+            features = {}
+            needs_ai = []
+            paged = set()
+            for (path, size, mtime, display_type, content, ai_eligible, content_hash, inode, file_features,
+                 content_truncated) in batch:
+                folder = parent_dir(path)
+                rows.append({
+                    "file_path": path,
+                    "file_name": os.path.basename(path),
+                    "file_type": display_type,
+                    "file_size": size,
+                    "date_modified": datetime.fromtimestamp(mtime, UTC),
+                    "date_indexed": now,
+                    "parent_dir": folder,
+                    "directory_id": dir_ids.get(folder),
+                    "content_hash": content_hash,
+                    "inode": inode,
+                    "content_truncated": content_truncated,
+                    "ai_tags": "",
+                    "ai_summary": "",
+                })
+                contents[path] = content
+                if display_type in PAGED_TYPES:
+                    paged.add(path)
+                features[path] = file_features
+                if ai_eligible:
+                    needs_ai.append(path)
+
+            written = []
+            for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                stmt = insert(IndexedFile).values(rows[start:start + UPSERT_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[IndexedFile.file_path],
+                    set_={column: stmt.excluded[column] for column in _SCAN_COLUMNS},
+                ).returning(
+                    IndexedFile.id,
+                    IndexedFile.file_path,
+                    IndexedFile.file_name,
+                    IndexedFile.file_type,
+                    IndexedFile.date_indexed,
+                    IndexedFile.ai_tags,
+                    IndexedFile.ai_summary,
+                )
+                written.extend(self.session.execute(stmt).all())
+
+            ContentStore.save_many(self.session, [(row.id, contents[row.file_path]) for row in written])
+            PageStore.save_many(
+                self.session, [(row.id, contents[row.file_path]) for row in written if row.file_path in paged]
+            )
+            NearDuplicateIndex.save_many(
+                self.session, [(row.id, features[row.file_path].get("minhash")) for row in written]
+            )
+            SimilarImageIndex.save_many(
+                self.session, [(row.id, features[row.file_path].get("image_hash")) for row in written]
+            )
+            for row in written:
+                self.index_service.add_or_update_document(
+                    self.index_writer, row, row.ai_tags, row.ai_summary, contents[row.file_path]
+                )
+            # Tags and summaries are filled in later by the enrichment worker,
+            # the file is searchable by content as soon as this batch commits.
+            EnrichmentQueue.enqueue(self.session, needs_ai)
+            if touched:
+                self.session.execute(_TOUCH, touched)
+            # A file that indexes now may have been skipped by an older extractor.
+            SkipCache.forget(self.session, [row.file_path for row in written])
+            SkipCache.record_many(self.session, skipped)
+            self.commit()
+            return [row.file_path for row in written]
+        except Exception as e:
+            print(f"Error writing batch of {len(batch) + len(touched) + len(skipped)} files: {e}")
+            self.rollback()
+            return []
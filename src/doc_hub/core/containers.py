@@ -0,0 +1,221 @@
+import calendar
+import hashlib
+import os
+import re
+import tarfile
+import time
+import zipfile
+from email import policy
+from email.parser import BytesHeaderParser
+from email.utils import parsedate_to_datetime
+
+from src.doc_hub.core.file_processing import (
+    STREAMED_CONTAINER_SUFFIXES, container_suffix, is_dir_ignored, is_file_ignored,
+)
+
+# Archive and mailbox members are catalogued under virtual paths such as
+# ``/home/me/backup.zip!/docs/spec.md``. Members are read straight from the
+# container into memory, never extracted to disk.
+MEMBER_SEPARATOR = "!/"
+# Larger members are skipped rather than read into memory.
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+# Outcome reported for such a member by ``extract_container_task``.
+TOO_LARGE = "too_large"
+MAX_SUBJECT_CHARS = 80
+# Hex digits of the message identity in mbox member names.
+MESSAGE_KEY_CHARS = 12
+
+_UNSAFE_NAME_RE = re.compile(r"[\x00-\x1f/\\]+")
+
+
+class ContainerError(Exception):
+    """The archive or mailbox could not be read."""
+
+
+class Member:
+    """One archive entry or mailbox message. ``read`` returns at most ``MAX_MEMBER_BYTES + 1`` bytes."""
+
+    __slots__ = ("name", "size", "mtime", "read")
+
+    def __init__(self, name: str, size: int, mtime: float, read):
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.read = read
+
+
+def member_path(container: str, name: str) -> str:
+    return f"{container}{MEMBER_SEPARATOR}{name}"
+
+
+def split_member_path(path: str) -> tuple[str, str | None]:
+    """``(container, member_name)``; ``member_name`` is ``None`` for ordinary paths."""
+    container, separator, name = path.partition(MEMBER_SEPARATOR)
+    if not separator or not container_suffix(container):
+        return path, None
+    return container, name
+
+
+def container_path(path: str) -> str:
+    """The file on disk that holds ``path``: its container for members, else ``path`` itself."""
+    return split_member_path(path)[0]
+
+
+def _ignored(name: str) -> bool:
+    parts = name.split("/")
+    return is_file_ignored(parts[-1]) or any(is_dir_ignored(part) for part in parts[:-1])
+
+
+def _read_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    with archive.open(info) as f:
+        return f.read(MAX_MEMBER_BYTES + 1)
+
+
+def _zip_members(path: str, start: int):
+    try:
+        archive = zipfile.ZipFile(path)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ContainerError(str(e)) from e
+    with archive:
+        for index, info in enumerate(archive.infolist()):
+            if index < start:
+                continue
+            if info.is_dir() or info.flag_bits & 0x1:
+                # Encrypted members cannot be read without a password.
+                continue
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+            read = (lambda info=info: _read_zip_member(archive, info))
+            yield Member(info.filename, info.file_size, mtime, read), index + 1
+
+
+def _tar_members(path: str, start: int | None):
+    """
+    Plain tars resume at the byte offset of the next header, which is the
+    cursor. Compressed tars are streamed in a single pass and yield no
+    cursor, so they are never split into slices.
+    """
+    streamed = container_suffix(path) in STREAMED_CONTAINER_SUFFIXES
+    try:
+        archive = tarfile.open(path, "r|*" if streamed else "r:*")
+    except (tarfile.TarError, OSError) as e:
+        raise ContainerError(str(e)) from e
+    with archive:
+        if start:
+            # Skip the first header, read on open, and seek past the members
+            # earlier slices handled.
+            archive.firstmember = None
+            archive.offset = start
+        while True:
+            try:
+                info = archive.next()
+            except tarfile.TarError as e:
+                raise ContainerError(str(e)) from e
+            if info is None:
+                return
+            # Headers seen so far are kept by tarfile; they are small, but
+            # a million-entry archive would still add up.
+            archive.members = []
+            if not info.isfile():
+                continue
+            # In a stream the data must be read before the next header.
+            read = (lambda info=info: archive.extractfile(info).read(MAX_MEMBER_BYTES + 1))
+            yield Member(info.name, info.size, float(info.mtime), read), None if streamed else archive.offset
+
+
+def _header(headers, name: str) -> str:
+    try:
+        return str(headers[name] or "")
+    except Exception:
+        return ""
+
+
+def _message_name(data: bytes) -> tuple[str, float]:
+    """
+    ``Subject [key].eml``, where ``key`` hashes the Message-ID, or the whole
+    message when it has none. Names stay put when other messages are added
+    or removed, or when a mail client rewrites status headers, so unchanged
+    messages are not extracted again. Copies of a message share its name
+    and are catalogued once.
+    """
+    headers = BytesHeaderParser(policy=policy.default).parsebytes(data)
+    message_id = _header(headers, "Message-ID").strip()
+    identity = message_id.encode("utf-8", errors="replace") if message_id else data
+    key = hashlib.sha1(identity).hexdigest()[:MESSAGE_KEY_CHARS]
+    subject = _UNSAFE_NAME_RE.sub(" ", _header(headers, "Subject")).strip()[:MAX_SUBJECT_CHARS].strip()
+    name = f"{subject} [{key}].eml" if subject else f"[{key}].eml"
+    try:
+        mtime = float(calendar.timegm(parsedate_to_datetime(headers["Date"]).utctimetuple()))
+    except Exception:
+        mtime = 0.0
+    return name, mtime
+
+
+def _mbox_members(path: str, start: int | None):
+    """
+    Messages split on ``From `` lines, as Python's ``mailbox.mbox`` does. The
+    cursor is the byte offset after a message, so a later slice seeks
+    straight to where the previous one stopped.
+    """
+    offset = start or 0
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        raise ContainerError(str(e)) from e
+    with f:
+        f.seek(offset)
+        lines = []
+        size = 0
+        position = offset
+        while True:
+            line = f.readline()
+            if not line or line.startswith(b"From "):
+                if size:
+                    data = b"".join(lines)
+                    name, mtime = _message_name(data)
+                    yield Member(name, size, mtime, (lambda data=data: data)), position
+                if not line:
+                    return
+                lines = []
+                size = 0
+            else:
+                size += len(line)
+                # Past the cap the message is only counted; it will be skipped.
+                if size <= MAX_MEMBER_BYTES + 1:
+                    lines.append(line)
+            position += len(line)
+
+
+def iter_members(path: str, start=None):
+    """
+    Yields ``(member, cursor)`` for the members of a container from
+    ``start`` on; passing a yielded ``cursor`` back resumes after that
+    member. The cursor is ``None`` where the container cannot be resumed.
+    Directories, encrypted zip entries and ignored names are left out.
+    """
+    suffix = container_suffix(path)
+    if suffix == ".mbox":
+        members = _mbox_members(path, start)
+    elif suffix == ".zip":
+        members = _zip_members(path, start or 0)
+    else:
+        members = _tar_members(path, start)
+    for member, cursor in members:
+        member.name = member.name.lstrip("/")
+        if member.name and not _ignored(member.name):
+            yield member, cursor
+
+
+def read_member(path: str) -> bytes | None:
+    """Bytes of one member, for previews; ``None`` if it is gone or too large."""
+    container, name = split_member_path(path)
+    if name is None or not os.path.isfile(container):
+        return None
+    try:
+        for member, _ in iter_members(container):
+            if member.name == name:
+                if member.size > MAX_MEMBER_BYTES:
+                    return None
+                return member.read()
+    except (ContainerError, OSError, zipfile.BadZipFile, tarfile.TarError):
+        return None
+    return None
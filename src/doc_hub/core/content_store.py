@@ -0,0 +1,62 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import FileContent, IndexedFile
+from src.doc_hub.core.text_codec import compress_text, decompress_text
+
+
+class ContentStore:
+    """
+    Extracted document text, compressed and keyed by ``indexed_file.id``.
+    Rows go away with their file through ``ON DELETE CASCADE``.
+    """
+
+    @staticmethod
+    def save_many(session: Session, items: list[tuple[int, str]]):
+        """Upserts ``(file_id, text)`` pairs. The caller commits."""
+        if not items:
+            return
+        rows = []
+        for file_id, text in items:
+            codec, data, raw_size = compress_text(text or "")
+            rows.append({"file_id": file_id, "codec": codec, "raw_size": raw_size, "data": data})
+        stmt = insert(FileContent)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FileContent.file_id],
+            set_={
+                "codec": stmt.excluded.codec,
+                "raw_size": stmt.excluded.raw_size,
+                "data": stmt.excluded.data,
+            },
+        )
+        session.execute(stmt, rows)
+
+    @staticmethod
+    def load(session: Session, file_id: int) -> str | None:
+        row = session.execute(
+            select(FileContent.codec, FileContent.data).where(FileContent.file_id == file_id)
+        ).first()
+        return decompress_text(row.codec, row.data) if row else None
+
+    @staticmethod
+    def load_by_path(session: Session, file_path: str) -> str | None:
+        row = session.execute(
+            select(FileContent.codec, FileContent.data)
+            .join(IndexedFile, IndexedFile.id == FileContent.file_id)
+            .where(IndexedFile.file_path == file_path)
+        ).first()
+        return decompress_text(row.codec, row.data) if row else None
+
+    @staticmethod
+    def load_many(session: Session, file_ids: list[int]) -> dict[int, str]:
+        contents = {}
+        file_ids = list(file_ids)
+        for start in range(0, len(file_ids), 500):
+            rows = session.execute(
+                select(FileContent.file_id, FileContent.codec, FileContent.data)
+                .where(FileContent.file_id.in_(file_ids[start:start + 500]))
+            )
+            for file_id, codec, data in rows:
+                contents[file_id] = decompress_text(codec, data)
+        return contents
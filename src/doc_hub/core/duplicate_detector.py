@@ -1,55 +1,150 @@
 import os
-import hashlib
 import json
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime, UTC
 
+from src.doc_hub.core.hashing import DEFAULT_ALGORITHM, EDGE_BYTES, HashingService
+
 REPORT_DIR = Path(__file__).resolve().parents[2] / "database" / "reports"
 os.makedirs(REPORT_DIR, exist_ok=True)
 
+
+class DuplicateStats:
+    def __init__(self):
+        self.files = 0
+        self.size_candidates = 0
+        self.edge_candidates = 0
+        self.bytes_total = 0
+        self.bytes_read = 0
+        # Distinct bytes looked at; a fully hashed file's ends were read twice.
+        self.bytes_covered = 0
+
+    @property
+    def bytes_skipped(self) -> int:
+        return max(0, self.bytes_total - self.bytes_covered)
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "size_candidates": self.size_candidates,
+            "edge_candidates": self.edge_candidates,
+            "bytes_total": self.bytes_total,
+            "bytes_read": self.bytes_read,
+            "bytes_covered": self.bytes_covered,
+            "bytes_skipped": self.bytes_skipped,
+        }
+
+    def __str__(self):
+        share = self.bytes_skipped / self.bytes_total * 100 if self.bytes_total else 0.0
+        return (
+            f"{self.files} files, {self.size_candidates} share a size, {self.edge_candidates} fully hashed; "
+            f"read {self.bytes_read / 1024 ** 2:.1f} MB, skipped {self.bytes_skipped / 1024 ** 2:.1f} "
+            f"of {self.bytes_total / 1024 ** 2:.1f} MB ({share:.1f}%)"
+        )
+
+
 class DuplicateDetector:
-    def __init__(self, root_paths):
+    """
+    Finds byte-identical files in stages so most data is never read: files
+    are grouped by size, same-size files are compared by a hash of their
+    first and last 64 KiB, and only files that still match are hashed whole.
+    Empty files are ignored.
+    """
+
+    def __init__(self, root_paths, algorithm: str = DEFAULT_ALGORITHM, hash_workers: int | None = None,
+                 progress=None, edge_bytes: int = EDGE_BYTES):
         self.root_paths = [Path(p) for p in root_paths if Path(p).exists()]
+        self.hashing = HashingService(algorithm, hash_workers)
+        self.progress = progress or (lambda message: None)
+        self.edge_bytes = edge_bytes
+        self.stats = DuplicateStats()
 
     def _iter_files(self):
-        for root in self.root_paths:
-            if not root.exists():
+        """Yields ``(path, size, mtime)`` for every regular file under the roots."""
+        stack = [str(root) for root in self.root_paths]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stats = entry.stat(follow_symlinks=False)
+                                yield entry.path, stats.st_size, stats.st_mtime
+                        except OSError:
+                            continue
+            except OSError:
                 continue
-            for p in root.rglob("*"):
-                if p.is_file():
-                    yield p
 
-    @staticmethod
-    def _file_hash(path):
-        h = hashlib.sha256()
-        try:
-            with open(path, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    h.update(chunk)
-            return h.hexdigest()
-        except Exception:
-            return None
+    def _group_by_size(self) -> dict[int, list]:
+        by_size = defaultdict(list)
+        for path, size, mtime in self._iter_files():
+            self.stats.files += 1
+            self.stats.bytes_total += size
+            if size:
+                by_size[size].append((path, mtime))
+        return {size: files for size, files in by_size.items() if len(files) > 1}
+
+    def _regroup(self, groups: dict, edge_bytes: int | None) -> dict:
+        # Splits every group by digest and keeps the sub-groups that still
+        # hold more than one file. Keys become (size, digest).
+        sizes = {}
+        mtimes = {}
+        for key, files in groups.items():
+            size = key[0] if isinstance(key, tuple) else key
+            for path, mtime in files:
+                sizes[path] = size
+                mtimes[path] = mtime
+
+        regrouped = defaultdict(list)
+        for path, digest in self.hashing.hash_files(list(sizes), edge_bytes=edge_bytes):
+            size = sizes[path]
+            if edge_bytes:
+                self.stats.bytes_read += min(size, edge_bytes * 2)
+                self.stats.bytes_covered += min(size, edge_bytes * 2)
+            else:
+                self.stats.bytes_read += size
+                self.stats.bytes_covered += size - self.edge_bytes * 2
+            if digest:
+                regrouped[(size, digest)].append((path, mtimes[path]))
+        return {key: files for key, files in regrouped.items() if len(files) > 1}
 
     def find_duplicates(self):
-        hash_map = defaultdict(list)
-        for p in self._iter_files():
-            key = self._file_hash(p)
-            if not key:
-                continue
-            try:
-                stat = p.stat()
-                hash_map[key].append({
-                    "path": str(p),
-                    "size": stat.st_size,
-                    "mtime": datetime.fromtimestamp(stat.st_mtime, UTC).isoformat()
-                })
-            except Exception:
-                continue
+        self.stats = DuplicateStats()
+        self.progress("Grouping files by size...")
+        groups = self._group_by_size()
+        self.stats.size_candidates = sum(len(files) for files in groups.values())
+
+        self.progress(f"Comparing the ends of {self.stats.size_candidates} same-size file(s)...")
+        groups = self._regroup(groups, self.edge_bytes)
+
+        # Files no longer than both ends were hashed whole in the edge pass.
+        done = {key: files for key, files in groups.items() if key[0] <= self.edge_bytes * 2}
+        pending = {key: files for key, files in groups.items() if key[0] > self.edge_bytes * 2}
+        self.stats.edge_candidates = sum(len(files) for files in pending.values())
+        if pending:
+            self.progress(f"Hashing {self.stats.edge_candidates} candidate file(s) in full...")
+            done.update(self._regroup(pending, None))
+
+        duplicates = {}
+        for (size, digest), files in done.items():
+            duplicates[digest] = [
+                {
+                    "path": path,
+                    "size": size,
+                    "mtime": datetime.fromtimestamp(mtime, UTC).isoformat(),
+                }
+                for path, mtime in sorted(files)
+            ]
+        self.progress(f"Duplicate scan finished: {self.stats}")
 
-        duplicates = {k: v for k, v in hash_map.items() if len(v) > 1}
         report = {
             "generated_at": datetime.now(UTC).isoformat(),
+            "hash_algorithm": self.hashing.algorithm,
+            "stats": self.stats.as_dict(),
             "duplicate_groups": duplicates
         }
 
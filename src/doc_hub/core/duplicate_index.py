@@ -0,0 +1,98 @@
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import get_session, DuplicateGroup, IndexedFile
+from src.doc_hub.core.hashing import HashingService
+
+BACKFILL_BATCH_SIZE = 500
+
+_SET_HASH = (
+    update(IndexedFile.__table__)
+    .where(IndexedFile.__table__.c.id == bindparam("file_id"))
+    .values(content_hash=bindparam("digest"))
+)
+
+
+class DuplicateIndex:
+    """
+    Read side of the ``duplicate_group`` table. The table itself is kept
+    current by triggers whenever the indexer writes a ``content_hash``, so
+    listing duplicates never touches the files.
+    """
+
+    @staticmethod
+    def summary(session: Session) -> tuple[int, int, int]:
+        """Returns ``(groups, files, wasted_bytes)``."""
+        groups, files, wasted = session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(DuplicateGroup.file_count), 0),
+                func.coalesce(func.sum(DuplicateGroup.wasted_bytes), 0),
+            )
+        ).one()
+        return groups, files, wasted
+
+    @staticmethod
+    def groups(session: Session, offset: int = 0, limit: int = 200) -> list[DuplicateGroup]:
+        """One page of groups, the most wasted space first."""
+        return session.scalars(
+            select(DuplicateGroup)
+            .order_by(DuplicateGroup.wasted_bytes.desc(), DuplicateGroup.content_hash)
+            .offset(offset)
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def files(session: Session, content_hash: str) -> list[IndexedFile]:
+        return session.scalars(
+            select(IndexedFile)
+            .where(IndexedFile.content_hash == content_hash)
+            .order_by(IndexedFile.file_path)
+        ).all()
+
+    @staticmethod
+    def backfill_hashes(progress=None, hashing: HashingService | None = None) -> int:
+        """
+        Hashes catalog files indexed before ``content_hash`` existed. The
+        scanner fills the column for new and changed files, so this only
+        has work to do once per catalog.
+        """
+        progress = progress or (lambda message: None)
+        hashing = hashing or HashingService()
+        session = get_session()
+        hashed = 0
+        try:
+            total = session.scalar(
+                select(func.count()).select_from(IndexedFile).where(IndexedFile.content_hash.is_(None))
+            ) or 0
+            if not total:
+                return 0
+            last_id = 0
+            while True:
+                rows = session.execute(
+                    select(IndexedFile.id, IndexedFile.file_path)
+                    .where(IndexedFile.id > last_id, IndexedFile.content_hash.is_(None))
+                    .order_by(IndexedFile.id)
+                    .limit(BACKFILL_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                ids = {path: file_id for file_id, path in rows}
+                updates = [
+                    {"file_id": ids[path], "digest": digest}
+                    for path, digest in hashing.hash_files(list(ids))
+                    if digest
+                ]
+                if updates:
+                    session.execute(_SET_HASH, updates)
+                session.commit()
+                hashed += len(updates)
+                progress(f"Hashed {hashed}/{total} catalog files...")
+            return hashed
+        except Exception as e:
+            print(f"Content hash backfill failed: {e}")
+            session.rollback()
+            return hashed
+        finally:
+            session.close()
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import EnrichmentTask
+
+MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_FAILED = "failed"
+
+
+class EnrichmentQueue:
+    """
+    Persistent queue of files waiting for AI tags and a summary. Rows live in
+    ``enrichment_task`` so pending work survives restarts; a finished task is
+    deleted, a task that keeps failing is parked as ``failed``.
+    """
+
+    @staticmethod
+    def enqueue(session: Session, file_paths: list[str]):
+        if not file_paths:
+            return
+        now = datetime.now(UTC)
+        for start in range(0, len(file_paths), 200):
+            rows = [
+                {"file_path": path, "status": STATUS_PENDING, "attempts": 0, "next_attempt_at": now}
+                for path in file_paths[start:start + 200]
+            ]
+            stmt = insert(EnrichmentTask).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[EnrichmentTask.file_path],
+                set_={
+                    "status": STATUS_PENDING,
+                    "attempts": 0,
+                    "next_attempt_at": now,
+                    "last_error": None,
+                },
+            )
+            session.execute(stmt)
+
+    @staticmethod
+    def claim(session: Session, limit: int) -> list[tuple[int, str]]:
+        """
+        Marks up to ``limit`` due tasks as running and returns their ``(id, path)``.
+        Callers finish a task by id: a move re-keys its path while the model runs.
+        """
+        if limit <= 0:
+            return []
+        now = datetime.now(UTC)
+        rows = session.execute(
+            select(EnrichmentTask.id, EnrichmentTask.file_path)
+            .where(EnrichmentTask.status == STATUS_PENDING, EnrichmentTask.next_attempt_at <= now)
+            .order_by(EnrichmentTask.next_attempt_at)
+            .limit(limit)
+        ).all()
+        if rows:
+            session.execute(
+                update(EnrichmentTask)
+                .where(EnrichmentTask.id.in_([task_id for task_id, _ in rows]))
+                .values(status=STATUS_RUNNING)
+            )
+            session.commit()
+        return [(task_id, path) for task_id, path in rows]
+
+    @staticmethod
+    def current_path(session: Session, task_id: int) -> str | None:
+        # None once the file was removed while its task was running.
+        return session.scalar(select(EnrichmentTask.file_path).where(EnrichmentTask.id == task_id))
+
+    @staticmethod
+    def complete(session: Session, task_id: int):
+        session.execute(delete(EnrichmentTask).where(EnrichmentTask.id == task_id))
+
+    @staticmethod
+    def fail(session: Session, task_id: int, error: str):
+        task = session.get(EnrichmentTask, task_id)
+        if task is None:
+            return
+        task.attempts = (task.attempts or 0) + 1
+        task.last_error = error[:500]
+        if task.attempts >= MAX_ATTEMPTS:
+            task.status = STATUS_FAILED
+            return
+        delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (task.attempts - 1))
+        task.status = STATUS_PENDING
+        task.next_attempt_at = datetime.now(UTC) + timedelta(seconds=delay)
+
+    @staticmethod
+    def release_running(session: Session):
+        # Tasks left "running" by a previous session were interrupted.
+        session.execute(
+            update(EnrichmentTask)
+            .where(EnrichmentTask.status == STATUS_RUNNING)
+            .values(status=STATUS_PENDING)
+        )
+        session.commit()
+
+    @staticmethod
+    def remove(session: Session, file_paths: list[str]):
+        if file_paths:
+            session.execute(delete(EnrichmentTask).where(EnrichmentTask.file_path.in_(file_paths)))
+
+    @staticmethod
+    def pending_count(session: Session) -> int:
+        return session.scalar(
+            select(func.count()).select_from(EnrichmentTask).where(EnrichmentTask.status != STATUS_FAILED)
+        ) or 0
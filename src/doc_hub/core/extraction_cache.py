@@ -0,0 +1,152 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, UTC
+
+from src.doc_hub.core.text_codec import compress_text, decompress_text
+
+# Kept apart from the catalog so it survives a rebuild, a deleted
+# doc_hub.db or a folder that is removed and added again. Imports nothing
+# from the database module: it is opened inside the extraction workers.
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "extraction_cache.db"
+)
+BUSY_TIMEOUT_MS = 5000
+
+_local = threading.local()
+
+
+def cache_path() -> str | None:
+    """``DOC_HUB_EXTRACTION_CACHE`` overrides the location; ``off`` disables the cache."""
+    value = os.getenv("DOC_HUB_EXTRACTION_CACHE", DEFAULT_CACHE_PATH).strip()
+    if value.lower() in ("", "0", "off", "false", "no"):
+        return None
+    return value
+
+
+def _connect() -> sqlite3.Connection | None:
+    path = cache_path()
+    if path is None:
+        return None
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == path:
+        return conn
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                content_hash TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                display_type TEXT NOT NULL,
+                ai_eligible INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                raw_size INTEGER NOT NULL,
+                data BLOB,
+                truncated INTEGER NOT NULL DEFAULT 0,
+                date_cached TEXT,
+                PRIMARY KEY (content_hash, extractor, version)
+            ) WITHOUT ROWID
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(extraction_cache)")}
+        if "truncated" not in columns:
+            conn.execute("ALTER TABLE extraction_cache ADD COLUMN truncated INTEGER NOT NULL DEFAULT 0")
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Extraction cache unavailable at {path}: {e}")
+        return None
+    _local.conn, _local.path = conn, path
+    return conn
+
+
+def _split_key(key: str) -> tuple[str, int]:
+    name, _, version = key.rpartition(":")
+    return name, int(version)
+
+
+class ExtractionCache:
+    """
+    Extracted text keyed by ``(content_hash, extractor, version)``. Identical
+    copies share one entry, and bumping a version in ``EXTRACTOR_VERSIONS``
+    only invalidates the formats that extractor handles.
+    """
+
+    @staticmethod
+    def get(content_hash: str, extractor_key: str) -> tuple[str, str, bool, bool] | None:
+        """The cached ``(display_type, content, ai_eligible, truncated)``, or ``None`` on a miss."""
+        conn = _connect()
+        if conn is None or not content_hash:
+            return None
+        name, version = _split_key(extractor_key)
+        try:
+            row = conn.execute(
+                "SELECT display_type, ai_eligible, codec, data, truncated FROM extraction_cache "
+                "WHERE content_hash = ? AND extractor = ? AND version = ?",
+                (content_hash, name, version),
+            ).fetchone()
+            if row is None:
+                return None
+            return row[0], decompress_text(row[2], row[3]), bool(row[1]), bool(row[4])
+        except Exception as e:
+            print(f"Extraction cache read failed: {e}")
+            return None
+
+    @staticmethod
+    def put(content_hash: str, extractor_key: str, extraction: tuple[str, str, bool, bool]):
+        conn = _connect()
+        if conn is None or not content_hash:
+            return
+        name, version = _split_key(extractor_key)
+        display_type, content, ai_eligible, truncated = extraction
+        codec, data, raw_size = compress_text(content or "")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO extraction_cache "
+                "(content_hash, extractor, version, display_type, ai_eligible, codec, raw_size, data, truncated, "
+                "date_cached) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (content_hash, name, version, display_type, int(bool(ai_eligible)), codec, raw_size, data,
+                 int(bool(truncated)), datetime.now(UTC).isoformat()),
+            )
+            conn.commit()
+        except Exception as e:
+            print(f"Extraction cache write failed: {e}")
+            conn.rollback()
+
+    @staticmethod
+    def prune(current_versions: dict[str, int]) -> int:
+        """Drops entries written by extractor versions that are no longer current."""
+        conn = _connect()
+        if conn is None:
+            return 0
+        removed = conn.execute(
+            "DELETE FROM extraction_cache WHERE NOT EXISTS "
+            "(SELECT 1 FROM json_each(?) WHERE key = extractor AND value = version)",
+            (json.dumps(current_versions),),
+        ).rowcount
+        conn.commit()
+        return removed
+
+    @staticmethod
+    def summary() -> list[tuple[str, int, int, int]]:
+        """``(extractor, version, entries, stored_bytes)`` rows."""
+        conn = _connect()
+        if conn is None:
+            return []
+        return conn.execute(
+            "SELECT extractor, version, COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM extraction_cache "
+            "GROUP BY extractor, version ORDER BY extractor, version"
+        ).fetchall()
+
+    @staticmethod
+    def clear():
+        conn = _connect()
+        if conn is None:
+            return
+        conn.execute("DELETE FROM extraction_cache")
+        conn.commit()
+        conn.execute("VACUUM")
+
@@ -0,0 +1,128 @@
+import io
+import os
+from pathlib import Path
+
+from src.doc_hub.core.containers import MAX_MEMBER_BYTES, TOO_LARGE, iter_members, member_path
+from src.doc_hub.core.extraction_cache import ExtractionCache
+from src.doc_hub.core.file_processing import (
+    EXTRACTION_ERROR, IMAGE_EXTENSIONS, container_suffix, extract_content, extractor_key,
+)
+from src.doc_hub.core.hashing import hash_bytes, hash_file
+from src.doc_hub.core.image_hash import image_hashes
+from src.doc_hub.core.minhash import minhash_signature
+from src.doc_hub.core.native_extractors import ocr_pdf_page
+
+# One container task handles at most this many changed members, or this
+# much extracted text, before handing back; the pipeline then submits the
+# next slice. Keeps each result small and each slice within its timeout.
+# Compressed tars cannot resume and are always read whole.
+CONTAINER_SLICE_MEMBERS = 200
+CONTAINER_SLICE_BYTES = 32 * 1024 * 1024
+# As in CatalogSnapshot, which cannot be imported here.
+MTIME_TOLERANCE = 0.001
+
+
+# Runs inside the extraction process pool. Keep this module free of database
+# and Qt imports so spawned workers start quickly and never touch the catalog.
+def extract_file_task(path: str, known_hash: str | None = None):
+    """
+    Returns ``(content_hash, extraction, features)``. ``extraction`` is
+    ``None`` when the file still hashes to ``known_hash``, e.g. after a touch
+    or a copy that preserved the bytes, so the file is not extracted again.
+    ``features`` holds the similarity fingerprints: ``minhash`` for the
+    extracted text and ``image_hash`` (dHash, pHash) for images.
+
+    Other files are looked up in the extraction cache first, so a rebuild
+    or a copy of an already seen file skips Tika and OCR.
+    """
+    content_hash = hash_file(path)
+    if known_hash and content_hash == known_hash:
+        return content_hash, None, {}
+    file_path = Path(path)
+    return content_hash, *_extract_cached(content_hash, path, file_path, file_path.suffix)
+
+
+def ocr_pdf_page_task(path: str, page: int) -> str:
+    """OCR text of one PDF page without a text layer, run in the OCR pool."""
+    return ocr_pdf_page(path, page)
+
+
+def _extract_cached(content_hash: str, path: str, source, suffix: str):
+    key = extractor_key(path)
+    extraction = ExtractionCache.get(content_hash, key)
+    if extraction is None:
+        extraction = extract_content(source, suffix)
+        if extraction[0] != EXTRACTION_ERROR:
+            ExtractionCache.put(content_hash, key, extraction)
+    features = {"minhash": minhash_signature(extraction[1])}
+    if suffix.lower() in IMAGE_EXTENSIONS:
+        features["image_hash"] = image_hashes(source)
+    return extraction, features
+
+
+def _member_unchanged(known: tuple | None, path: str, size: int, mtime: float) -> bool:
+    if known is None:
+        return False
+    known_size, known_mtime, extractor = known
+    return (
+        known_size == size
+        and known_mtime is not None
+        and abs(known_mtime - mtime) < MTIME_TOLERANCE
+        and (extractor is None or extractor == extractor_key(path))
+    )
+
+
+def extract_container_task(path: str, known_hash: str | None = None, known_members: dict | None = None,
+                           start=None):
+    """
+    Extracts one slice of an archive or mailbox. Returns
+    ``(content_hash, names, members, cursor)``:
+
+    - ``content_hash`` of the container, only for the first slice;
+    - ``names`` of the members seen in this slice, or ``None`` when the
+      container still hashes to ``known_hash``;
+    - ``members``, a list of ``(member_path, size, mtime, outcome)`` where
+      ``outcome`` is ``None`` for a member whose size and mtime match
+      ``known_members`` (``member_path -> (size, mtime, extractor)``),
+      ``TOO_LARGE``, or ``(content_hash, extraction, features)`` as from
+      ``extract_file_task``;
+    - ``cursor`` to pass as ``start`` for the next slice, ``None`` at the end.
+    """
+    known_members = known_members or {}
+    content_hash = None
+    if start is None:
+        content_hash = hash_file(path)
+        if known_hash and content_hash == known_hash:
+            return content_hash, None, [], None
+    names = []
+    members = []
+    extracted = 0
+    text_bytes = 0
+    for member, cursor in iter_members(path, start):
+        names.append(member.name)
+        virtual_path = member_path(path, member.name)
+        if _member_unchanged(known_members.get(virtual_path), virtual_path, member.size, member.mtime):
+            members.append((virtual_path, member.size, member.mtime, None))
+            continue
+        nested = container_suffix(member.name)
+        if nested:
+            # Archives inside archives are not opened.
+            extraction = (f"unsupported ({nested})", "", False, False)
+            members.append((virtual_path, member.size, member.mtime, (None, extraction, {})))
+            continue
+        data = member.read() if member.size <= MAX_MEMBER_BYTES else b""
+        if member.size > MAX_MEMBER_BYTES or len(data) > MAX_MEMBER_BYTES:
+            members.append((virtual_path, member.size, member.mtime, TOO_LARGE))
+            continue
+        member_hash = hash_bytes(data)
+        extraction, features = _extract_cached(
+            member_hash, virtual_path, io.BytesIO(data), os.path.splitext(member.name)[1]
+        )
+        members.append((virtual_path, member.size, member.mtime, (member_hash, extraction, features)))
+        extracted += 1
+        text_bytes += len(extraction[1])
+        full = extracted >= CONTAINER_SLICE_MEMBERS or text_bytes >= CONTAINER_SLICE_BYTES
+        if full and cursor is not None:
+            return content_hash, names, members, cursor
+    return content_hash, names, members, None
+
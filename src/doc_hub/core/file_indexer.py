@@ -1,13 +1,9 @@
 import os
 from datetime import datetime, UTC
-from pathlib import Path
 from PySide6.QtCore import QObject, Signal
-from sqlalchemy.orm import Session
-from whoosh.writing import AsyncWriter
-from src.doc_hub.core.database import get_session, WatchedFolder, IndexedFile, DATABASE_DIR
+from src.doc_hub.core.database import get_session, WatchedFolder, DATABASE_DIR
 from src.doc_hub.core.search_index_service import SearchIndexService
-from src.doc_hub.core.ai_service import AIService
-from src.doc_hub.core.file_processing import extract_content_from_file, is_dir_ignored, is_file_ignored
+from src.doc_hub.core.scan_pipeline import ScanPipeline
 
 INDEX_LOG_FILE = os.path.join(DATABASE_DIR, "indexed_files.log")
 
@@ -15,17 +11,37 @@ class FileIndexWorker(QObject):
     finished = Signal()
     progress_updated = Signal(str)
 
-    def __init__(self):
+    def __init__(self, **pipeline_options):
         super().__init__()
         self.index_service = SearchIndexService()
-        self.ai_service = AIService()
+        self.pipeline_options = pipeline_options
+        self.pipeline = None
+        self.changed_paths = []
+        self.removed_paths = []
+        self.moved_paths = []
+
+    def set_changes(self, changed: list[str], removed: list[str], moved: list):
+        self.changed_paths = changed
+        self.removed_paths = removed
+        self.moved_paths = moved
+
+    def stop(self):
+        if self.pipeline is not None:
+            self.pipeline.stop()
 
     def run_scan(self):
         self.progress_updated.emit("Starting full scan...")
         session = get_session()
-        writer = self.index_service.get_writer()
+        if self.index_service.backend.needs_rebuild():
+            self.progress_updated.emit("Search index needs rebuilding, refilling it from the catalog...")
+            try:
+                self.index_service.rebuild_from_catalog(session, progress=self.progress_updated.emit)
+            except Exception as e:
+                print(f"Error rebuilding search index: {e}")
+                session.rollback()
+        writer = self.index_service.get_writer(session=session)
         if writer is None:
-            self.progress_updated.emit("Could not acquire Whoosh writer. Skipping scan.")
+            self.progress_updated.emit("Could not acquire search index writer. Skipping scan.")
             self.finished.emit()
             session.close()
             return
@@ -36,34 +52,37 @@ class FileIndexWorker(QObject):
             folders = session.query(WatchedFolder).all()
             if not folders:
                 self.progress_updated.emit("No watched folders found. Add one in Settings.")
-                self.finished.emit()
-                session.close()
                 return
 
+            roots = []
             for folder in folders:
                 folder_path = folder.file_path
                 if not os.path.exists(folder_path):
                     self.progress_updated.emit(f"Skipping missing folder: {folder_path}")
                     continue
-
-                self.progress_updated.emit(f"Scanning {folder_path}...")
-                for root, dirs, files in os.walk(folder_path, topdown=True):
-                    dirs[:] = [d for d in dirs if not is_dir_ignored(d)]
-                    for filename in files:
-                        if is_file_ignored(filename):
-                            continue
-                        try:
-                            file_path = Path(os.path.join(root, filename))
-                            if file_path.is_file():
-                                self._process_file(session, writer, file_path)
-                        except (OSError, FileNotFoundError) as e:
-                            print(f"Skipping file {filename}: {e}")
-
-            self.progress_updated.emit("Scan completed successfully.")
+                roots.append(folder_path)
+
+            self.progress_updated.emit(f"Scanning {len(roots)} folder(s)...")
+            self.pipeline = ScanPipeline(
+                session,
+                self.index_service,
+                writer,
+                progress=self.progress_updated.emit,
+                log_path=INDEX_LOG_FILE,
+                **self.pipeline_options,
+            )
+            self.pipeline.run(roots)
+
+            summary = self.pipeline.throughput_message()
+            with open(INDEX_LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(f"--- Scan finished at {datetime.now(UTC)}: {summary} ---\n")
+            self.progress_updated.emit(f"Scan completed successfully. {summary}")
         except Exception as e:
             print(f"Error during scan: {e}")
             self.progress_updated.emit(f"Error during scan: {e}")
         finally:
+            if self.pipeline is not None:
+                writer = self.pipeline.writer
             try:
                 self.index_service.commit_writer(writer)
             except Exception as e:
@@ -72,81 +91,37 @@ class FileIndexWorker(QObject):
                 session.close()
             self.finished.emit()
 
-    def _process_file(self, session: Session, writer: AsyncWriter, file_path: Path):
+    def run_changes(self):
+        session = get_session()
+        writer = self.index_service.get_writer(session=session)
+        if writer is None:
+            self.progress_updated.emit("Could not acquire search index writer. Skipping update.")
+            self.finished.emit()
+            session.close()
+            return
         try:
-            str_path = str(file_path)
-            stats = file_path.stat()
-            file_mod_time = datetime.fromtimestamp(stats.st_mtime, UTC)
-            file_size = stats.st_size
-
-            existing_file = session.query(IndexedFile).filter_by(file_path=str_path).first()
-            if existing_file and existing_file.date_modified >= file_mod_time:
-                return
-
-            display_type, content, ai_eligible = extract_content_from_file(file_path)
-            if not content or display_type.startswith("unsupported"):
-                return
-
-            ai_tags = ""
-            ai_summary = ""
-            if ai_eligible:
-                try:
-                    self.progress_updated.emit(f"Generating AI tags for {file_path.name}...")
-                    ai_tags, ai_summary = self.ai_service.get_tags_and_summary(content)
-                except Exception as e:
-                    print(f"AI tagging skipped/failed for {file_path}: {e}")
-
-            self.progress_updated.emit(f"Processing {file_path.name}...")
-
-            if not existing_file:
-                new_file = IndexedFile(
-                    file_name=file_path.name,
-                    file_path=str_path,
-                    file_type=display_type,
-                    file_size=file_size,
-                    date_modified=file_mod_time,
-                    extracted_content="",
-                    ai_tags="",
-                    ai_summary=""
-                )
-                session.add(new_file)
-                session.flush()
-            else:
-                existing_file.file_name = file_path.name
-                existing_file.file_type = display_type
-                existing_file.file_size = file_size
-                existing_file.date_modified = file_mod_time
-                existing_file.extracted_content = ""
-                existing_file.ai_tags = ""
-                existing_file.ai_summary = ""
-                existing_file.date_indexed = datetime.now(UTC)
-                new_file = existing_file
-
-            session.commit()
-
-            if content:
-                ai_tags = ""
-                ai_summary = ""
-                try:
-                    self.progress_updated.emit(f"Generating AI tags for {file_path.name}...")
-                    ai_tags, ai_summary = self.ai_service.get_tags_and_summary(content)
-                except Exception as e:
-                    print(f"AI tagging failed for {file_path}: {e}")
-
-                new_file.extracted_content = content
-                new_file.ai_tags = ai_tags
-                new_file.ai_summary = ai_summary
-                new_file.date_indexed = datetime.now(UTC)
-                session.commit()
-
-                self.index_service.add_or_update_document(writer, new_file, ai_tags, ai_summary)
-
-                try:
-                    with open(INDEX_LOG_FILE, "a", encoding="utf-8") as f:
-                        f.write(f"{str_path}\n")
-                except Exception as log_e:
-                    print(f"Failed to write to index log file: {log_e}")
-
+            count = len(self.changed_paths) + len(self.removed_paths) + len(self.moved_paths)
+            self.progress_updated.emit(f"Updating index for {count} changed path(s)...")
+            self.pipeline = ScanPipeline(
+                session,
+                self.index_service,
+                writer,
+                progress=self.progress_updated.emit,
+                log_path=INDEX_LOG_FILE,
+                **self.pipeline_options,
+            )
+            self.pipeline.run_changes(self.changed_paths, self.removed_paths, self.moved_paths)
+            self.progress_updated.emit(f"Index updated. {self.pipeline.throughput_message()}")
         except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-            session.rollback()
+            print(f"Error during incremental update: {e}")
+            self.progress_updated.emit(f"Error during incremental update: {e}")
+        finally:
+            if self.pipeline is not None:
+                writer = self.pipeline.writer
+            try:
+                self.index_service.commit_writer(writer)
+            except Exception as e:
+                print(f"Error committing writer: {e}")
+            if session.is_active:
+                session.close()
+            self.finished.emit()
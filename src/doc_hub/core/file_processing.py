@@ -1,6 +1,6 @@
-import csv
 import fnmatch
-import json
+import math
+import os
 from pathlib import Path
 
 try:
@@ -10,8 +10,9 @@ except Exception:
     tika_parser = None
     _HAS_TIKA = False
 
-from PIL import Image
-import pytesseract
+from src.doc_hub.core import ocr
+from src.doc_hub.core.native_extractors import NATIVE_EXTRACTORS, native_extractor_name
+from src.doc_hub.core.text_reader import clip_text, max_text_bytes, read_csv_preview, read_notebook_sources, read_text, sniff
 
 IGNORED_DIRS = {
     '.git', '.hg', '.svn', '.idea', '.vs', '.vscode', '.config', '.local', 'snap', '.var',
@@ -62,66 +63,218 @@ COMPLEX_MIME_PREFIXES = (
 
 IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
 
+# Archives and mailboxes whose members are indexed one by one, see
+# ``containers``. Longer suffixes first so ``.tar.gz`` wins over ``.gz``.
+CONTAINER_SUFFIXES = (
+    '.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar', '.zip', '.mbox',
+)
+# Compressed tars cannot seek, so they are read in one streaming pass rather
+# than in resumable slices; their time limit grows with the archive instead.
+STREAMED_CONTAINER_SUFFIXES = {'.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz'}
+STREAMED_BYTES_PER_TIMEOUT = 64 * 1024 * 1024
+# Every task hashes its file before extracting it, inside the same time
+# limit. The limit grows by the time this rate needs for the file, which
+# covers slow disks and network shares, so a large file that no extractor
+# reads is not quarantined for a hashing timeout.
+HASH_BYTES_PER_SECOND = 32 * 1024 * 1024
+
+# Bump an extractor's version when its output changes; cached outcomes from
+# older versions are then ignored for the formats it handles.
+EXTRACTOR_VERSIONS = {
+    "notebook": 2,
+    "csv": 2,
+    "ocr": 2,
+    "image": 1,
+    "text": 2,
+    "pdf": 4,
+    "ooxml": 1,
+    "email": 1,
+    "container": 1,
+    "tika": 1,
+    "none": 1,
+}
+
+# Wall-clock seconds and address-space bytes one file may use in an
+# extraction worker. Past either limit the file is quarantined until it
+# changes. OCR and Tika get more time; the in-process PDF and Office
+# parsers get more memory.
+DEFAULT_EXTRACTION_TIMEOUT = 60
+EXTRACTION_TIMEOUTS = {
+    "text": 30,
+    "csv": 30,
+    "notebook": 30,
+    "ocr": 180,
+    "tika": 180,
+    "pdf": 180,
+    # One scanned page, see ``ocr_pdf_page``.
+    "pdf_page": 180,
+    # One slice of an archive or mailbox, see ``CONTAINER_SLICE_MEMBERS``.
+    "container": 600,
+}
+DEFAULT_MEMORY_LIMIT = 2 * 1024 ** 3
+EXTRACTION_MEMORY_LIMITS = {
+    "pdf": 3 * 1024 ** 3,
+    "pdf_page": 3 * 1024 ** 3,
+    "ooxml": 3 * 1024 ** 3,
+    "container": 3 * 1024 ** 3,
+}
+
+# Display type for files whose extraction raised; never cached as a result.
+EXTRACTION_ERROR = "error"
 
-def extract_content_from_file(file_path: Path) -> (str, str, bool):
-    suffix = file_path.suffix.lower()
+
+def extractor_name(suffix: str) -> str:
+    suffix = suffix.lower()
+    if suffix == ".ipynb":
+        return "notebook"
+    if suffix == ".csv":
+        return "csv"
+    if suffix in IMAGE_EXTENSIONS:
+        return "ocr" if ocr.available() else "image"
+    if suffix in CODE_EXTENSIONS or suffix in TEXT_EXTENSIONS:
+        return "text"
+    native = native_extractor_name(suffix)
+    if native:
+        return native
+    return "tika" if _HAS_TIKA else "none"
+
+
+def container_suffix(path: str) -> str | None:
+    """The archive or mailbox suffix of ``path``, e.g. ``.tar.gz``, or ``None``."""
+    name = path.lower()
+    return next((suffix for suffix in CONTAINER_SUFFIXES if name.endswith(suffix)), None)
+
+
+def is_container(path: str) -> bool:
+    return container_suffix(path) is not None
+
+
+def _path_extractor(path: str) -> str:
+    if is_container(path):
+        return "container"
+    return extractor_name(os.path.splitext(path)[1])
+
+
+def extractor_key(path: str) -> str:
+    """``name:version`` of the extractor that handles ``path``."""
+    name = _path_extractor(path)
+    return f"{name}:{EXTRACTOR_VERSIONS[name]}"
+
+
+def extraction_limits(path: str) -> tuple[float, int]:
+    """``(timeout_seconds, memory_bytes)`` for the extractor that handles ``path``."""
+    timeout, memory_limit = limits_for(_path_extractor(path))
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    if container_suffix(path) in STREAMED_CONTAINER_SUFFIXES:
+        timeout *= max(1, math.ceil(size / STREAMED_BYTES_PER_TIMEOUT))
+    return timeout + size / HASH_BYTES_PER_SECOND, memory_limit
+
+
+def limits_for(name: str) -> tuple[float, int]:
+    """``extraction_limits`` by extractor name."""
+    return (
+        EXTRACTION_TIMEOUTS.get(name, DEFAULT_EXTRACTION_TIMEOUT),
+        EXTRACTION_MEMORY_LIMITS.get(name, DEFAULT_MEMORY_LIMIT),
+    )
+
+
+def extract_content_from_file(file_path: Path) -> (str, str, bool, bool):
+    """
+    Returns ``(display_type, content, ai_eligible, truncated)``. Content is
+    capped at ``max_text_bytes()``; ``truncated`` says the file held more.
+    """
+    return extract_content(file_path, file_path.suffix)
+
+
+def extract_content(source, suffix: str) -> (str, str, bool, bool):
+    """
+    Like ``extract_content_from_file`` for a path or a seekable binary file
+    object, such as an archive member read into memory. ``suffix`` picks the
+    extractor.
+    """
+    limit = max_text_bytes()
+    display_type, content, ai_eligible, truncated = _extract(source, suffix.lower(), limit)
+    # Other extractors are capped here, after the fact.
+    content, cut = clip_text(content, limit)
+    truncated = truncated or cut
+    return display_type, content, ai_eligible, truncated
+
+
+def _extract(file_path, suffix: str, max_bytes: int) -> (str, str, bool, bool):
+    in_memory = hasattr(file_path, "read")
 
     if suffix == ".ipynb":
         try:
-            data = json.loads(file_path.read_text(encoding="utf-8", errors="ignore"))
-            cells = ["".join(c.get("source", [])) for c in data.get("cells", [])]
-            content = "\n".join(cells).strip()
-            return ".ipynb", content or "[Empty Jupyter Notebook]", bool(content.strip())
+            content, truncated = read_notebook_sources(file_path, max_bytes)
+            content = content.strip()
+            return ".ipynb", content or "[Empty Jupyter Notebook]", bool(content), truncated
         except Exception as e:
             print(f"Error reading notebook {file_path}: {e}")
-            return "unsupported", "", False
+            return EXTRACTION_ERROR, "", False, False
 
     if suffix == ".csv":
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                reader = csv.reader(f)
-                rows = []
-                for i, row in enumerate(reader):
-                    rows.append(", ".join(row))
-                    if i > 100:
-                        break
-                content = "\n".join(rows)
-                return ".csv", content or "[Empty CSV]", bool(content.strip())
+            is_binary, encoding = sniff(file_path)
+            if is_binary:
+                return f"unsupported ({suffix})", "", False, False
+            content, truncated = read_csv_preview(file_path, encoding, max_bytes)
+            return ".csv", content or "[Empty CSV]", bool(content.strip()), truncated
         except Exception as e:
             print(f"Error reading CSV {file_path}: {e}")
-            return "unsupported", "", False
+            return EXTRACTION_ERROR, "", False, False
 
     if suffix in IMAGE_EXTENSIONS:
+        if not ocr.available():
+            # Still catalogued, for similar-image search.
+            return "image", "", False, False
         try:
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image, lang="eng").strip()
+            text = ocr.ocr_file(file_path)
             if text:
-                return "image_text", text, True
-            return "image", "[No text detected in image]", False
+                return "image_text", text, True, False
+            return "image", "[No text detected in image]", False, False
         except Exception as e:
             print(f"OCR failed for {file_path}: {e}")
-            return "image", "", False
+            return "image", "", False, False
 
     if suffix in CODE_EXTENSIONS or suffix in TEXT_EXTENSIONS:
         try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
+            is_binary, encoding = sniff(file_path)
+            if is_binary:
+                return f"unsupported ({suffix})", "", False, False
+            content, truncated = read_text(file_path, encoding, max_bytes)
             display_type = suffix if suffix else ".txt"
-            return display_type, content, bool(content.strip())
+            return display_type, content, bool(content.strip()), truncated
         except Exception as e:
             print(f"Error reading text file {file_path}: {e}")
-            return "unsupported", "", False
+            return EXTRACTION_ERROR, "", False, False
+
+    if native_extractor_name(suffix):
+        # Falls through to Tika when the native parser gives up on the file.
+        result = NATIVE_EXTRACTORS[suffix](file_path if in_memory else str(file_path), max_bytes)
+        if result is not None:
+            content, truncated = result
+            # Not stripped, not even when blank: the page breaks number the
+            # pages, and tell the scan pipeline which ones to OCR.
+            return suffix, content, bool(content.strip()), truncated
 
     if not _HAS_TIKA:
-        return f"unsupported ({suffix})", "", False
+        return f"unsupported ({suffix})", "", False, False
 
     try:
-        parsed_data = tika_parser.from_file(str(file_path))
+        if in_memory:
+            file_path.seek(0)
+            parsed_data = tika_parser.from_buffer(file_path.read())
+        else:
+            parsed_data = tika_parser.from_file(str(file_path))
         content = parsed_data.get("content") or ""
         metadata = parsed_data.get("metadata") or {}
         mime_type = metadata.get("Content-Type", "application/octet-stream")
 
         if mime_type.startswith("image/"):
-            return "image", "", False
+            return "image", "", False, False
 
         if mime_type.startswith(COMPLEX_MIME_PREFIXES):
             if suffix and suffix in CODE_EXTENSIONS:
@@ -134,14 +287,14 @@ def extract_content_from_file(file_path: Path) -> (str, str, bool):
                 display_type = ".doc"
             else:
                 display_type = suffix or "unsupported"
-            return display_type, content.strip(), bool(content.strip())
+            return display_type, content.strip(), bool(content.strip()), False
 
         if content.strip():
-            return ".txt", content.strip(), True
-        return f"unsupported ({suffix})", "", False
+            return ".txt", content.strip(), True, False
+        return f"unsupported ({suffix})", "", False, False
     except Exception as e:
         print(f"Error reading {file_path} with Tika: {e}")
-        return f"unsupported ({suffix})", "", False
+        return EXTRACTION_ERROR, "", False, False
 
 
 def is_dir_ignored(dir_name: str) -> bool:
@@ -156,3 +309,16 @@ def is_file_ignored(file_name: str) -> bool:
     if fn in IGNORED_FILES:
         return True
     return any(fnmatch.fnmatch(fn, p) for p in IGNORED_FILE_GLOBS)
+
+
+def is_path_ignored(path: str, root: str, is_dir: bool = False) -> bool:
+    try:
+        relative = Path(path).relative_to(root)
+    except ValueError:
+        return True
+    parts = relative.parts
+    if not parts:
+        return False
+    if any(is_dir_ignored(part) for part in parts[:-1]):
+        return True
+    return is_dir_ignored(parts[-1]) if is_dir else is_file_ignored(parts[-1])
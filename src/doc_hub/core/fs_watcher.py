@@ -0,0 +1,183 @@
+import errno
+import os
+import threading
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    _HAS_WATCHDOG = True
+except Exception:
+    FileSystemEventHandler = object
+    Observer = None
+    _HAS_WATCHDOG = False
+
+from src.doc_hub.core.database import DATABASE_DIR
+from src.doc_hub.core.file_processing import is_path_ignored
+
+DEBOUNCE_MS = 1500
+MAX_DELAY_SECONDS = 10.0
+
+CHANGED = "changed"
+REMOVED = "removed"
+# Created within the current batch; delivered as changed. Only such a path
+# can be moved without moving anything in the catalog.
+CREATED = "created"
+
+_WATCH_LIMIT_ERRNOS = {errno.ENOSPC, errno.EMFILE, errno.ENFILE}
+
+
+def watchdog_available() -> bool:
+    return _HAS_WATCHDOG
+
+
+class _RootEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "RecursiveWatcher", root: str):
+        super().__init__()
+        self.watcher = watcher
+        self.root = root
+
+    def on_any_event(self, event):
+        kind = event.event_type
+        if kind == "moved":
+            self.watcher.record_move(self.root, event.src_path, event.dest_path, event.is_directory)
+        elif kind == "deleted":
+            self.watcher.record(self.root, event.src_path, REMOVED, event.is_directory)
+        elif kind == "created":
+            self.watcher.record(self.root, event.src_path, CREATED, event.is_directory)
+        elif kind == "closed" or (kind == "modified" and not event.is_directory):
+            self.watcher.record(self.root, event.src_path, CHANGED, event.is_directory)
+
+
+class RecursiveWatcher(QObject):
+    """
+    Recursive watcher built on watchdog (inotify on Linux). Events are
+    coalesced per path and delivered in batches through ``paths_changed``
+    once the tree has been quiet for ``DEBOUNCE_MS``.
+    """
+
+    paths_changed = Signal(list, list, list)  # changed, removed, moved [src, dest]
+    watch_degraded = Signal(str, str)  # root, reason
+    _event_recorded = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._moves = []
+        self._first_event_at = None
+        self._observer = None
+        self._watches = {}
+        self.degraded_roots = set()
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_MS)
+        self._debounce.timeout.connect(self.flush)
+        self._event_recorded.connect(self._on_event_recorded)
+
+    def set_roots(self, roots: list[str]):
+        if not _HAS_WATCHDOG:
+            return
+        if self._observer is None:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.start()
+
+        wanted = {os.path.normpath(r) for r in roots if r and os.path.isdir(r)}
+        for root in list(self._watches):
+            if root not in wanted:
+                self._observer.unschedule(self._watches.pop(root))
+                self.degraded_roots.discard(root)
+        for root in wanted - set(self._watches) - self.degraded_roots:
+            try:
+                self._watches[root] = self._observer.schedule(
+                    _RootEventHandler(self, root), root, recursive=True
+                )
+                print(f"[Watcher] Watching recursively: {root}")
+            except OSError as e:
+                self.degraded_roots.add(root)
+                if e.errno in _WATCH_LIMIT_ERRNOS:
+                    reason = (
+                        "inotify watch limit reached; raise fs.inotify.max_user_watches. "
+                        "Falling back to periodic rescans."
+                    )
+                else:
+                    reason = f"cannot watch folder ({e}); falling back to periodic rescans."
+                print(f"[Watcher] {root}: {reason}")
+                self.watch_degraded.emit(root, reason)
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(2)
+            self._observer = None
+            self._watches.clear()
+
+    def record(self, root: str, path: str, kind: str, is_dir: bool):
+        if self._is_ignored(root, path, is_dir):
+            return
+        with self._lock:
+            previous = self._pending.get(path)
+            if kind == CHANGED and previous == CREATED:
+                # Writes to a file created in this batch; it is still new.
+                kind = CREATED
+            elif kind == CREATED and previous == REMOVED:
+                # Replaced: the catalog still holds the old file.
+                kind = CHANGED
+            self._pending[path] = kind
+            self._mark_event()
+        self._event_recorded.emit()
+
+    def record_move(self, root: str, src: str, dest: str, is_dir: bool):
+        src_ignored = self._is_ignored(root, src, is_dir)
+        dest_ignored = self._is_ignored(root, dest, is_dir)
+        if src_ignored and dest_ignored:
+            return
+        with self._lock:
+            if src_ignored:
+                self._pending[dest] = CHANGED
+            elif dest_ignored:
+                self._pending[src] = REMOVED
+            elif self._pending.pop(src, None) == CREATED:
+                # Created and moved within one batch: nothing to move in the catalog.
+                self._pending[dest] = CREATED
+            else:
+                # Edited or untouched, the catalog holds ``src``: move it, then rescan.
+                self._moves.append([src, dest])
+                self._pending[dest] = CHANGED
+            self._mark_event()
+        self._event_recorded.emit()
+
+    def _mark_event(self):
+        if self._first_event_at is None:
+            self._first_event_at = time.monotonic()
+
+    @staticmethod
+    def _is_ignored(root: str, path: str, is_dir: bool) -> bool:
+        if path == DATABASE_DIR or path.startswith(os.path.join(DATABASE_DIR, "")):
+            return True
+        return is_path_ignored(path, root, is_dir)
+
+    @Slot()
+    def _on_event_recorded(self):
+        with self._lock:
+            waited = time.monotonic() - self._first_event_at if self._first_event_at else 0.0
+        if waited >= MAX_DELAY_SECONDS:
+            self.flush()
+        else:
+            self._debounce.start()
+
+    @Slot()
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            moves, self._moves = self._moves, []
+            self._first_event_at = None
+        if not pending and not moves:
+            return
+        changed = sorted(p for p, kind in pending.items() if kind in (CHANGED, CREATED))
+        removed = sorted(p for p, kind in pending.items() if kind == REMOVED)
+        self.paths_changed.emit(changed, removed, moves)
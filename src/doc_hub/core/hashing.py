@@ -0,0 +1,129 @@
+import hashlib
+import mmap
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# sha256 is what the catalog stores in ``content_hash``; blake2b is faster
+# for one-off comparisons whose digests are never persisted.
+DEFAULT_ALGORITHM = "sha256"
+ALGORITHMS = ("sha256", "blake2b")
+
+READ_BUFFER_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 32 * 1024 * 1024
+# Bytes taken from each end of a file for a quick pre-comparison.
+EDGE_BYTES = 64 * 1024
+DEFAULT_HASH_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+
+def new_hasher(algorithm: str = DEFAULT_ALGORITHM):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+    return hashlib.new(algorithm)
+
+
+def hash_file(path: str, algorithm: str = DEFAULT_ALGORITHM) -> str | None:
+    """
+    Hex digest of the file, or ``None`` if it cannot be read. Large files
+    are hashed from a memory map in one call, smaller ones through a
+    reused 1 MiB buffer; hashlib releases the GIL for both.
+    """
+    h = new_hasher(algorithm)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        h.update(mapped)
+                    return h.hexdigest()
+                except (OSError, ValueError):
+                    # Some file systems cannot be mapped; fall back to reads.
+                    h = new_hasher(algorithm)
+                    f.seek(0)
+            buffer = bytearray(READ_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                h.update(view[:read])
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+def hash_bytes(data: bytes, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """Hex digest of in-memory data, e.g. an archive member; equals ``hash_file`` of the same bytes."""
+    h = new_hasher(algorithm)
+    h.update(data)
+    return h.hexdigest()
+
+
+def hash_file_edges(path: str, algorithm: str = DEFAULT_ALGORITHM, edge_bytes: int = EDGE_BYTES) -> str | None:
+    """
+    Digest of the first and last ``edge_bytes`` of the file. Files no longer
+    than both ends together are hashed whole, so for them the result equals
+    ``hash_file``.
+    """
+    try:
+        size = os.stat(path).st_size
+        if size <= edge_bytes * 2:
+            return hash_file(path, algorithm)
+        h = new_hasher(algorithm)
+        with open(path, "rb", buffering=0) as f:
+            h.update(f.read(edge_bytes))
+            f.seek(-edge_bytes, os.SEEK_END)
+            h.update(f.read(edge_bytes))
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+class HashingService:
+    """
+    Hashes many files on a thread pool. ``hash_files`` streams results as
+    they finish so callers can act on early files while large ones are
+    still being read.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, workers: int | None = None):
+        new_hasher(algorithm)
+        self.algorithm = algorithm
+        try:
+            env_workers = int(os.getenv("DOC_HUB_HASH_WORKERS", DEFAULT_HASH_WORKERS))
+        except (TypeError, ValueError):
+            env_workers = DEFAULT_HASH_WORKERS
+        self.workers = max(1, workers or env_workers)
+
+    def hash_file(self, path: str) -> str | None:
+        return hash_file(path, self.algorithm)
+
+    def hash_files(self, paths, edge_bytes: int | None = None):
+        """
+        Yields ``(path, digest)`` in completion order; ``digest`` is ``None``
+        for unreadable files. ``paths`` may be a lazy iterable; only a few
+        files per worker are queued at a time. With ``edge_bytes`` only the
+        ends of each file are hashed, see ``hash_file_edges``.
+        """
+        paths = iter(paths)
+        max_pending = self.workers * 4
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash") as executor:
+            pending = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        path = next(paths)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if edge_bytes:
+                        future = executor.submit(hash_file_edges, path, self.algorithm, edge_bytes)
+                    else:
+                        future = executor.submit(hash_file, path, self.algorithm)
+                    pending[future] = path
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
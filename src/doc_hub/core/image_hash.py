@@ -0,0 +1,139 @@
+from PIL import Image
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+HASH_BITS = 64
+DHASH_SIZE = 8
+PHASH_SIZE = 32
+PHASH_LOW_FREQ = 8
+# Decoding at a reduced size first keeps large JPEGs cheap; the hashes only
+# ever look at a 32x32 thumbnail.
+DRAFT_SIZE = (PHASH_SIZE * 4, PHASH_SIZE * 4)
+
+_MASK = (1 << HASH_BITS) - 1
+
+if _HAS_NUMPY:
+    _k = np.arange(PHASH_SIZE)
+    _DCT = np.sqrt(2.0 / PHASH_SIZE) * np.cos(np.pi * (2 * _k[None, :] + 1) * _k[:, None] / (2 * PHASH_SIZE))
+    _DCT[0] /= np.sqrt(2.0)
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bool(bit))
+    return value
+
+
+def dhash(image: Image.Image) -> int:
+    """Difference hash: is each pixel brighter than its right neighbour, on a 9x8 thumbnail."""
+    small = image.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BILINEAR)
+    pixels = list(small.getdata())
+    width = DHASH_SIZE + 1
+    return _bits_to_int(
+        pixels[row * width + col] > pixels[row * width + col + 1]
+        for row in range(DHASH_SIZE)
+        for col in range(DHASH_SIZE)
+    )
+
+
+def phash(image: Image.Image) -> int | None:
+    """
+    DCT hash: the 8x8 lowest frequencies of a 32x32 thumbnail compared with
+    their median. More robust than dHash to recompression and small edits.
+    Needs NumPy.
+    """
+    if not _HAS_NUMPY:
+        return None
+    small = image.convert("L").resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:PHASH_LOW_FREQ, :PHASH_LOW_FREQ].flatten()
+    median = np.median(low[1:])
+    return _bits_to_int(low > median)
+
+
+def image_hashes(path: str) -> tuple[int, int | None] | None:
+    """``(dhash, phash)`` for an image file, or ``None`` if it cannot be decoded."""
+    try:
+        with Image.open(path) as image:
+            image.draft("L", DRAFT_SIZE)
+            image = image.convert("L")
+            return dhash(image), phash(image)
+    except Exception:
+        return None
+
+
+def to_signed(value: int | None) -> int | None:
+    """SQLite integers are signed 64-bit."""
+    if value is None:
+        return None
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & _MASK).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance. A lookup only descends into
+    children whose edge distance lies within ``max_distance`` of the query's
+    distance to the node, so small radii touch a small part of the tree.
+    Each node keeps every item sharing its exact hash.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value: int, item):
+        value &= _MASK
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int, list]]:
+        """Returns ``(distance, hash, items)`` for every node within ``max_distance``."""
+        if self._root is None:
+            return []
+        value &= _MASK
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                found.append((distance, node[0], node[1]))
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in node[2].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return sorted(found, key=lambda match: match[0])
+
+    def nodes(self):
+        """Yields ``(hash, items)`` for every distinct hash."""
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node[0], node[1]
+            stack.extend(node[2].values())
@@ -0,0 +1,140 @@
+from pathlib import Path
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import get_session, ImageHash, IndexedFile
+from src.doc_hub.core.file_processing import IMAGE_EXTENSIONS
+from src.doc_hub.core.image_hash import BKTree, image_hashes, to_signed
+
+DEFAULT_MAX_DISTANCE = 8
+BACKFILL_BATCH_SIZE = 200
+
+
+class SimilarImageIndex:
+    """
+    Finds resized, recompressed or re-exported copies of images. Hashes are
+    computed when an image is extracted; lookups go through a BK-tree built
+    from the ``image_hash`` table, using pHash when it is available for
+    every image and dHash otherwise.
+    """
+
+    def __init__(self):
+        self.tree = None
+        self.kind = None
+
+    @staticmethod
+    def save_many(session: Session, items: list[tuple[int, tuple | None]]):
+        """Stores ``(file_id, (dhash, phash))`` pairs. The caller commits."""
+        rows = [
+            {"file_id": file_id, "dhash": to_signed(hashes[0]), "phash": to_signed(hashes[1])}
+            for file_id, hashes in items if hashes
+        ]
+        if not rows:
+            return
+        stmt = insert(ImageHash)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ImageHash.file_id],
+                set_={"dhash": stmt.excluded.dhash, "phash": stmt.excluded.phash},
+            ),
+            rows,
+        )
+
+    @staticmethod
+    def backfill(progress=None) -> int:
+        """Hashes catalog images indexed before perceptual hashes were stored."""
+        progress = progress or (lambda message: None)
+        session = get_session()
+        hashed = 0
+        try:
+            last_id = 0
+            while True:
+                rows = session.execute(
+                    select(IndexedFile.id, IndexedFile.file_path)
+                    .where(
+                        IndexedFile.id > last_id,
+                        IndexedFile.file_type.in_(("image", "image_text")),
+                        ~exists().where(ImageHash.file_id == IndexedFile.id),
+                    )
+                    .order_by(IndexedFile.id)
+                    .limit(BACKFILL_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                items = [
+                    (file_id, image_hashes(path))
+                    for file_id, path in rows
+                    if Path(path).suffix.lower() in IMAGE_EXTENSIONS
+                ]
+                SimilarImageIndex.save_many(session, items)
+                session.commit()
+                hashed += sum(1 for _, hashes in items if hashes)
+                progress(f"Hashed {hashed} images...")
+            return hashed
+        except Exception as e:
+            print(f"Image hash backfill failed: {e}")
+            session.rollback()
+            return hashed
+        finally:
+            session.close()
+
+    def build(self, session: Session) -> int:
+        """Loads every stored hash into a fresh BK-tree; returns the image count."""
+        missing_phash = session.scalar(select(func.count()).where(ImageHash.phash.is_(None)))
+        column = ImageHash.phash if not missing_phash else ImageHash.dhash
+        self.kind = column.key
+        self.tree = BKTree()
+        for file_id, value in session.execute(select(ImageHash.file_id, column)):
+            self.tree.add(value, file_id)
+        return len(self.tree)
+
+    def similar_to(self, session: Session, file_id: int, max_distance: int = DEFAULT_MAX_DISTANCE):
+        """Images within ``max_distance`` bits of ``file_id`` as ``(path, distance)``, closest first."""
+        if self.tree is None:
+            self.build(session)
+        value = session.scalar(select(getattr(ImageHash, self.kind)).where(ImageHash.file_id == file_id))
+        if value is None:
+            return []
+        matches = {}
+        for distance, _, items in self.tree.search(value, max_distance):
+            for item in items:
+                if item != file_id:
+                    matches[item] = distance
+        paths = dict(session.execute(
+            select(IndexedFile.id, IndexedFile.file_path).where(IndexedFile.id.in_(list(matches)))
+        ).all())
+        return sorted(((paths[i], d) for i, d in matches.items() if i in paths), key=lambda m: (m[1], m[0]))
+
+    def groups(self, session: Session, max_distance: int = DEFAULT_MAX_DISTANCE) -> list[list[str]]:
+        """Clusters of image paths linked by hashes at most ``max_distance`` bits apart, largest first."""
+        if self.tree is None:
+            self.build(session)
+        parent = {}
+
+        def find(i):
+            parent.setdefault(i, i)
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for value, items in self.tree.nodes():
+            root = find(items[0])
+            for item in items[1:]:
+                parent[find(item)] = root
+            for _, _, neighbours in self.tree.search(value, max_distance):
+                parent[find(neighbours[0])] = find(items[0])
+
+        clusters = {}
+        for file_id in parent:
+            clusters.setdefault(find(file_id), []).append(file_id)
+        clusters = [ids for ids in clusters.values() if len(ids) > 1]
+        paths = dict(session.execute(
+            select(IndexedFile.id, IndexedFile.file_path)
+            .where(IndexedFile.id.in_([i for ids in clusters for i in ids]))
+        ).all())
+        result = [sorted(paths[i] for i in ids if i in paths) for ids in clusters]
+        return sorted((g for g in result if len(g) > 1), key=lambda g: (-len(g), g[0]))
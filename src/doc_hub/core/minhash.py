@@ -0,0 +1,89 @@
+import hashlib
+import re
+import zlib
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except Exception:
+    np = None
+    _HAS_NUMPY = False
+
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows: pairs above ~0.7 Jaccard similarity almost always
+# share a bucket, pairs below ~0.5 rarely do.
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 5
+MIN_TOKENS = 20
+# Shingle hashes are sorted and the smallest kept, a consistent sample, so
+# very long documents still compare against each other correctly.
+MAX_SHINGLES = 50000
+SIGNATURE_BYTES = NUM_PERMUTATIONS * 4
+
+_SEED = 0x5EED
+_SHINGLE_MULTIPLIER = 0x100000001B3
+_BLOCK_ROWS = 2048
+_TOKEN_RE = re.compile(r"\w+")
+
+if _HAS_NUMPY:
+    _rng = np.random.default_rng(_SEED)
+    # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits.
+    _A = _rng.integers(0, 2 ** 64, NUM_PERMUTATIONS, dtype=np.uint64, endpoint=False) | np.uint64(1)
+    _B = _rng.integers(0, 2 ** 64, NUM_PERMUTATIONS, dtype=np.uint64, endpoint=False)
+
+
+def available() -> bool:
+    return _HAS_NUMPY
+
+
+def _shingle_hashes(text: str):
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+    token_hashes = np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens)
+    )
+    count = len(token_hashes) - SHINGLE_SIZE + 1
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        shingles = shingles * np.uint64(_SHINGLE_MULTIPLIER) + token_hashes[offset:offset + count]
+    return np.unique(shingles)[:MAX_SHINGLES]
+
+
+def minhash_signature(text: str | None) -> bytes | None:
+    """
+    MinHash signature of the word 5-shingles in ``text``, packed as
+    ``NUM_PERMUTATIONS`` little-endian uint32 values. Returns ``None`` for
+    texts too short to compare or when NumPy is not installed.
+    """
+    if not _HAS_NUMPY or not text:
+        return None
+    shingles = _shingle_hashes(text)
+    if shingles is None:
+        return None
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint32).max, dtype=np.uint32)
+    shift = np.uint64(32)
+    for start in range(0, len(shingles), _BLOCK_ROWS):
+        block = shingles[start:start + _BLOCK_ROWS, None]
+        hashed = ((block * _A + _B) >> shift).astype(np.uint32)
+        np.minimum(signature, hashed.min(axis=0), out=signature)
+    return signature.astype("<u4").tobytes()
+
+
+def unpack(signature: bytes):
+    return np.frombuffer(signature, dtype="<u4")
+
+
+def lsh_buckets(signature: bytes) -> list[int]:
+    """One signed 64-bit bucket key per band."""
+    bands = unpack(signature).reshape(LSH_BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), "little", signed=True)
+        for band in bands
+    ]
+
+
+def similarity(signature, others):
+    """Estimated Jaccard similarity of one unpacked signature against a matrix of them."""
+    return (others == signature).mean(axis=-1)
@@ -0,0 +1,287 @@
+import html
+import logging
+import re
+import zipfile
+from email import policy
+from email.parser import BytesParser
+from xml.etree.ElementTree import iterparse
+
+from src.doc_hub.core import ocr
+from src.doc_hub.core.text_reader import clip_text, max_text_bytes, utf8_size
+
+try:
+    from pypdf import PdfReader
+    _HAS_PYPDF = True
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+except Exception:
+    PdfReader = None
+    _HAS_PYPDF = False
+
+# In-process extractors for the common document formats. Each takes a path
+# or a seekable binary file object and returns ``(text, truncated)``, or
+# ``None`` when it cannot handle the file (encrypted, malformed, an unexpected
+# layout) so the caller falls back to Tika. Reading stops once ``max_bytes``
+# of text (``max_text_bytes()`` by default) has been collected.
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NUMBER_RE = re.compile(r"(\d+)\.xml$")
+
+# Separates pages in the text of paged formats, as pdftotext does.
+PAGE_BREAK = "\f"
+
+OOXML_EXTENSIONS = {".docx", ".xlsx", ".pptx"}
+DOCX_PARTS = ("word/document.xml", "word/footnotes.xml", "word/endnotes.xml")
+# Pages without a text layer are OCR'd from their embedded images, up to
+# this many per document. The scan pipeline runs each as its own task in
+# the OCR pool, see ``ocr_pdf_page``.
+MAX_PDF_OCR_PAGES = 50
+EMAIL_HEADERS = ("From", "To", "Cc", "Date", "Subject")
+_TAG_RE = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n+")
+
+
+class _TextBudget:
+    """Lines collected up to ``max_bytes`` of UTF-8, each counted with its separator."""
+
+    def __init__(self, max_bytes: int | None):
+        self.remaining = max_text_bytes() if max_bytes is None else max_bytes
+        self.lines = []
+        self.truncated = False
+
+    def add(self, line: str) -> bool:
+        """Keeps ``line``, cut to what fits; ``False`` once the cap is reached and reading should stop."""
+        if self.truncated:
+            return False
+        size = utf8_size(line) + 1
+        if size > self.remaining:
+            if self.remaining:
+                self.lines.append(clip_text(line, self.remaining)[0])
+            self.remaining = 0
+            self.truncated = True
+            return False
+        self.lines.append(line)
+        self.remaining -= size
+        return True
+
+    def result(self, separator: str = "\n") -> tuple[str, bool]:
+        return separator.join(self.lines), self.truncated
+
+
+def _numbered(names, prefix: str) -> list[str]:
+    # slide10.xml must come after slide2.xml.
+    parts = [n for n in names if n.startswith(prefix) and _NUMBER_RE.search(n)]
+    return sorted(parts, key=lambda n: int(_NUMBER_RE.search(n).group(1)))
+
+
+def _paragraphs(archive: zipfile.ZipFile, part: str, ns: str, budget: _TextBudget) -> bool:
+    """
+    Streams one XML part into ``budget``, joining ``t`` runs into a line per
+    ``p`` element. Returns ``False`` once the budget is spent.
+    """
+    current = []
+    with archive.open(part) as stream:
+        for _, element in iterparse(stream, events=("end",)):
+            tag = element.tag
+            if tag == f"{ns}t":
+                current.append(element.text or "")
+            elif tag == f"{ns}tab":
+                current.append("\t")
+            elif tag in (f"{ns}br", f"{ns}cr"):
+                current.append("\n")
+            elif tag == f"{ns}p":
+                line = "".join(current).strip()
+                if line and not budget.add(line):
+                    return False
+                current = []
+                element.clear()
+    return True
+
+
+def extract_docx(path, max_bytes: int | None = None) -> tuple[str, bool] | None:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+            if DOCX_PARTS[0] not in names:
+                return None
+            budget = _TextBudget(max_bytes)
+            for part in DOCX_PARTS:
+                if part in names and not _paragraphs(archive, part, _W, budget):
+                    break
+            return budget.result()
+    except Exception:
+        return None
+
+
+def extract_pptx(path, max_bytes: int | None = None) -> tuple[str, bool] | None:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            slides = _numbered(archive.namelist(), "ppt/slides/slide")
+            if not slides:
+                return None
+            budget = _TextBudget(max_bytes)
+            for number, slide in enumerate(slides):
+                # A blank line between slides.
+                if number and not budget.add(""):
+                    break
+                if not _paragraphs(archive, slide, _A, budget):
+                    break
+            text, truncated = budget.result()
+            return text.strip(), truncated
+    except Exception:
+        return None
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    current = []
+    with archive.open("xl/sharedStrings.xml") as stream:
+        for _, element in iterparse(stream, events=("end",)):
+            if element.tag == f"{_S}t":
+                current.append(element.text or "")
+            elif element.tag == f"{_S}si":
+                strings.append("".join(current))
+                current = []
+                element.clear()
+    return strings
+
+
+def extract_xlsx(path, max_bytes: int | None = None) -> tuple[str, bool] | None:
+    """One line per row, cells joined like the CSV extractor does."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            sheets = _numbered(archive.namelist(), "xl/worksheets/sheet")
+            if not sheets:
+                return None
+            strings = _shared_strings(archive)
+            budget = _TextBudget(max_bytes)
+            for sheet in sheets:
+                if budget.truncated:
+                    break
+                with archive.open(sheet) as stream:
+                    cells = []
+                    cell_type, value, inline = None, None, []
+                    for event, element in iterparse(stream, events=("start", "end")):
+                        tag = element.tag
+                        if event == "start":
+                            if tag == f"{_S}c":
+                                cell_type, value, inline = element.get("t"), None, []
+                            continue
+                        if tag == f"{_S}v":
+                            value = element.text
+                        elif tag == f"{_S}t":
+                            inline.append(element.text or "")
+                        elif tag == f"{_S}c":
+                            if cell_type == "s" and value is not None:
+                                index = int(value)
+                                value = strings[index] if index < len(strings) else ""
+                            elif cell_type == "inlineStr":
+                                value = "".join(inline)
+                            if value:
+                                cells.append(value)
+                        elif tag == f"{_S}row":
+                            if cells and not budget.add(", ".join(cells)):
+                                break
+                            cells = []
+                            element.clear()
+            return budget.result()
+    except Exception:
+        return None
+
+
+def ocr_pdf_page(path, number: int) -> str:
+    """OCR text of the images embedded in page ``number`` (from 1) of a PDF."""
+    if not _HAS_PYPDF or not ocr.available():
+        return ""
+    reader = PdfReader(path)
+    if reader.is_encrypted and not reader.decrypt(""):
+        return ""
+    texts = []
+    for embedded in reader.pages[number - 1].images:
+        text = ocr.ocr_image(embedded.image, precheck=False)
+        if text:
+            texts.append(text)
+    return "\n".join(texts).replace(PAGE_BREAK, "\n")
+
+
+def extract_pdf(path, max_bytes: int | None = None) -> tuple[str, bool] | None:
+    """
+    Page texts joined by ``PAGE_BREAK``; empty pages are kept so numbering
+    holds. Pages without a text layer stay empty here, ``ocr_pdf_page``
+    fills them in.
+    """
+    if not _HAS_PYPDF:
+        return None
+    try:
+        reader = PdfReader(path)
+        if reader.is_encrypted and not reader.decrypt(""):
+            return None
+        budget = _TextBudget(max_bytes)
+        for page in reader.pages:
+            text = (page.extract_text() or "").strip()
+            if not budget.add(text.replace(PAGE_BREAK, "\n")):
+                break
+        return budget.result(PAGE_BREAK)
+    except Exception:
+        return None
+
+
+def _html_text(markup: str) -> str:
+    return _BLANK_LINES_RE.sub("\n\n", html.unescape(_TAG_RE.sub(" ", markup)))
+
+
+def _part_text(part) -> str:
+    try:
+        text = part.get_content()
+    except (LookupError, UnicodeError):
+        # An unknown or wrong charset; keep what decodes.
+        text = (part.get_payload(decode=True) or b"").decode("utf-8", errors="replace")
+    return _html_text(text) if part.get_content_type() == "text/html" else text
+
+
+def extract_email(path, max_bytes: int | None = None) -> tuple[str, bool] | None:
+    """Headers, the plain text (or HTML) body and attachment names of an RFC 822 message."""
+    try:
+        if hasattr(path, "read"):
+            path.seek(0)
+            message = BytesParser(policy=policy.default).parse(path)
+        else:
+            with open(path, "rb") as f:
+                message = BytesParser(policy=policy.default).parse(f)
+        lines = [f"{name}: {message[name]}" for name in EMAIL_HEADERS if message[name]]
+        body = message.get_body(preferencelist=("plain", "html"))
+        if body is not None:
+            lines += ["", _part_text(body).strip()]
+        attachments = [part.get_filename() for part in message.iter_attachments() if part.get_filename()]
+        if attachments:
+            lines += ["", "Attachments: " + ", ".join(attachments)]
+        budget = _TextBudget(max_bytes)
+        for line in lines:
+            if not budget.add(line):
+                break
+        return budget.result()
+    except Exception:
+        return None
+
+
+NATIVE_EXTRACTORS = {
+    ".pdf": extract_pdf,
+    ".docx": extract_docx,
+    ".xlsx": extract_xlsx,
+    ".pptx": extract_pptx,
+    ".eml": extract_email,
+}
+
+
+def native_extractor_name(suffix: str) -> str | None:
+    """``pdf``, ``ooxml`` or ``email`` when an in-process extractor handles ``suffix``."""
+    if suffix == ".pdf":
+        return "pdf" if _HAS_PYPDF else None
+    if suffix in OOXML_EXTENSIONS:
+        return "ooxml"
+    if suffix == ".eml":
+        return "email"
+    return None
@@ -0,0 +1,172 @@
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core import minhash
+from src.doc_hub.core.content_store import ContentStore
+from src.doc_hub.core.database import get_session, IndexedFile, NearDupBucket, NearDupSignature
+
+DEFAULT_THRESHOLD = 0.8
+BACKFILL_BATCH_SIZE = 500
+
+
+class NearDuplicateIndex:
+    """
+    Finds files with nearly the same text: re-saved PDFs, lightly edited
+    copies, the same report exported twice. Signatures are computed when a
+    file is extracted; grouping only compares files that share an LSH
+    bucket, never all pairs.
+    """
+
+    @staticmethod
+    def save_many(session: Session, items: list[tuple[int, bytes | None]]):
+        """Stores ``(file_id, signature)`` pairs, replacing old buckets. The caller commits."""
+        if not items or not minhash.available():
+            return
+        for start in range(0, len(items), 500):
+            chunk = items[start:start + 500]
+            session.execute(delete(NearDupBucket).where(NearDupBucket.file_id.in_([i for i, _ in chunk])))
+            stmt = insert(NearDupSignature)
+            session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[NearDupSignature.file_id],
+                    set_={"signature": stmt.excluded.signature},
+                ),
+                [{"file_id": file_id, "signature": signature} for file_id, signature in chunk],
+            )
+            buckets = [
+                {"band": band, "bucket": bucket, "file_id": file_id}
+                for file_id, signature in chunk if signature
+                for band, bucket in enumerate(minhash.lsh_buckets(signature))
+            ]
+            if buckets:
+                session.execute(insert(NearDupBucket).on_conflict_do_nothing(), buckets)
+
+    @staticmethod
+    def backfill(progress=None) -> int:
+        """Signs catalog files extracted before near-duplicate detection existed."""
+        if not minhash.available():
+            print("NumPy is not installed; near-duplicate detection is disabled.")
+            return 0
+        progress = progress or (lambda message: None)
+        session = get_session()
+        signed = 0
+        try:
+            unsigned = ~exists().where(NearDupSignature.file_id == IndexedFile.id)
+            total = session.scalar(select(func.count()).select_from(IndexedFile).where(unsigned)) or 0
+            last_id = 0
+            while signed < total:
+                ids = session.scalars(
+                    select(IndexedFile.id)
+                    .where(IndexedFile.id > last_id, unsigned)
+                    .order_by(IndexedFile.id)
+                    .limit(BACKFILL_BATCH_SIZE)
+                ).all()
+                if not ids:
+                    break
+                last_id = ids[-1]
+                contents = ContentStore.load_many(session, ids)
+                NearDuplicateIndex.save_many(
+                    session, [(file_id, minhash.minhash_signature(contents.get(file_id))) for file_id in ids]
+                )
+                session.commit()
+                signed += len(ids)
+                progress(f"Signed {signed}/{total} files for near-duplicate detection...")
+            return signed
+        except Exception as e:
+            print(f"Near-duplicate backfill failed: {e}")
+            session.rollback()
+            return signed
+        finally:
+            session.close()
+
+    @staticmethod
+    def _signatures(session: Session, file_ids) -> dict:
+        signatures = {}
+        file_ids = list(file_ids)
+        for start in range(0, len(file_ids), 500):
+            rows = session.execute(
+                select(NearDupSignature.file_id, NearDupSignature.signature)
+                .where(NearDupSignature.file_id.in_(file_ids[start:start + 500]))
+            )
+            for file_id, signature in rows:
+                if signature:
+                    signatures[file_id] = minhash.unpack(signature)
+        return signatures
+
+    @staticmethod
+    def groups(session: Session, threshold: float = DEFAULT_THRESHOLD) -> list[list[str]]:
+        """
+        Groups of file paths whose estimated similarity is at least
+        ``threshold``, largest first. Thresholds well below 0.5 miss pairs
+        because such files rarely share a bucket.
+        """
+        if not minhash.available():
+            return []
+        buckets = session.execute(
+            select(func.group_concat(NearDupBucket.file_id))
+            .group_by(NearDupBucket.band, NearDupBucket.bucket)
+            .having(func.count() > 1)
+        ).scalars().all()
+        candidates = [[int(i) for i in members.split(",")] for members in buckets]
+        if not candidates:
+            return []
+        signatures = NearDuplicateIndex._signatures(session, {i for members in candidates for i in members})
+
+        parent = {}
+
+        def find(i):
+            parent.setdefault(i, i)
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for members in candidates:
+            members = [i for i in members if i in signatures]
+            if len(members) < 2:
+                continue
+            matrix = minhash.np.stack([signatures[i] for i in members])
+            for pos, file_id in enumerate(members[:-1]):
+                # Pairs already joined through another band need no comparison.
+                rest = [j for j in range(pos + 1, len(members)) if find(members[j]) != find(file_id)]
+                if not rest:
+                    continue
+                scores = minhash.similarity(matrix[pos], matrix[rest])
+                for j, score in zip(rest, scores):
+                    if score >= threshold:
+                        parent[find(members[j])] = find(file_id)
+
+        clusters = {}
+        for file_id in parent:
+            clusters.setdefault(find(file_id), []).append(file_id)
+        clusters = [ids for ids in clusters.values() if len(ids) > 1]
+
+        paths = dict(session.execute(
+            select(IndexedFile.id, IndexedFile.file_path)
+            .where(IndexedFile.id.in_([i for ids in clusters for i in ids]))
+        ).all())
+        result = [sorted(paths[i] for i in ids if i in paths) for ids in clusters]
+        return sorted((g for g in result if len(g) > 1), key=lambda g: (-len(g), g[0]))
+
+    @staticmethod
+    def similar_to(session: Session, file_id: int, threshold: float = DEFAULT_THRESHOLD) -> list[tuple[str, float]]:
+        """Files resembling ``file_id`` as ``(path, similarity)``, most similar first."""
+        if not minhash.available():
+            return []
+        own = NearDupBucket.__table__.alias("own")
+        candidate_ids = session.scalars(
+            select(NearDupBucket.file_id).distinct()
+            .join(own, (own.c.band == NearDupBucket.band) & (own.c.bucket == NearDupBucket.bucket))
+            .where(own.c.file_id == file_id, NearDupBucket.file_id != file_id)
+        ).all()
+        signatures = NearDuplicateIndex._signatures(session, [file_id, *candidate_ids])
+        if file_id not in signatures or len(signatures) < 2:
+            return []
+        others = [i for i in candidate_ids if i in signatures]
+        scores = minhash.similarity(signatures[file_id], minhash.np.stack([signatures[i] for i in others]))
+        matches = {i: float(s) for i, s in zip(others, scores) if s >= threshold}
+        paths = dict(session.execute(
+            select(IndexedFile.id, IndexedFile.file_path).where(IndexedFile.id.in_(list(matches)))
+        ).all())
+        return sorted(((paths[i], s) for i, s in matches.items() if i in paths), key=lambda m: -m[1])
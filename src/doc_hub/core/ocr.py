@@ -0,0 +1,82 @@
+import functools
+
+import pytesseract
+from PIL import Image, ImageFilter, ImageOps
+
+OCR_LANGUAGE = "eng"
+# Tesseract is tuned for roughly 300 DPI scans; larger images only cost time.
+TARGET_DPI = 300
+MAX_OCR_SIDE = 4000
+MIN_OCR_SIDE = 32
+
+# Text likelihood pre-check. Documents and screenshots are mostly very light
+# or very dark pixels with many sharp edges; photographs are mostly mid-tones
+# and either smooth or uniformly busy.
+PRECHECK_SIDE = 256
+DARK_LEVEL = 80
+LIGHT_LEVEL = 176
+EDGE_LEVEL = 64
+MIN_CONTRAST_SHARE = 0.5
+MIN_EDGE_SHARE = 0.02
+MAX_EDGE_SHARE = 0.5
+
+
+@functools.lru_cache(maxsize=1)
+def available() -> bool:
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def looks_like_text(image: Image.Image) -> bool:
+    """Cheap guess from a small thumbnail; ``False`` means OCR is not worth running."""
+    thumb = image.convert("L")
+    thumb.thumbnail((PRECHECK_SIDE, PRECHECK_SIDE))
+    if min(thumb.size) < 2:
+        return False
+    total = thumb.width * thumb.height
+    levels = thumb.histogram()
+    contrast_share = (sum(levels[:DARK_LEVEL]) + sum(levels[LIGHT_LEVEL:])) / total
+    edges = thumb.filter(ImageFilter.FIND_EDGES).histogram()
+    edge_share = sum(edges[EDGE_LEVEL:]) / total
+    return contrast_share >= MIN_CONTRAST_SHARE and MIN_EDGE_SHARE <= edge_share <= MAX_EDGE_SHARE
+
+
+def prepare(image: Image.Image) -> Image.Image:
+    """Upright grayscale, scaled down to about ``TARGET_DPI`` and at most ``MAX_OCR_SIDE``."""
+    dpi = image.info.get("dpi")
+    image = ImageOps.exif_transpose(image).convert("L")
+    scale = 1.0
+    if dpi and dpi[0] and dpi[0] > TARGET_DPI:
+        scale = TARGET_DPI / float(dpi[0])
+    scale = min(scale, MAX_OCR_SIDE / max(image.size))
+    if scale < 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+
+def ocr_image(image: Image.Image, precheck: bool = True) -> str:
+    """OCR text of an image, ``""`` when it is too small or looks like a photograph."""
+    if min(image.size) < MIN_OCR_SIDE:
+        return ""
+    if precheck and not looks_like_text(image):
+        return ""
+    return pytesseract.image_to_string(prepare(image), lang=OCR_LANGUAGE).strip()
+
+
+def ocr_file(path) -> str:
+    """
+    Runs the pre-check on a reduced JPEG decode first, so the many photos
+    without text are never decoded at full size.
+    """
+    with Image.open(path) as image:
+        if min(image.size) < MIN_OCR_SIDE:
+            return ""
+        image.draft("L", (PRECHECK_SIDE * 2, PRECHECK_SIDE * 2))
+        if not looks_like_text(image):
+            return ""
+    with Image.open(path) as image:
+        return ocr_image(image, precheck=False)
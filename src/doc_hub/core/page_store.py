@@ -0,0 +1,58 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import DocumentPage, IndexedFile
+from src.doc_hub.core.native_extractors import PAGE_BREAK
+from src.doc_hub.core.text_codec import compress_text, decompress_text
+
+# Display types whose extracted text is split into pages.
+PAGED_TYPES = {".pdf"}
+
+
+def split_pages(content: str | None) -> list[str]:
+    """Page texts, numbered from 1 by position; a single page when there are no breaks."""
+    return (content or "").split(PAGE_BREAK)
+
+
+class PageStore:
+    """
+    Per-page text of paged documents, keyed by ``(file_id, page)``. Written
+    alongside ``ContentStore`` so previews and page search never need the
+    whole document in memory.
+    """
+
+    @staticmethod
+    def save_many(session: Session, items: list[tuple[int, str]]):
+        """Replaces the pages of each ``(file_id, text)`` pair. The caller commits."""
+        if not items:
+            return
+        file_ids = [file_id for file_id, _ in items]
+        for start in range(0, len(file_ids), 500):
+            session.execute(delete(DocumentPage).where(DocumentPage.file_id.in_(file_ids[start:start + 500])))
+        rows = []
+        for file_id, content in items:
+            for page, text in enumerate(split_pages(content), start=1):
+                codec, data, raw_size = compress_text(text)
+                rows.append({"file_id": file_id, "page": page, "codec": codec, "raw_size": raw_size, "data": data})
+        for start in range(0, len(rows), 500):
+            session.execute(insert(DocumentPage), rows[start:start + 500])
+
+    @staticmethod
+    def page_count(session: Session, file_path: str) -> int:
+        return session.scalar(
+            select(func.count())
+            .select_from(DocumentPage)
+            .join(IndexedFile, IndexedFile.id == DocumentPage.file_id)
+            .where(IndexedFile.file_path == file_path)
+        ) or 0
+
+    @staticmethod
+    def load_range(session: Session, file_path: str, first: int, last: int) -> dict[int, str]:
+        """``page -> text`` for pages ``first`` to ``last`` inclusive."""
+        rows = session.execute(
+            select(DocumentPage.page, DocumentPage.codec, DocumentPage.data)
+            .join(IndexedFile, IndexedFile.id == DocumentPage.file_id)
+            .where(IndexedFile.file_path == file_path, DocumentPage.page.between(first, last))
+        )
+        return {page: decompress_text(codec, data) for page, codec, data in rows}
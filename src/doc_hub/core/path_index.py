@@ -0,0 +1,110 @@
+import os
+
+from sqlalchemy import and_, delete, exists, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.containers import MEMBER_SEPARATOR, container_path
+from src.doc_hub.core.database import get_session, Directory, IndexedFile
+
+BACKFILL_BATCH_SIZE = 2000
+
+
+def subtree_bounds(root: str) -> tuple[str, str]:
+    """
+    ``[low, high)`` covering every path strictly below ``root``. Comparing
+    against these bounds uses the column's index, unlike ``LIKE 'root/%'``.
+    """
+    prefix = os.path.join(os.path.normpath(root), "")
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def member_bounds(container: str) -> tuple[str, str]:
+    """``[low, high)`` covering the virtual paths of an archive's or mailbox's members."""
+    prefix = os.path.normpath(container) + MEMBER_SEPARATOR
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def in_subtree(column, root: str, include_root: bool = False):
+    low, high = subtree_bounds(root)
+    clause = and_(column >= low, column < high)
+    if include_root:
+        # ``root`` itself, and its members when it is an archive or mailbox.
+        member_low, member_high = member_bounds(root)
+        clause = or_(column == os.path.normpath(root), clause, and_(column >= member_low, column < member_high))
+    return clause
+
+
+def parent_dir(path: str) -> str:
+    """The folder holding ``path``; for archive members, the folder holding the archive."""
+    return os.path.dirname(os.path.normpath(container_path(path)))
+
+
+class DirectoryIndex:
+    """
+    Maps folder paths to ``directory`` ids for ``indexed_file.directory_id``.
+    Ids are cached for the lifetime of the instance, typically one scan.
+    """
+
+    def __init__(self):
+        self._ids = {}
+
+    def ids_for(self, session: Session, dirs) -> dict[str, int]:
+        missing = [d for d in set(dirs) if d not in self._ids]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            session.execute(
+                insert(Directory).on_conflict_do_nothing(index_elements=[Directory.path]),
+                [{"path": d} for d in chunk],
+            )
+            for dir_id, path in session.execute(select(Directory.id, Directory.path).where(Directory.path.in_(chunk))):
+                self._ids[path] = dir_id
+        return {d: self._ids[d] for d in dirs if d in self._ids}
+
+    def forget(self):
+        """Drops cached ids, e.g. after a rollback undid the inserts that created them."""
+        self._ids.clear()
+
+    def assign(self, session: Session, records):
+        """Sets ``parent_dir`` and ``directory_id`` on catalog records from their paths."""
+        records = list(records)
+        ids = self.ids_for(session, {parent_dir(r.file_path) for r in records})
+        for record in records:
+            record.parent_dir = parent_dir(record.file_path)
+            record.directory_id = ids.get(record.parent_dir)
+
+    def prune(self, session: Session, dirs):
+        """Drops the given folders once no catalog file points at them."""
+        dirs = list(set(dirs))
+        for start in range(0, len(dirs), 500):
+            session.execute(
+                delete(Directory)
+                .where(Directory.path.in_(dirs[start:start + 500]))
+                .where(~exists().where(IndexedFile.directory_id == Directory.id))
+            )
+        for d in dirs:
+            self._ids.pop(d, None)
+
+    @staticmethod
+    def backfill():
+        """Fills ``parent_dir`` / ``directory_id`` for rows written before the columns existed."""
+        session = get_session()
+        index = DirectoryIndex()
+        try:
+            filled = 0
+            while True:
+                records = session.scalars(
+                    select(IndexedFile).where(IndexedFile.parent_dir.is_(None)).limit(BACKFILL_BATCH_SIZE)
+                ).all()
+                if not records:
+                    break
+                index.assign(session, records)
+                session.commit()
+                filled += len(records)
+            if filled:
+                print(f" Indexed parent folders for {filled} file(s)")
+        except Exception as e:
+            print(f" Directory backfill failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
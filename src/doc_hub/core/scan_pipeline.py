@@ -0,0 +1,704 @@
+import multiprocessing
+import os
+import queue
+from collections import deque
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from sqlalchemy import select, update, func, literal
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.catalog_snapshot import CatalogSnapshot
+from src.doc_hub.core.catalog_writer import CatalogBatchWriter, DEFAULT_BATCH_SIZE, DEFAULT_MAX_DELAY_MS
+from src.doc_hub.core.containers import TOO_LARGE, ContainerError
+from src.doc_hub.core.content_store import ContentStore
+from src.doc_hub.core.database import IndexedFile, EnrichmentTask
+from src.doc_hub.core.enrichment_queue import EnrichmentQueue
+from src.doc_hub.core.extraction_cache import ExtractionCache
+from src.doc_hub.core.extraction_tasks import extract_container_task, extract_file_task, ocr_pdf_page_task
+from src.doc_hub.core.file_processing import (
+    EXTRACTION_ERROR, container_suffix, extraction_limits, extractor_key, extractor_name, is_container,
+    is_dir_ignored, is_file_ignored, limits_for,
+)
+from src.doc_hub.core.minhash import minhash_signature
+from src.doc_hub.core.native_extractors import MAX_PDF_OCR_PAGES, PAGE_BREAK
+from src.doc_hub.core import ocr
+from src.doc_hub.core.page_store import PAGED_TYPES, split_pages
+from src.doc_hub.core.path_index import DirectoryIndex, in_subtree, member_bounds, parent_dir
+from src.doc_hub.core.skip_cache import (
+    REASON_CRASH, REASON_EMPTY, REASON_MEMORY, REASON_TIMEOUT, REASON_TOO_LARGE, REASON_UNSUPPORTED, SkipCache,
+)
+from src.doc_hub.core.supervised_pool import SupervisedPool, TaskTimeout, WorkerCrashed
+from src.doc_hub.core.tag_store import TagStore
+from src.doc_hub.core.text_reader import clip_text, max_text_bytes
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+DEFAULT_WALKER_COUNT = 4
+DEFAULT_EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Each OCR worker runs a tesseract process, which is itself multi-threaded.
+DEFAULT_OCR_WORKERS = max(1, (os.cpu_count() or 2) // 4)
+DEFAULT_PATH_QUEUE_SIZE = 4096
+
+REPORT_INTERVAL = 2.0
+
+
+def _collapse_paths(roots, files):
+    # Nested roots and files inside a root would be walked twice.
+    collapsed = []
+    for root in sorted({os.path.normpath(r) for r in roots}):
+        if not collapsed or not root.startswith(os.path.join(collapsed[-1], "")):
+            collapsed.append(root)
+    prefixes = tuple(os.path.join(r, "") for r in collapsed)
+    files = sorted({f for f in files if not (prefixes and f.startswith(prefixes))})
+    return collapsed, files
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.busy = 0.0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, count: int = 1, busy: float = 0.0):
+        with self._lock:
+            self.count += count
+            self.busy += busy
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {"count": self.count, "rate": round(self.rate(), 1), "busy": round(self.busy, 2)}
+
+    def __str__(self):
+        return f"{self.name} {self.count} ({self.rate():.1f}/s)"
+
+
+class ScanPipeline:
+    """
+    Staged scan: walker threads produce file paths, a process pool extracts
+    content, and the calling thread is the single writer for the catalog and
+    the search index.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        index_service,
+        writer,
+        progress=None,
+        log_path: str | None = None,
+        walker_count: int | None = None,
+        extract_workers: int | None = None,
+        ocr_workers: int | None = None,
+        path_queue_size: int | None = None,
+        max_in_flight: int | None = None,
+        batch_size: int | None = None,
+        batch_delay_ms: int | None = None,
+        remove_missing: bool = True,
+    ):
+        self.session = session
+        self.index_service = index_service
+        self.progress = progress or (lambda message: None)
+        self.log_path = log_path
+        self.remove_missing = remove_missing
+
+        # Read the environment here rather than at import time so values from
+        # the .env file loaded by AIService are picked up.
+        self.walker_count = walker_count or _env_int("DOC_HUB_SCAN_WALKERS", DEFAULT_WALKER_COUNT)
+        self.extract_workers = extract_workers or _env_int("DOC_HUB_EXTRACT_WORKERS", DEFAULT_EXTRACT_WORKERS)
+        self.ocr_workers = ocr_workers or _env_int("DOC_HUB_OCR_WORKERS", DEFAULT_OCR_WORKERS)
+        self.path_queue_size = path_queue_size or _env_int("DOC_HUB_PATH_QUEUE_SIZE", DEFAULT_PATH_QUEUE_SIZE)
+        self.max_in_flight = max(
+            self.extract_workers,
+            max_in_flight or _env_int("DOC_HUB_EXTRACT_QUEUE_SIZE", self.extract_workers * 4),
+        )
+        self.batch_size = batch_size or _env_int("DOC_HUB_WRITE_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        self.batch_delay_ms = batch_delay_ms or _env_int("DOC_HUB_WRITE_INTERVAL_MS", DEFAULT_MAX_DELAY_MS)
+
+        self.walk_stats = StageStats("walk")
+        self.extract_stats = StageStats("extract")
+        self.write_stats = StageStats("write")
+
+        self.snapshot = CatalogSnapshot()
+        self.directories = DirectoryIndex()
+        self.catalog_writer = CatalogBatchWriter(
+            session, index_service, writer, self.directories, self.batch_size, self.batch_delay_ms
+        )
+        self.unchanged_count = 0
+        self.removed_count = 0
+        self.skipped_count = 0
+        self.quarantined_count = 0
+
+        self._stop = threading.Event()
+        self._failed_dirs = []
+        # Images go to their own smaller pool so a folder of photos cannot
+        # hold up document extraction, and vice versa.
+        self._executors = {}
+        self._lane_load = {"extract": 0, "ocr": 0}
+        self._ocr_backlog = deque()
+        # Archives and mailboxes being extracted, slice by slice.
+        self._containers = {}
+        # PDFs waiting on OCR of their scanned pages, and the (item, page)
+        # jobs not yet handed to the OCR pool.
+        self._scanned = {}
+        self._page_backlog = deque()
+
+    @property
+    def writer(self):
+        """The current search index writer; it is replaced after every committed batch."""
+        return self.catalog_writer.index_writer
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        stats = {s.name: s.as_dict() for s in (self.walk_stats, self.extract_stats, self.write_stats)}
+        stats["unchanged"] = self.unchanged_count
+        stats["removed"] = self.removed_count
+        stats["skipped"] = self.skipped_count
+        stats["quarantined"] = self.quarantined_count
+        return stats
+
+    def throughput_message(self) -> str:
+        stages = " | ".join(str(s) for s in (self.walk_stats, self.extract_stats, self.write_stats))
+        return (
+            f"{stages} | unchanged {self.unchanged_count} | removed {self.removed_count} "
+            f"| skipped {self.skipped_count} | quarantined {self.quarantined_count}"
+        )
+
+    def run(self, roots: list[str], files: list[str] = ()) -> dict:
+        roots, files = _collapse_paths(roots, files)
+        self.snapshot = CatalogSnapshot.load(self.session, roots, files)
+        self.progress(
+            f"Loaded {len(self.snapshot)} catalog entries and {self.snapshot.skipped_count()} skipped files."
+        )
+        path_queue = queue.Queue(maxsize=self.path_queue_size)
+        walk_done = threading.Event()
+        walkers = self._start_walkers(roots, files, path_queue, walk_done)
+        in_flight = {}
+        last_report = time.monotonic()
+
+        try:
+            while not self._stop.is_set():
+                self._fill(path_queue, in_flight)
+
+                if not in_flight:
+                    if (walk_done.is_set() and path_queue.empty() and not self._ocr_backlog
+                            and not self._page_backlog):
+                        break
+                    time.sleep(0.05)
+                else:
+                    done, _ = wait(in_flight, timeout=0.2, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item = in_flight.pop(future)
+                        self._lane_load[future.lane] -= 1
+                        if getattr(future, "page", None):
+                            self._collect_page(future, item)
+                        elif is_container(item[0]):
+                            self._collect_container(future, item, in_flight)
+                        else:
+                            self._collect(future, item)
+
+                if self.catalog_writer.due():
+                    self._flush()
+
+                if time.monotonic() - last_report >= REPORT_INTERVAL:
+                    self.progress(f"Scanning... {self.throughput_message()}")
+                    last_report = time.monotonic()
+
+            self._flush()
+            if self.remove_missing and not self._stop.is_set():
+                self._remove_missing()
+        finally:
+            self._stop.set()
+            for future in in_flight:
+                future.cancel()
+            for executor in self._executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
+            self._executors = {}
+            self._ocr_backlog.clear()
+            self._containers = {}
+            self._scanned = {}
+            self._page_backlog.clear()
+            self._lane_load = {"extract": 0, "ocr": 0}
+            for walker in walkers:
+                walker.join()
+
+        return self.stats()
+
+    def _create_executor(self, workers: int):
+        try:
+            return SupervisedPool(workers, multiprocessing.get_context("spawn"))
+        except (OSError, NotImplementedError) as e:
+            print(f"Process pool unavailable, extracting in threads: {e}")
+            return ThreadPoolExecutor(max_workers=workers)
+
+    def run_changes(self, changed: list[str], removed: list[str], moved: list = ()) -> dict:
+        """Incremental update for paths reported by the file system watcher."""
+        self.move_paths(moved)
+        self.remove_paths(removed)
+        dirs = [p for p in changed if os.path.isdir(p)]
+        files = [p for p in changed if os.path.isfile(p)]
+        if not dirs and not files:
+            return self.stats()
+        return self.run(dirs, files)
+
+    def move_paths(self, moves):
+        """
+        Re-keys catalog rows for renamed files and folders so a move costs an
+        UPDATE instead of a fresh extraction.
+        """
+        for src, dest in moves:
+            try:
+                # Skipped files are re-checked at their new location.
+                SkipCache.forget_subtree(self.session, src)
+                records = self.session.query(IndexedFile).filter(
+                    in_subtree(IndexedFile.file_path, src, include_root=True)
+                ).all()
+                if not records:
+                    continue
+                targets = {r.file_path: dest + r.file_path[len(src):] for r in records}
+                replaced = self.session.scalars(
+                    select(IndexedFile.file_path).where(IndexedFile.file_path.in_(list(targets.values())))
+                ).all()
+                if replaced:
+                    self._delete_files(list(replaced))
+
+                old_dirs = {r.parent_dir for r in records if r.parent_dir}
+                for record in records:
+                    old_path = record.file_path
+                    record.file_path = targets[old_path]
+                    record.file_name = os.path.basename(record.file_path)
+                    self.index_service.delete_document_by_path(self.writer, old_path)
+                self.directories.assign(self.session, records)
+                self.session.execute(
+                    update(EnrichmentTask)
+                    .where(EnrichmentTask.file_path.in_(list(targets)))
+                    .values(file_path=literal(dest) + func.substr(EnrichmentTask.file_path, len(src) + 1))
+                )
+                self.session.flush()
+                self.directories.prune(self.session, old_dirs)
+                contents = ContentStore.load_many(self.session, [r.id for r in records])
+                for record in records:
+                    self.index_service.add_or_update_document(
+                        self.writer, record, record.ai_tags, record.ai_summary, contents.get(record.id, "")
+                    )
+                self.catalog_writer.commit()
+            except Exception as e:
+                print(f"Error moving {src} -> {dest}: {e}")
+                self.catalog_writer.rollback()
+
+    def remove_paths(self, paths: list[str]):
+        """Drops files, or whole folders, that disappeared from disk."""
+        if not paths:
+            return
+        try:
+            doomed = set()
+            for path in paths:
+                SkipCache.forget_subtree(self.session, path)
+                doomed.update(self.session.scalars(
+                    select(IndexedFile.file_path).where(in_subtree(IndexedFile.file_path, path, include_root=True))
+                ))
+            self._delete_files(sorted(doomed))
+        except Exception as e:
+            print(f"Error removing deleted paths: {e}")
+            self.catalog_writer.rollback()
+
+    def _start_walkers(self, roots, files, path_queue: queue.Queue, walk_done: threading.Event):
+        dir_queue = queue.Queue()
+        pending = [0]
+        lock = threading.Lock()
+
+        for root in roots:
+            dir_queue.put((root, False))
+            pending[0] += 1
+        for path in files:
+            dir_queue.put((path, True))
+            pending[0] += 1
+
+        if not pending[0]:
+            walk_done.set()
+            return []
+
+        def walker():
+            while not self._stop.is_set() and not walk_done.is_set():
+                try:
+                    path, is_file = dir_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                try:
+                    if is_file:
+                        self._walk_file(path, path_queue, lock)
+                    else:
+                        self._walk_directory(path, dir_queue, path_queue, pending, lock)
+                finally:
+                    with lock:
+                        pending[0] -= 1
+                        if pending[0] == 0:
+                            walk_done.set()
+
+        threads = [
+            threading.Thread(target=walker, name=f"scan-walker-{i}", daemon=True)
+            for i in range(self.walker_count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _walk_directory(self, directory: str, dir_queue, path_queue, pending, lock):
+        started = time.perf_counter()
+        found = 0
+        unchanged_here = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if self._stop.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not is_dir_ignored(entry.name):
+                                with lock:
+                                    pending[0] += 1
+                                dir_queue.put((entry.path, False))
+                            continue
+                        if is_file_ignored(entry.name) or not entry.is_file():
+                            continue
+                        stats = entry.stat()
+                    except OSError as e:
+                        print(f"Skipping file {entry.name}: {e}")
+                        continue
+                    found += 1
+                    known, unchanged = self.snapshot.check(entry.path, stats.st_size, stats.st_mtime)
+                    if unchanged:
+                        unchanged_here += 1
+                        continue
+                    self._put(path_queue, (entry.path, stats.st_size, stats.st_mtime, stats.st_ino, known))
+        except OSError as e:
+            print(f"Skipping directory {directory}: {e}")
+            self._failed_dirs.append(directory)
+        with lock:
+            self.unchanged_count += unchanged_here
+        self.walk_stats.record(found, time.perf_counter() - started)
+
+    def _walk_file(self, path: str, path_queue, lock):
+        try:
+            stats = os.stat(path)
+        except OSError as e:
+            print(f"Skipping file {path}: {e}")
+            return
+        self.walk_stats.record(1)
+        known, unchanged = self.snapshot.check(path, stats.st_size, stats.st_mtime)
+        if unchanged:
+            with lock:
+                self.unchanged_count += 1
+            return
+        self._put(path_queue, (path, stats.st_size, stats.st_mtime, stats.st_ino, known))
+
+    def _put(self, path_queue: queue.Queue, item):
+        while not self._stop.is_set():
+            try:
+                path_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _fill(self, path_queue: queue.Queue, in_flight: dict):
+        ocr_limit = self.ocr_workers * 2
+        # Pages first: their PDFs are already extracted and waiting.
+        while self._page_backlog and self._lane_load["ocr"] < ocr_limit:
+            self._submit_page(*self._page_backlog.popleft(), in_flight)
+        while self._ocr_backlog and self._lane_load["ocr"] < ocr_limit:
+            self._submit("ocr", self._ocr_backlog.popleft(), in_flight)
+        while self._lane_load["extract"] < self.max_in_flight and len(self._ocr_backlog) < self.path_queue_size:
+            try:
+                item = path_queue.get_nowait()
+            except queue.Empty:
+                return
+            lane = "ocr" if extractor_name(os.path.splitext(item[0])[1]) == "ocr" else "extract"
+            if lane == "ocr" and self._lane_load["ocr"] >= ocr_limit:
+                self._ocr_backlog.append(item)
+                continue
+            self._submit(lane, item, in_flight)
+
+    def _executor(self, lane: str):
+        executor = self._executors.get(lane)
+        if executor is None:
+            # Started lazily so a rescan with nothing to extract never
+            # pays for spawning the worker processes.
+            workers = self.ocr_workers if lane == "ocr" else self.extract_workers
+            executor = self._executors[lane] = self._create_executor(workers)
+        return executor
+
+    def _submit(self, lane: str, item, in_flight: dict, cursor=None):
+        """``cursor`` continues an archive or mailbox where its previous slice stopped."""
+        executor = self._executor(lane)
+        path = item[0]
+        known_hash = self._stored_hash(path) if item[4] and cursor is None else None
+        if is_container(path):
+            if cursor is None:
+                self._containers[path] = {
+                    "known": self.snapshot.take_members(path), "seen": set(), "names": [], "hash": None,
+                }
+            task = (extract_container_task, path, known_hash, self._containers[path]["known"], cursor)
+        else:
+            task = (extract_file_task, path, known_hash)
+        if isinstance(executor, SupervisedPool):
+            timeout, memory_limit = extraction_limits(path)
+            future = executor.submit(*task, timeout=timeout, memory_limit=memory_limit)
+        else:
+            future = executor.submit(*task)
+        future.submitted_at = time.perf_counter()
+        future.lane = lane
+        self._lane_load[lane] += 1
+        in_flight[future] = item
+
+    def _submit_page(self, item, page: int, in_flight: dict):
+        executor = self._executor("ocr")
+        if isinstance(executor, SupervisedPool):
+            timeout, memory_limit = limits_for("pdf_page")
+            future = executor.submit(ocr_pdf_page_task, item[0], page, timeout=timeout, memory_limit=memory_limit)
+        else:
+            future = executor.submit(ocr_pdf_page_task, item[0], page)
+        future.submitted_at = time.perf_counter()
+        future.lane = "ocr"
+        future.page = page
+        self._lane_load["ocr"] += 1
+        in_flight[future] = item
+
+    def _stored_hash(self, path: str) -> str | None:
+        # Only files whose size or mtime changed get here, so this lookup is
+        # rare on a rescan and keeps hashes out of the in-memory snapshot.
+        return self.session.scalar(select(IndexedFile.content_hash).where(IndexedFile.file_path == path))
+
+    def _collect(self, future, item):
+        path, size, mtime, inode, known = item
+        try:
+            content_hash, extraction, features = future.result()
+        except (TaskTimeout, MemoryError, WorkerCrashed) as e:
+            print(f"Quarantined {path}: {e}")
+            reason = (
+                REASON_TIMEOUT if isinstance(e, TaskTimeout)
+                else REASON_MEMORY if isinstance(e, MemoryError) else REASON_CRASH
+            )
+            self._skip(path, size, mtime, known, reason)
+            self.quarantined_count += 1
+            return
+        except Exception as e:
+            print(f"Error extracting {path}: {e}")
+            return
+        finally:
+            self.extract_stats.record(1, time.perf_counter() - future.submitted_at)
+        if extraction is not None and extraction[0] in PAGED_TYPES and ocr.available():
+            pages = split_pages(extraction[1])
+            scanned = [number for number, text in enumerate(pages, start=1) if not text.strip()]
+            if scanned:
+                # OCR'd page by page in the OCR pool, so a long scan neither
+                # holds up the extraction lane nor runs into its time limit.
+                self._scanned[path] = {
+                    "hash": content_hash, "extraction": extraction, "features": features, "pages": pages,
+                    "pending": min(len(scanned), MAX_PDF_OCR_PAGES),
+                }
+                self._page_backlog.extend((item, number) for number in scanned[:MAX_PDF_OCR_PAGES])
+                return
+        self._record(path, size, mtime, inode, known, content_hash, extraction, features)
+
+    def _collect_page(self, future, item):
+        path = item[0]
+        state = self._scanned[path]
+        try:
+            state["pages"][future.page - 1] = future.result()
+        except Exception as e:
+            # The page stays empty; the rest of the document is still indexed.
+            print(f"OCR of page {future.page} of {path} failed: {e}")
+        finally:
+            self.extract_stats.record(1, time.perf_counter() - future.submitted_at)
+        state["pending"] -= 1
+        if state["pending"]:
+            return
+        del self._scanned[path]
+        display_type, _, _, truncated = state["extraction"]
+        content = PAGE_BREAK.join(state["pages"])
+        content, cut = clip_text(content, max_text_bytes())
+        truncated = truncated or cut
+        extraction = (display_type, content, bool(content.strip()), truncated)
+        # Cached with the OCR text, so a rebuild only OCRs pages that had none.
+        ExtractionCache.put(state["hash"], extractor_key(path), extraction)
+        features = dict(state["features"], minhash=minhash_signature(content))
+        self._record(*item, state["hash"], extraction, features)
+
+    def _record(self, path: str, size: int, mtime: float, inode: int | None, known: bool,
+                content_hash: str | None, extraction, features: dict):
+        if extraction is None:
+            self.catalog_writer.touch(path, size, mtime, inode)
+            self.unchanged_count += 1
+            return
+        display_type, content, ai_eligible, truncated = extraction
+        if display_type == EXTRACTION_ERROR:
+            # Possibly transient (Tika down, file locked); try again next scan.
+            return
+        if display_type in PAGED_TYPES and not content.strip():
+            # Only page breaks: a scan OCR could not read.
+            content = ""
+        # Images OCR could not read are still catalogued for similarity search.
+        if display_type.startswith("unsupported") or not (content or features.get("image_hash")):
+            self._skip(
+                path, size, mtime, known,
+                REASON_UNSUPPORTED if display_type.startswith("unsupported") else REASON_EMPTY,
+            )
+            return
+        self.catalog_writer.add(
+            path, size, mtime, display_type, content, ai_eligible, content_hash, inode, features, truncated
+        )
+
+    def _collect_container(self, future, item, in_flight: dict):
+        """
+        Records one slice of an archive or mailbox and submits the next. Once
+        the last slice is in, members that disappeared are dropped and the
+        container itself is catalogued with its member list as content.
+        """
+        path, size, mtime, inode, known = item
+        try:
+            content_hash, names, members, cursor = future.result()
+        except (TaskTimeout, MemoryError, WorkerCrashed, ContainerError) as e:
+            print(f"{'Skipped' if isinstance(e, ContainerError) else 'Quarantined'} {path}: {e}")
+            reason = (
+                REASON_UNSUPPORTED if isinstance(e, ContainerError)
+                else REASON_TIMEOUT if isinstance(e, TaskTimeout)
+                else REASON_MEMORY if isinstance(e, MemoryError) else REASON_CRASH
+            )
+            self._containers.pop(path, None)
+            self._flush()
+            self._skip(path, size, mtime, known, reason)
+            if not known:
+                # Members written by earlier slices of this scan.
+                members = self._member_paths(path)
+                if members:
+                    self._delete_files(members)
+            if reason != REASON_UNSUPPORTED:
+                self.quarantined_count += 1
+            return
+        except Exception as e:
+            print(f"Error extracting {path}: {e}")
+            self._containers.pop(path, None)
+            return
+        finally:
+            self.extract_stats.record(1, time.perf_counter() - future.submitted_at)
+
+        if names is None:
+            self._containers.pop(path, None)
+            self.catalog_writer.touch(path, size, mtime, inode)
+            self.unchanged_count += 1
+            return
+        state = self._containers[path]
+        state["hash"] = state["hash"] or content_hash
+        state["names"].extend(names)
+        for member_path, member_size, member_mtime, outcome in members:
+            state["seen"].add(member_path)
+            entry = state["known"].get(member_path)
+            in_catalog = entry is not None and entry[2] is None
+            if outcome is None:
+                self.unchanged_count += 1
+            elif outcome == TOO_LARGE:
+                self._skip(member_path, member_size, member_mtime, in_catalog, REASON_TOO_LARGE)
+            else:
+                self._record(member_path, member_size, member_mtime, None, in_catalog, *outcome)
+        if cursor is not None:
+            self._submit("extract", item, in_flight, cursor)
+            return
+
+        del self._containers[path]
+        gone = [p for p in state["known"] if p not in state["seen"]]
+        gone_skipped = [p for p in gone if state["known"][p][2] is not None]
+        if gone_skipped:
+            SkipCache.forget(self.session, gone_skipped)
+        gone_rows = [p for p in gone if state["known"][p][2] is None]
+        if gone_rows:
+            self._flush()
+            self._delete_files(gone_rows)
+        listing, truncated = clip_text("\n".join(state["names"]), max_text_bytes())
+        self.catalog_writer.add(
+            path, size, mtime, container_suffix(path), listing, False, state["hash"], inode, {}, truncated,
+        )
+
+    def _skip(self, path: str, size: int, mtime: float, known: bool, reason: str):
+        self.catalog_writer.skip(path, size, mtime, reason)
+        self.skipped_count += 1
+        if known:
+            self._delete_files([path])
+
+    def _flush(self):
+        if not len(self.catalog_writer):
+            return
+        started = time.perf_counter()
+        paths = self.catalog_writer.flush()
+        if not paths:
+            return
+        self._log_written(paths)
+        self.write_stats.record(len(paths), time.perf_counter() - started)
+
+    def _log_written(self, paths):
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for path in paths:
+                    f.write(f"{path}\n")
+        except Exception as log_e:
+            print(f"Failed to write to index log file: {log_e}")
+
+    def _remove_missing(self):
+        missing_skipped = self.snapshot.unseen_skipped(self._failed_dirs)
+        if missing_skipped:
+            try:
+                SkipCache.forget(self.session, missing_skipped)
+                self.catalog_writer.commit()
+            except Exception as e:
+                print(f"Error pruning the skip cache: {e}")
+                self.catalog_writer.rollback()
+        missing = self.snapshot.unseen(self._failed_dirs)
+        if not missing:
+            return
+        self.progress(f"Removing {len(missing)} deleted file(s) from the catalog...")
+        try:
+            self._delete_files(missing)
+        except Exception as e:
+            print(f"Error removing deleted files: {e}")
+            self.catalog_writer.rollback()
+
+    def _member_paths(self, container: str) -> list[str]:
+        low, high = member_bounds(container)
+        return list(self.session.scalars(
+            select(IndexedFile.file_path).where(IndexedFile.file_path >= low, IndexedFile.file_path < high)
+        ))
+
+    def _delete_files(self, paths: list[str]):
+        paths = list(paths)
+        for container in [p for p in paths if is_container(p)]:
+            # Members go with their archive or mailbox.
+            SkipCache.forget_subtree(self.session, container)
+            paths.extend(self._member_paths(container))
+        paths = list(dict.fromkeys(paths))
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            self.session.query(IndexedFile).filter(
+                IndexedFile.file_path.in_(chunk)
+            ).delete(synchronize_session=False)
+            EnrichmentQueue.remove(self.session, chunk)
+            for path in chunk:
+                self.index_service.delete_document_by_path(self.writer, path)
+        TagStore.prune_unused(self.session)
+        self.directories.prune(self.session, {parent_dir(p) for p in paths})
+        self.catalog_writer.commit()
+        self.removed_count += len(paths)
@@ -0,0 +1,416 @@
+import html
+import logging
+import os
+import time
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+from whoosh.fields import Schema, ID, NUMERIC, TEXT, DATETIME
+from whoosh.index import create_in, open_dir, exists_in, LockError
+from whoosh.qparser import MultifieldParser, QueryParser, WildcardPlugin
+from whoosh.query import And, Or, Prefix, Term
+from whoosh.writing import AsyncWriter
+
+from src.doc_hub.core.database import DATABASE_DIR, engine, get_session
+from src.doc_hub.core.native_extractors import PAGE_BREAK
+from src.doc_hub.core.path_index import subtree_bounds
+
+INDEX_DIR = os.path.join(DATABASE_DIR, "whoosh_index")
+PAGE_INDEX_DIR = os.path.join(DATABASE_DIR, "whoosh_pages")
+# Left in the index directory until the index has been refilled from the catalog.
+REBUILD_MARKER = "REBUILD_REQUIRED"
+
+SEARCH_ENGINE_ENV = "DOC_HUB_SEARCH_ENGINE"
+DEFAULT_SEARCH_ENGINE = "whoosh"
+
+# Same ranking for both engines: a name match outweighs summary and tags,
+# which outweigh body text.
+FIELD_BOOSTS = {
+    "file_name": 3.0,
+    "ai_summary": 2.0,
+    "ai_tags": 2.0,
+    "content": 1.0,
+}
+
+FTS_TABLE = "search_fts"
+FTS_DOC_TABLE = "search_doc"
+FTS_PREFIXES = "2 3 4"
+FTS_PAGE_TABLE = "search_page_fts"
+# Page rows live at doc_id * PAGE_ROWID_SPAN + page, so the pages of one
+# document are a rowid range and need no mapping table of their own.
+PAGE_ROWID_SPAN = 1 << 20
+# Matching pages reported per document, best first.
+MAX_PAGE_HITS = 10
+SNIPPET_TOKENS = 16
+_SNIPPET_OPEN = "\x02"
+_SNIPPET_CLOSE = "\x03"
+
+
+def get_index_schema():
+    return Schema(
+        file_path=ID(stored=True, unique=True),
+        file_name=TEXT(stored=True),
+        content=TEXT,
+        date_indexed=DATETIME(stored=True, sortable=True),
+        ai_tags=TEXT(stored=True),
+        ai_summary=TEXT(stored=True)
+    )
+
+
+def get_page_schema():
+    return Schema(
+        parent_path=ID(stored=True),
+        page=NUMERIC(stored=True),
+        content=TEXT,
+    )
+
+
+def selected_engine() -> str:
+    name = (os.getenv(SEARCH_ENGINE_ENV) or DEFAULT_SEARCH_ENGINE).strip().lower()
+    if name not in _BACKENDS:
+        print(f"Unknown search engine '{name}', using {DEFAULT_SEARCH_ENGINE}.")
+        return DEFAULT_SEARCH_ENGINE
+    return name
+
+
+def get_search_backend(name: str | None = None):
+    """Returns the backend chosen by ``DOC_HUB_SEARCH_ENGINE`` (``whoosh`` or ``fts5``)."""
+    return _BACKENDS[name or selected_engine()]()
+
+
+class WhooshBackend:
+    name = "whoosh"
+
+    def __init__(self):
+        self.index_dir = INDEX_DIR
+        self.schema = get_index_schema()
+        self.ix = self._open_index()
+        self.page_ix = self._open_page_index()
+
+    @staticmethod
+    def _open_page_index():
+        if not os.path.exists(PAGE_INDEX_DIR):
+            os.makedirs(PAGE_INDEX_DIR)
+        if exists_in(PAGE_INDEX_DIR):
+            return open_dir(PAGE_INDEX_DIR)
+        return create_in(PAGE_INDEX_DIR, get_page_schema())
+
+    def _open_index(self):
+        if not os.path.exists(self.index_dir):
+            os.makedirs(self.index_dir)
+            logging.info("Created new index directory: %s", self.index_dir)
+            return create_in(self.index_dir, self.schema)
+        if exists_in(self.index_dir):
+            ix = open_dir(self.index_dir)
+            if "file_path" in ix.schema:
+                logging.info("Loaded existing Whoosh index.")
+                return ix
+            # Written by the old IncrementalIndexer (path/content/updated_at);
+            # nothing in it can be queried, so start over from the catalog.
+            ix.close()
+            logging.warning("Whoosh index has an outdated schema — recreating it.")
+            open(os.path.join(self.index_dir, REBUILD_MARKER), "w").close()
+            return create_in(self.index_dir, self.schema)
+        logging.warning("Index not found — creating new index.")
+        return create_in(self.index_dir, self.schema)
+
+    def needs_rebuild(self) -> bool:
+        return os.path.exists(os.path.join(self.index_dir, REBUILD_MARKER))
+
+    def rebuild_done(self):
+        try:
+            os.remove(os.path.join(self.index_dir, REBUILD_MARKER))
+        except FileNotFoundError:
+            pass
+
+    def get_writer(self, retries=3, delay=2, use_async=True, session: Session | None = None):
+        for attempt in range(retries):
+            try:
+                writer = AsyncWriter(self.ix) if use_async else self.ix.writer()
+                logging.info("Whoosh writer acquired (attempt %d).", attempt + 1)
+                return WhooshWriter(writer, self.page_ix, use_async)
+            except LockError:
+                logging.warning(
+                    "Whoosh index locked (attempt %d/%d), retrying in %ds...",
+                    attempt + 1, retries, delay
+                )
+                time.sleep(delay)
+        logging.error("Failed to acquire Whoosh writer after retries.")
+        return None
+
+    def search(self, session: Session, keywords: list[str], path_prefix: str | None, limit: int):
+        """Returns ``[(file_path, snippet)]`` best first; Whoosh gives no snippets."""
+        query_str = " ".join(f"{k}*" for k in keywords)
+        if not query_str:
+            return []
+        with self.ix.searcher() as searcher:
+            parser = MultifieldParser(FIELD_BOOSTS.keys(), schema=self.ix.schema, fieldboosts=FIELD_BOOSTS)
+            parser.add_plugin(WildcardPlugin())
+            keyword_q = parser.parse(query_str)
+            final_query = And([keyword_q, Prefix("file_path", path_prefix)]) if path_prefix else keyword_q
+            results = searcher.search(final_query, limit=limit)
+            return [(hit["file_path"], None) for hit in results]
+
+    def search_pages(self, session: Session, keywords: list[str], file_paths: list[str]) -> dict[str, list[int]]:
+        """``file_path -> [page]`` for the given documents, best page first."""
+        query_str = " ".join(f"{k}*" for k in keywords)
+        if not query_str or not file_paths:
+            return {}
+        pages = {}
+        with self.page_ix.searcher() as searcher:
+            parser = QueryParser("content", schema=self.page_ix.schema)
+            parser.add_plugin(WildcardPlugin())
+            final_query = And([parser.parse(query_str), Or([Term("parent_path", p) for p in file_paths])])
+            for hit in searcher.search(final_query, limit=None):
+                hits = pages.setdefault(hit["parent_path"], [])
+                if len(hits) < MAX_PAGE_HITS:
+                    hits.append(hit["page"])
+        return pages
+
+
+class WhooshWriter:
+    """
+    Writes the document index and, for paged documents, the page index
+    next to it. The page writer is only opened once a page is written, so
+    batches without PDFs never take its lock.
+    """
+
+    def __init__(self, writer, page_ix, use_async: bool = True):
+        self.writer = writer
+        self.page_ix = page_ix
+        self.use_async = use_async
+        self._page_writer = None
+
+    def _pages(self):
+        if self._page_writer is None:
+            self._page_writer = AsyncWriter(self.page_ix) if self.use_async else self.page_ix.writer()
+        return self._page_writer
+
+    def update_document(self, **fields):
+        self.writer.update_document(**fields)
+
+    def update_pages(self, file_path: str, pages: list[str]):
+        """Replaces the page entries of ``file_path``; pass ``[]`` to drop them."""
+        writer = self._pages()
+        writer.delete_by_term("parent_path", file_path)
+        for page, content in enumerate(pages, start=1):
+            if content.strip():
+                writer.add_document(parent_path=file_path, page=page, content=content)
+
+    def delete_by_term(self, field: str, value: str):
+        self.writer.delete_by_term(field, value)
+        if field == "file_path":
+            self._pages().delete_by_term("parent_path", value)
+
+    def commit(self):
+        self.writer.commit()
+        if self._page_writer is not None:
+            self._page_writer.commit()
+            self._page_writer = None
+
+    def cancel(self):
+        self.writer.cancel()
+        if self._page_writer is not None:
+            self._page_writer.cancel()
+            self._page_writer = None
+
+
+class Fts5Writer:
+    """
+    Mirrors the parts of the Whoosh writer API the app uses. Bound to a
+    session, changes join that session's transaction and become visible
+    when the caller commits; otherwise the writer owns its session.
+    """
+
+    def __init__(self, session: Session | None = None):
+        self._owns_session = session is None
+        self.session = session if session is not None else get_session()
+
+    def _doc_id(self, file_path: str):
+        return self.session.execute(
+            text(f"SELECT doc_id FROM {FTS_DOC_TABLE} WHERE file_path = :path"), {"path": file_path}
+        ).scalar()
+
+    def update_document(self, file_path: str, file_name: str = "", content: str = "",
+                        ai_tags: str = "", ai_summary: str = "", **_):
+        doc_id = self._doc_id(file_path)
+        if doc_id is None:
+            doc_id = self.session.execute(
+                text(f"INSERT INTO {FTS_DOC_TABLE} (file_path) VALUES (:path)"), {"path": file_path}
+            ).lastrowid
+        else:
+            self.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": doc_id})
+        self.session.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, file_name, ai_summary, ai_tags, content) "
+                "VALUES (:id, :file_name, :ai_summary, :ai_tags, :content)"
+            ),
+            {
+                "id": doc_id,
+                "file_name": file_name or "",
+                "ai_summary": ai_summary or "",
+                "ai_tags": ai_tags or "",
+                "content": content or "",
+            },
+        )
+
+    def _delete_pages(self, doc_id: int):
+        self.session.execute(
+            text(f"DELETE FROM {FTS_PAGE_TABLE} WHERE rowid >= :low AND rowid < :high"),
+            {"low": doc_id * PAGE_ROWID_SPAN, "high": (doc_id + 1) * PAGE_ROWID_SPAN},
+        )
+
+    def update_pages(self, file_path: str, pages: list[str]):
+        """Replaces the page entries of ``file_path``; call after ``update_document``."""
+        doc_id = self._doc_id(file_path)
+        if doc_id is None:
+            return
+        self._delete_pages(doc_id)
+        rows = [
+            {"id": doc_id * PAGE_ROWID_SPAN + page, "content": content}
+            for page, content in enumerate(pages[:PAGE_ROWID_SPAN - 1], start=1)
+            if content.strip()
+        ]
+        if rows:
+            self.session.execute(text(f"INSERT INTO {FTS_PAGE_TABLE} (rowid, content) VALUES (:id, :content)"), rows)
+
+    def delete_by_term(self, field: str, value: str):
+        if field != "file_path":
+            raise ValueError(f"FTS5 writer can only delete by file_path, not {field}")
+        doc_id = self._doc_id(value)
+        if doc_id is None:
+            return
+        self.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": doc_id})
+        self._delete_pages(doc_id)
+        self.session.execute(text(f"DELETE FROM {FTS_DOC_TABLE} WHERE doc_id = :id"), {"id": doc_id})
+
+    def commit(self):
+        if self._owns_session:
+            try:
+                self.session.commit()
+            finally:
+                self.session.close()
+
+    def cancel(self):
+        if self._owns_session:
+            self.session.rollback()
+            self.session.close()
+
+
+class Fts5Backend:
+    """
+    SQLite FTS5 index inside ``doc_hub.db``. ``search_doc`` maps catalog
+    paths to FTS rowids so deletes never scan the full-text table. The text
+    columns are stored so ``snippet()`` can quote the matching passage.
+    Pages of paged documents go to ``search_page_fts``, addressed by rowid
+    range (see ``PAGE_ROWID_SPAN``).
+    """
+
+    name = "fts5"
+    _schema_ready = False
+
+    def __init__(self):
+        if not Fts5Backend._schema_ready:
+            self.ensure_schema()
+            Fts5Backend._schema_ready = True
+
+    @staticmethod
+    def ensure_schema():
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {FTS_DOC_TABLE} ("
+                "doc_id INTEGER PRIMARY KEY, file_path TEXT NOT NULL UNIQUE)"
+            ))
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "file_name, ai_summary, ai_tags, content, "
+                f"tokenize = 'unicode61 remove_diacritics 2', prefix = '{FTS_PREFIXES}')"
+            ))
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_PAGE_TABLE} USING fts5("
+                "content, "
+                f"tokenize = 'unicode61 remove_diacritics 2', prefix = '{FTS_PREFIXES}')"
+            ))
+
+    def get_writer(self, retries=3, delay=2, use_async=True, session: Session | None = None):
+        return Fts5Writer(session)
+
+    def needs_rebuild(self) -> bool:
+        return False
+
+    def rebuild_done(self):
+        pass
+
+    @staticmethod
+    def build_match(keywords: list[str]) -> str:
+        # Every keyword is a quoted prefix term, implicitly ANDed like the
+        # Whoosh parser. Keywords with nothing to tokenize would match nothing.
+        terms = []
+        for keyword in keywords:
+            if any(ch.isalnum() for ch in keyword):
+                terms.append('"' + keyword.replace('"', '""') + '"*')
+        return " ".join(terms)
+
+    def search(self, session: Session, keywords: list[str], path_prefix: str | None, limit: int):
+        """Returns ``[(file_path, snippet_html)]`` best first."""
+        match = self.build_match(keywords)
+        if not match:
+            return []
+        weights = ", ".join(str(w) for w in FIELD_BOOSTS.values())
+        sql = (
+            f"SELECT d.file_path, snippet({FTS_TABLE}, -1, :open, :close, '…', {SNIPPET_TOKENS}) "
+            f"FROM {FTS_TABLE} f JOIN {FTS_DOC_TABLE} d ON d.doc_id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match"
+        )
+        params = {"match": match, "open": _SNIPPET_OPEN, "close": _SNIPPET_CLOSE, "limit": limit}
+        if path_prefix:
+            params["low"], params["high"] = subtree_bounds(path_prefix)
+            sql += " AND d.file_path >= :low AND d.file_path < :high"
+        sql += f" ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit"
+        rows = session.execute(text(sql), params).all()
+        return [(path, self._snippet_html(snippet)) for path, snippet in rows]
+
+    def search_pages(self, session: Session, keywords: list[str], file_paths: list[str]) -> dict[str, list[int]]:
+        """``file_path -> [page]`` for the given documents, best page first."""
+        match = self.build_match(keywords)
+        if not match or not file_paths:
+            return {}
+        doc_ids = {}
+        for start in range(0, len(file_paths), 500):
+            rows = session.execute(
+                text(f"SELECT doc_id, file_path FROM {FTS_DOC_TABLE} WHERE file_path IN :paths")
+                .bindparams(bindparam("paths", expanding=True)),
+                {"paths": file_paths[start:start + 500]},
+            )
+            doc_ids.update((doc_id, path) for doc_id, path in rows)
+        pages = {}
+        sql = text(
+            f"SELECT rowid FROM {FTS_PAGE_TABLE} "
+            f"WHERE {FTS_PAGE_TABLE} MATCH :match AND rowid >= :low AND rowid < :high "
+            f"ORDER BY bm25({FTS_PAGE_TABLE}) LIMIT {MAX_PAGE_HITS}"
+        )
+        for doc_id, file_path in doc_ids.items():
+            low = doc_id * PAGE_ROWID_SPAN
+            rows = session.execute(sql, {"match": match, "low": low, "high": low + PAGE_ROWID_SPAN}).scalars()
+            hits = [rowid - low for rowid in rows]
+            if hits:
+                pages[file_path] = hits
+        return pages
+
+    @staticmethod
+    def _snippet_html(snippet: str | None) -> str | None:
+        if not snippet:
+            return None
+        return (
+            html.escape(snippet)
+            .replace(_SNIPPET_OPEN, "<b>")
+            .replace(_SNIPPET_CLOSE, "</b>")
+            .replace("\n", " ")
+            .replace(PAGE_BREAK, " ")
+        )
+
+
+_BACKENDS = {
+    WhooshBackend.name: WhooshBackend,
+    Fts5Backend.name: Fts5Backend,
+}
@@ -1,13 +1,12 @@
 import os
-import time
 import logging
 from datetime import datetime, UTC
-from whoosh.fields import Schema, ID, TEXT, DATETIME
-from whoosh.index import create_in, open_dir, exists_in, LockError
-from whoosh.writing import AsyncWriter
-from src.doc_hub.core.database import DATABASE_DIR
+from sqlalchemy import func, select
+from src.doc_hub.core.content_store import ContentStore
+from src.doc_hub.core.database import DATABASE_DIR, IndexedFile
+from src.doc_hub.core.page_store import PAGED_TYPES, split_pages
+from src.doc_hub.core.search_backend import INDEX_DIR, get_index_schema, get_search_backend
 
-INDEX_DIR = os.path.join(DATABASE_DIR, "whoosh_index")
 LOG_FILE = os.path.join(DATABASE_DIR, "index.log")
 
 os.makedirs(DATABASE_DIR, exist_ok=True)
@@ -17,50 +16,58 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s",
 )
 
-def get_index_schema():
-    return Schema(
-        file_path=ID(stored=True, unique=True),
-        file_name=TEXT(stored=True),
-        content=TEXT(stored=True),
-        date_indexed=DATETIME(stored=True, sortable=True),
-        ai_tags=TEXT(stored=True),
-        ai_summary=TEXT(stored=True)
-    )
-
 class SearchIndexService:
-    def __init__(self):
-        self.index_dir = INDEX_DIR
-        self.schema = get_index_schema()
-        self.ix = self._open_index()
+    def __init__(self, backend=None):
+        self.backend = backend or get_search_backend()
+
+    def get_writer(self, retries=3, delay=2, use_async=True, session=None):
+        """
+        Returns a writer for the configured engine. Pass the catalog session
+        so FTS5 updates commit together with the rows they describe.
+        """
+        return self.backend.get_writer(retries, delay, use_async, session=session)
 
-    def _open_index(self):
-        if not os.path.exists(self.index_dir):
-            os.makedirs(self.index_dir)
-            logging.info("Created new index directory: %s", self.index_dir)
-            return create_in(self.index_dir, self.schema)
-        if exists_in(self.index_dir):
-            logging.info("Loaded existing Whoosh index.")
-            return open_dir(self.index_dir)
-        logging.warning("Index not found — creating new index.")
-        return create_in(self.index_dir, self.schema)
+    def renew_writer(self, writer, session=None):
+        """Commits ``writer`` and returns a fresh one, so long scans can commit the index per batch."""
+        self.commit_writer(writer)
+        return self.get_writer(session=session)
 
-    def get_writer(self, retries=3, delay=2, use_async=True):
-        for attempt in range(retries):
-            try:
-                writer = AsyncWriter(self.ix) if use_async else self.ix.writer()
-                logging.info("Whoosh writer acquired (attempt %d).", attempt + 1)
-                return writer
-            except LockError:
-                logging.warning(
-                    "Whoosh index locked (attempt %d/%d), retrying in %ds...",
-                    attempt + 1, retries, delay
+    def rebuild_from_catalog(self, session, batch_size: int = 500, progress=None) -> int:
+        """
+        Re-adds every catalog row to the index from its stored content, without
+        touching the files on disk. Returns the number of files indexed.
+        """
+        progress = progress or (lambda message: None)
+        total = session.scalar(select(func.count()).select_from(IndexedFile)) or 0
+        done = 0
+        last_id = 0
+        while True:
+            records = session.scalars(
+                select(IndexedFile)
+                .where(IndexedFile.id > last_id)
+                .order_by(IndexedFile.id)
+                .limit(batch_size)
+            ).all()
+            if not records:
+                break
+            contents = ContentStore.load_many(session, [r.id for r in records])
+            writer = self.get_writer(session=session)
+            if writer is None:
+                raise RuntimeError("Could not acquire search index writer.")
+            for record in records:
+                self.add_or_update_document(
+                    writer, record, record.ai_tags, record.ai_summary, contents.get(record.id, "")
                 )
-                time.sleep(delay)
-        logging.error("Failed to acquire Whoosh writer after retries.")
-        return None
+            self.commit_writer(writer)
+            session.commit()
+            last_id = records[-1].id
+            done += len(records)
+            progress(f"Indexed {done}/{total} files...")
+        self.backend.rebuild_done()
+        return done
 
     @staticmethod
-    def add_or_update_document(writer, file_record, ai_tags: str = "", ai_summary: str = ""):
+    def add_or_update_document(writer, file_record, ai_tags: str = "", ai_summary: str = "", content: str = ""):
         if writer is None:
             logging.warning("Skipped add/update: writer unavailable.")
             return
@@ -68,11 +75,15 @@ class SearchIndexService:
             writer.update_document(
                 file_path=file_record.file_path,
                 file_name=file_record.file_name,
-                content=file_record.extracted_content or "",
+                content=content or "",
                 date_indexed=file_record.date_indexed or datetime.now(UTC),
                 ai_tags=ai_tags or "",
                 ai_summary=ai_summary or ""
             )
+            if file_record.file_type in PAGED_TYPES:
+                # A single page would only repeat the document entry.
+                pages = split_pages(content)
+                writer.update_pages(file_record.file_path, pages if len(pages) > 1 else [])
             logging.info("Indexed or updated file: %s", file_record.file_path)
         except Exception as e:
             logging.error("Failed to index %s: %s", file_record.file_path, e)
@@ -98,3 +109,13 @@ class SearchIndexService:
             logging.info("Whoosh index committed successfully.")
         except Exception as e:
             logging.error("Failed to commit index: %s", e)
+
+    @staticmethod
+    def cancel_writer(writer):
+        """Discards the uncommitted changes of ``writer``; it cannot be used afterwards."""
+        if writer is None:
+            return
+        try:
+            writer.cancel()
+        except Exception as e:
+            logging.error("Failed to cancel index writer: %s", e)
@@ -1,34 +1,20 @@
 import os
-from typing import List, Optional, Set, Tuple, Union
-from sqlalchemy import select, desc, not_, or_
-from whoosh import index as whoosh_index
-from whoosh.fields import Schema, ID, TEXT, DATETIME
-from whoosh.qparser import MultifieldParser, WildcardPlugin
-from whoosh.query import And, Prefix
-from src.doc_hub.core.database import get_session, IndexedFile
-from src.doc_hub.core.search_index_service import INDEX_DIR
+from typing import Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy import select, desc, not_
+from src.doc_hub.core.content_store import ContentStore
+from src.doc_hub.core.database import get_read_session, FacetCount, IndexedFile
+from src.doc_hub.core.page_store import PAGED_TYPES, PageStore
+from src.doc_hub.core.path_index import in_subtree
+from src.doc_hub.core.search_backend import get_search_backend
+from src.doc_hub.core.skip_cache import SkipCache
+from src.doc_hub.core.tag_store import TagStore
+
+SEARCH_HIT_LIMIT = 500
 
 
 class SearchService:
-    def __init__(self):
-        self.index_dir = INDEX_DIR
-        self.schema = Schema(
-            file_path=ID(stored=True, unique=True),
-            file_name=TEXT(stored=True),
-            content=TEXT(stored=True),
-            date_indexed=DATETIME(stored=True, sortable=True),
-            ai_tags=TEXT(stored=True),
-            ai_summary=TEXT(stored=True),
-        )
-        self.ix = self._open_index()
-
-    def _open_index(self):
-        if not os.path.exists(self.index_dir):
-            os.makedirs(self.index_dir)
-            return whoosh_index.create_in(self.index_dir, self.schema)
-        if whoosh_index.exists_in(self.index_dir):
-            return whoosh_index.open_dir(self.index_dir)
-        return whoosh_index.create_in(self.index_dir, self.schema)
+    def __init__(self, backend=None):
+        self.backend = backend or get_search_backend()
 
     @staticmethod
     def parse_search_query(search_text: str) -> Tuple[str, List[str], List[str]]:
@@ -50,54 +36,37 @@ class SearchService:
         path_filter: Optional[str] = None,
         selected_tags: Optional[Set[str]] = None,
     ) -> List[IndexedFile]:
-        session = get_session()
+        session = get_read_session()
         try:
             whoosh_query_str, keywords, file_types = self.parse_search_query(search_text)
             query = select(IndexedFile).where(not_(IndexedFile.file_type.in_(excluded_file_types)))
 
             if selected_tags:
-                tag_filters = [IndexedFile.ai_tags.like(f"%{tag}%") for tag in selected_tags]
-                query = query.where(or_(*tag_filters))
+                query = query.where(IndexedFile.id.in_(TagStore.file_ids_with_any(selected_tags)))
 
             if not whoosh_query_str and not file_types and not selected_tags:
                 if len(search_text) > 0:
                     return []
                 if path_filter:
-                    if not path_filter.endswith("/"):
-                        path_filter += "/"
-                    query = query.where(IndexedFile.file_path.like(f"{path_filter}%"))
+                    query = query.where(in_subtree(IndexedFile.file_path, path_filter))
                 query = query.order_by(desc(IndexedFile.date_indexed)).limit(100)
                 return session.scalars(query).all()
 
             search_paths = None
+            snippets = {}
             if whoosh_query_str:
-                with self.ix.searcher() as searcher:
-                    field_boosts = {
-                        "file_name": 3.0,
-                        "ai_summary": 2.0,
-                        "ai_tags": 2.0,
-                        "content": 1.0,
-                    }
-                    parser = MultifieldParser(field_boosts.keys(), schema=self.schema, fieldboosts=field_boosts)
-                    parser.add_plugin(WildcardPlugin())
-                    keyword_q = parser.parse(whoosh_query_str)
-                    filter_q = None
-                    if path_filter:
-                        if not path_filter.endswith("/"):
-                            path_filter += "/"
-                        filter_q = Prefix("file_path", path_filter)
-                    final_query = And([keyword_q, filter_q]) if filter_q else keyword_q
-                    results = searcher.search(final_query, limit=500)
-                    search_paths = [hit["file_path"] for hit in results]
-                    if not search_paths:
-                        return []
+                path_prefix = None
+                if path_filter:
+                    path_prefix = os.path.join(os.path.normpath(path_filter), "")
+                hits = self.backend.search(session, keywords, path_prefix, SEARCH_HIT_LIMIT)
+                search_paths = [path for path, _ in hits]
+                snippets = {path: snippet for path, snippet in hits if snippet}
+                if not search_paths:
+                    return []
 
                 query = query.where(IndexedFile.file_path.in_(search_paths))
-            else:
-                if path_filter:
-                    if not path_filter.endswith("/"):
-                        path_filter += "/"
-                    query = query.where(IndexedFile.file_path.like(f"{path_filter}%"))
+            elif path_filter:
+                query = query.where(in_subtree(IndexedFile.file_path, path_filter))
 
             if file_types:
                 query = query.where(IndexedFile.file_type.in_(file_types))
@@ -106,7 +75,15 @@ class SearchService:
                 sql_results = session.scalars(query).all()
                 results_map = {file.file_path: file for file in sql_results}
                 ordered_results = [results_map[path] for path in search_paths if path in results_map]
-                return ordered_results[:100]
+                ordered_results = ordered_results[:100]
+                for record in ordered_results:
+                    record.search_snippet = snippets.get(record.file_path)
+                paged = [r.file_path for r in ordered_results if r.file_type in PAGED_TYPES]
+                if paged:
+                    pages = self.backend.search_pages(session, keywords, paged)
+                    for record in ordered_results:
+                        record.matched_pages = pages.get(record.file_path)
+                return ordered_results
 
             query = query.order_by(desc(IndexedFile.date_indexed)).limit(100)
             return session.scalars(query).all()
@@ -118,18 +95,10 @@ class SearchService:
             session.close()
 
     def get_file_preview(self, file_path: str) -> Union[IndexedFile, None]:
-        session = get_session()
+        """Catalog metadata for one file; the text is loaded separately by ``get_file_content``."""
+        session = get_read_session()
         try:
-            file_record = session.query(IndexedFile).filter_by(file_path=file_path).first()
-            if not file_record:
-                return None
-            with self.ix.searcher() as searcher:
-                hit = searcher.document(file_path=file_path)
-                if hit:
-                    file_record.extracted_content = hit.get("content", "")
-                else:
-                    file_record.extracted_content = "--- Preview not available (file not in search index) ---"
-            return file_record
+            return session.query(IndexedFile).filter_by(file_path=file_path).first()
         except Exception as e:
             print("Error loading preview:", e)
             return None
@@ -137,48 +106,107 @@ class SearchService:
             session.close()
 
     @staticmethod
-    def get_all_file_types() -> List[str]:
-        session = get_session()
+    def get_file_content(file_path: str) -> Optional[str]:
+        session = get_read_session()
+        try:
+            return ContentStore.load_by_path(session, file_path)
+        except Exception as e:
+            print("Error loading file content:", e)
+            return None
+        finally:
+            session.close()
+
+    @staticmethod
+    def get_page_count(file_path: str) -> int:
+        """Stored pages of a paged document; ``0`` when it has none."""
+        session = get_read_session()
+        try:
+            return PageStore.page_count(session, file_path)
+        except Exception as e:
+            print("Error counting pages:", e)
+            return 0
+        finally:
+            session.close()
+
+    @staticmethod
+    def get_pages(file_path: str, first: int, last: int) -> Dict[int, str]:
+        session = get_read_session()
+        try:
+            return PageStore.load_range(session, file_path, first, last)
+        except Exception as e:
+            print("Error loading pages:", e)
+            return {}
+        finally:
+            session.close()
+
+    @staticmethod
+    def get_file_contents(records: List[IndexedFile]) -> Dict[str, str]:
+        session = get_read_session()
+        try:
+            contents = ContentStore.load_many(session, [r.id for r in records])
+            return {r.file_path: contents[r.id] for r in records if r.id in contents}
+        except Exception as e:
+            print("Error loading file contents:", e)
+            return {}
+        finally:
+            session.close()
+
+    @staticmethod
+    def _facet_counts(kind: str) -> List[Tuple[str, int]]:
+        session = get_read_session()
         try:
             query = (
-                select(IndexedFile.file_type)
-                .distinct()
-                .where(not_(IndexedFile.file_type.like("unsupported%")))
-                .order_by(IndexedFile.file_type)
+                select(FacetCount.value, FacetCount.count)
+                .where(FacetCount.kind == kind, FacetCount.count > 0, FacetCount.value != "")
+                .order_by(FacetCount.value)
             )
-            return session.scalars(query).all()
+            return [(value, count) for value, count in session.execute(query)]
+        finally:
+            session.close()
+
+    @staticmethod
+    def get_type_counts() -> List[Tuple[str, int]]:
+        try:
+            return [
+                (file_type, count) for file_type, count in SearchService._facet_counts("type")
+                if not file_type.startswith("unsupported")
+            ]
         except Exception as e:
             print("Error getting file types:", e)
             return []
-        finally:
-            session.close()
+
+    @staticmethod
+    def get_all_file_types() -> List[str]:
+        return [file_type for file_type, _ in SearchService.get_type_counts()]
 
     @staticmethod
     def get_all_types_for_exclusion() -> List[str]:
-        session = get_session()
         try:
-            return session.scalars(select(IndexedFile.file_type).distinct()).all()
+            return [file_type for file_type, _ in SearchService._facet_counts("type")]
         except Exception as e:
             print("Error unchecking all filters:", e)
             return []
-        finally:
-            session.close()
+
+    @staticmethod
+    def get_tag_counts() -> List[Tuple[str, int]]:
+        try:
+            return SearchService._facet_counts("tag")
+        except Exception as e:
+            print("Error fetching tag counts:", e)
+            return []
 
     @staticmethod
     def get_all_tags() -> List[str]:
-        session = get_session()
+        return [tag for tag, _ in SearchService.get_tag_counts()]
+
+    @staticmethod
+    def get_skip_summary() -> List[Tuple[str, int]]:
+        """How many scanned files were not indexed, per reason."""
+        session = get_read_session()
         try:
-            query = select(IndexedFile.ai_tags).distinct()
-            results = [t for t in session.scalars(query).all() if t]
-            tags = set()
-            for entry in results:
-                for tag in entry.split(","):
-                    cleaned = tag.strip()
-                    if cleaned:
-                        tags.add(cleaned)
-            return sorted(tags)
+            return SkipCache.summary(session)
         except Exception as e:
-            print("Error fetching tags:", e)
+            print("Error fetching skipped files:", e)
             return []
         finally:
             session.close()
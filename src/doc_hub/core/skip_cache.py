@@ -0,0 +1,97 @@
+from datetime import datetime, UTC
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import SkippedFile
+from src.doc_hub.core.file_processing import is_container
+from src.doc_hub.core.path_index import in_subtree, member_bounds, subtree_bounds
+
+REASON_UNSUPPORTED = "unsupported"
+REASON_EMPTY = "empty"
+# Quarantined: the extractor was stopped on this file.
+REASON_TIMEOUT = "timeout"
+REASON_MEMORY = "memory"
+REASON_CRASH = "crash"
+# An archive member past ``MAX_MEMBER_BYTES``.
+REASON_TOO_LARGE = "too_large"
+
+REASON_LABELS = {
+    REASON_UNSUPPORTED: "Unsupported format",
+    REASON_EMPTY: "No extractable content",
+    REASON_TIMEOUT: "Quarantined: extraction timed out",
+    REASON_MEMORY: "Quarantined: extraction ran out of memory",
+    REASON_CRASH: "Quarantined: extractor crashed",
+    REASON_TOO_LARGE: "Archive member too large",
+}
+
+
+class SkipCache:
+    """
+    Negative cache of scan outcomes. A file that produced nothing to index
+    is remembered with its size, mtime and extractor, so the next scan
+    skips it at ``stat()`` cost instead of running the extractor again.
+    """
+
+    @staticmethod
+    def load(session: Session, roots: list[str], files: list[str] = ()) -> dict[str, tuple]:
+        """
+        ``file_path -> (file_size, mtime, extractor)`` under the roots and for
+        the given files, including the members of archives among them.
+        """
+        entries = {}
+        columns = (SkippedFile.file_path, SkippedFile.file_size, SkippedFile.mtime, SkippedFile.extractor)
+        files = list(files)
+        for start in range(0, len(files), 500):
+            query = select(*columns).where(SkippedFile.file_path.in_(files[start:start + 500]))
+            for path, size, mtime, extractor in session.execute(query):
+                entries[path] = (size, mtime, extractor)
+        bounds = [subtree_bounds(root) for root in roots]
+        bounds += [member_bounds(path) for path in files if is_container(path)]
+        for low, high in bounds:
+            query = (
+                select(*columns)
+                .where(SkippedFile.file_path >= low, SkippedFile.file_path < high)
+                .execution_options(yield_per=5000)
+            )
+            for path, size, mtime, extractor in session.execute(query):
+                entries[path] = (size, mtime, extractor)
+        return entries
+
+    @staticmethod
+    def record_many(session: Session, rows: list[dict]):
+        """Upserts ``file_path``/``file_size``/``mtime``/``extractor``/``reason`` rows. The caller commits."""
+        if not rows:
+            return
+        now = datetime.now(UTC)
+        for start in range(0, len(rows), 500):
+            chunk = [dict(row, date_checked=now) for row in rows[start:start + 500]]
+            stmt = insert(SkippedFile).values(chunk)
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[SkippedFile.file_path],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in ("file_size", "mtime", "extractor", "reason", "date_checked")
+                },
+            ))
+
+    @staticmethod
+    def forget(session: Session, paths):
+        paths = list(paths)
+        for start in range(0, len(paths), 500):
+            session.execute(delete(SkippedFile).where(SkippedFile.file_path.in_(paths[start:start + 500])))
+
+    @staticmethod
+    def forget_subtree(session: Session, root: str):
+        session.execute(delete(SkippedFile).where(in_subtree(SkippedFile.file_path, root, include_root=True)))
+
+    @staticmethod
+    def summary(session: Session) -> list[tuple[str, int]]:
+        """``(reason, count)`` pairs, most common first."""
+        rows = session.execute(
+            select(SkippedFile.reason, func.count())
+            .group_by(SkippedFile.reason)
+            .order_by(func.count().desc())
+        ).all()
+        return [(reason, count) for reason, count in rows]
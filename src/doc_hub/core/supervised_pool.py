@@ -0,0 +1,219 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait as wait_ready
+
+try:
+    import resource
+    _HAS_RESOURCE = hasattr(resource, "RLIMIT_AS")
+except Exception:
+    resource = None
+    _HAS_RESOURCE = False
+
+# A worker is replaced after this many tasks, which also returns memory
+# that C extensions (PDF parsers, Pillow) tend to keep.
+MAX_TASKS_PER_WORKER = 500
+POLL_INTERVAL = 0.5
+SHUTDOWN_GRACE = 2.0
+
+
+class TaskTimeout(Exception):
+    """The task ran past its wall-clock limit and its worker was killed."""
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while running the task."""
+
+
+def _set_memory_limit(limit: int | None, default: tuple):
+    if not _HAS_RESOURCE:
+        return
+    soft, hard = default
+    if limit:
+        soft = limit if hard == resource.RLIM_INFINITY else min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(conn):
+    default_limit = resource.getrlimit(resource.RLIMIT_AS) if _HAS_RESOURCE else None
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        fn, args, memory_limit = message
+        _set_memory_limit(memory_limit, default_limit)
+        try:
+            reply = (True, fn(*args))
+        except MemoryError:
+            reply = (False, MemoryError(f"exceeded the {memory_limit // (1024 * 1024)} MiB memory limit"
+                                        if memory_limit else "out of memory"))
+        except BaseException as e:
+            reply = (False, e)
+        finally:
+            _set_memory_limit(None, default_limit)
+        try:
+            conn.send(reply)
+        except Exception:
+            conn.send((False, RuntimeError(repr(reply[1]))))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.future = None
+        self.deadline = None
+        self.timeout = None
+        self.tasks = 0
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(SHUTDOWN_GRACE)
+        self.conn.close()
+
+
+class SupervisedPool:
+    """
+    Process pool for untrusted input. Unlike ``ProcessPoolExecutor``, one
+    task can be stopped: a task that runs past its timeout has its worker
+    killed, and a worker that dies only fails its own task. Either way a
+    fresh worker takes its place. Each task may also carry an address-space
+    limit (``RLIMIT_AS``, POSIX only), so a runaway parse raises
+    ``MemoryError`` instead of swapping the machine.
+
+    ``submit`` returns ordinary ``concurrent.futures.Future`` objects.
+    """
+
+    def __init__(self, max_workers: int, mp_context=None):
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._workers = [_Worker(self._context) for _ in range(max_workers)]
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wake_reader, self._wake_writer = self._context.Pipe(duplex=False)
+        self._shutdown = False
+        self._abort = False
+        self.killed = 0
+        self._thread = threading.Thread(target=self._supervise, name="SupervisedPool", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, timeout: float | None = None, memory_limit: int | None = None) -> Future:
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            self._pending.append((future, fn, args, timeout, memory_limit))
+            self._wake_writer.send(None)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                # Running tasks are stopped too; waiting for them could take
+                # as long as their timeouts.
+                self._abort = True
+                while self._pending:
+                    self._pending.popleft()[0].cancel()
+            self._wake_writer.send(None)
+        if wait:
+            self._thread.join()
+
+    def _supervise(self):
+        while True:
+            self._dispatch()
+            busy = [w for w in self._workers if w.future is not None]
+            if self._abort:
+                for worker in busy:
+                    self._fail(worker, RuntimeError("pool shut down"))
+                busy = []
+            with self._lock:
+                if self._shutdown and not busy and not self._pending:
+                    break
+            now = time.monotonic()
+            deadlines = [w.deadline - now for w in busy if w.deadline is not None]
+            timeout = max(0.0, min([POLL_INTERVAL, *deadlines]))
+            handles = [self._wake_reader] + [w.conn for w in busy] + [w.process.sentinel for w in busy]
+            ready = set(wait_ready(handles, timeout))
+            if self._wake_reader in ready:
+                while self._wake_reader.poll():
+                    self._wake_reader.recv()
+            for worker in busy:
+                if worker.conn in ready:
+                    self._receive(worker)
+                elif worker.process.sentinel in ready:
+                    self._fail(worker, WorkerCrashed(f"worker exited with code {worker.process.exitcode}"))
+                elif worker.deadline is not None and time.monotonic() >= worker.deadline:
+                    self._fail(worker, TaskTimeout(f"no result after {worker.timeout:g}s"))
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            worker.process.join(SHUTDOWN_GRACE)
+            worker.kill()
+
+    def _dispatch(self):
+        for index, worker in enumerate(self._workers):
+            if worker.future is not None:
+                continue
+            with self._lock:
+                if not self._pending:
+                    return
+                future, fn, args, timeout, memory_limit = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            if not worker.process.is_alive():
+                worker = self._replace(index)
+            try:
+                worker.conn.send((fn, args, memory_limit))
+            except Exception as e:
+                future.set_exception(e)
+                self._replace(index)
+                continue
+            worker.future = future
+            worker.timeout = timeout
+            worker.deadline = time.monotonic() + timeout if timeout else None
+
+    def _receive(self, worker: "_Worker"):
+        try:
+            ok, value = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._fail(worker, WorkerCrashed(f"lost contact with worker: {e}"))
+            return
+        future, worker.future, worker.deadline = worker.future, None, None
+        worker.tasks += 1
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+        if isinstance(value, MemoryError) or worker.tasks >= MAX_TASKS_PER_WORKER:
+            worker.conn.send(None)
+            worker.process.join(SHUTDOWN_GRACE)
+            self._replace(self._workers.index(worker))
+
+    def _fail(self, worker: "_Worker", error: Exception):
+        future, worker.future = worker.future, None
+        self.killed += 1
+        future.set_exception(error)
+        self._replace(self._workers.index(worker))
+
+    def _replace(self, index: int) -> "_Worker":
+        self._workers[index].kill()
+        if self._shutdown:
+            worker = self._workers[index]
+            worker.future = None
+            return worker
+        self._workers[index] = _Worker(self._context)
+        return self._workers[index]
@@ -0,0 +1,108 @@
+import json
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from src.doc_hub.core.database import get_session, FileTag, IndexedFile, Tag
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def split_tags(raw_tags: str | None) -> list[str]:
+    """Parses an ``ai_tags`` string (comma separated or a JSON list) into unique tag names."""
+    if not raw_tags or not raw_tags.strip():
+        return []
+    parts = None
+    if raw_tags.strip().startswith("["):
+        try:
+            parts = [str(t) for t in json.loads(raw_tags)]
+        except (ValueError, TypeError):
+            parts = None
+    if parts is None:
+        parts = raw_tags.split(",")
+
+    tags = {}
+    for part in parts:
+        cleaned = part.strip()
+        if cleaned and cleaned.lower() not in tags:
+            tags[cleaned.lower()] = cleaned
+    return list(tags.values())
+
+
+class TagStore:
+    """
+    Normalized ``tag`` / ``file_tag`` tables. Tag names compare without
+    case, so filtering is an exact indexed match rather than a substring scan.
+    """
+
+    @staticmethod
+    def _tag_ids(session: Session, names: list[str]) -> dict[str, int]:
+        session.execute(
+            insert(Tag).on_conflict_do_nothing(index_elements=[Tag.name]),
+            [{"name": name} for name in names],
+        )
+        rows = session.execute(select(Tag.id, Tag.name).where(Tag.name.in_(names)))
+        return {name.lower(): tag_id for tag_id, name in rows}
+
+    @staticmethod
+    def set_file_tags(session: Session, file_id: int, raw_tags: str | None):
+        """Replaces the tags on one file. The caller commits."""
+        session.execute(delete(FileTag).where(FileTag.file_id == file_id))
+        names = split_tags(raw_tags)
+        if not names:
+            return
+        ids = TagStore._tag_ids(session, names)
+        session.execute(
+            insert(FileTag).on_conflict_do_nothing(),
+            [{"file_id": file_id, "tag_id": ids[name.lower()]} for name in names if name.lower() in ids],
+        )
+
+    @staticmethod
+    def prune_unused(session: Session):
+        session.execute(delete(Tag).where(~exists().where(FileTag.tag_id == Tag.id)))
+
+    @staticmethod
+    def file_ids_with_any(names):
+        """Subquery of file ids carrying at least one of ``names``."""
+        return (
+            select(FileTag.file_id)
+            .join(Tag, Tag.id == FileTag.tag_id)
+            .where(Tag.name.in_(list(names)))
+        )
+
+    @staticmethod
+    def backfill():
+        """Fills ``file_tag`` from ``indexed_file.ai_tags`` for catalogs created before the tag tables."""
+        session = get_session()
+        try:
+            if session.scalar(select(FileTag.file_id).limit(1)) is not None:
+                return
+            has_tags = session.scalar(
+                select(IndexedFile.id).where(IndexedFile.ai_tags.is_not(None), IndexedFile.ai_tags != "").limit(1)
+            )
+            if has_tags is None:
+                return
+
+            moved = 0
+            last_id = 0
+            while True:
+                rows = session.execute(
+                    select(IndexedFile.id, IndexedFile.ai_tags)
+                    .where(IndexedFile.id > last_id, IndexedFile.ai_tags.is_not(None), IndexedFile.ai_tags != "")
+                    .order_by(IndexedFile.id)
+                    .limit(BACKFILL_BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                for file_id, raw_tags in rows:
+                    TagStore.set_file_tags(session, file_id, raw_tags)
+                session.commit()
+                last_id = rows[-1][0]
+                moved += len(rows)
+            print(f" Indexed tags for {moved} file(s)")
+        except Exception as e:
+            print(f" Tag backfill failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
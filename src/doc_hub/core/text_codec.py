@@ -0,0 +1,35 @@
+import zlib
+
+try:
+    import zstandard
+    _HAS_ZSTD = True
+except Exception:
+    zstandard = None
+    _HAS_ZSTD = False
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def compress_text(text: str) -> tuple[str, bytes, int]:
+    """Returns ``(codec, data, raw_size)``; zstd when available, zlib otherwise."""
+    raw = text.encode("utf-8", errors="replace")
+    if _HAS_ZSTD:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), len(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL), len(raw)
+
+
+def decompress_text(codec: str, data: bytes | None) -> str:
+    if not data:
+        return ""
+    if codec == "zlib":
+        raw = zlib.decompress(data)
+    elif codec == "zstd":
+        if not _HAS_ZSTD:
+            raise RuntimeError("Content was stored with zstd but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "raw":
+        raw = data
+    else:
+        raise ValueError(f"Unknown content codec: {codec}")
+    return raw.decode("utf-8", errors="replace")
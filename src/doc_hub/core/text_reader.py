@@ -0,0 +1,196 @@
+import codecs
+import csv
+import io
+import json
+import os
+from contextlib import contextmanager, nullcontext
+
+try:
+    from charset_normalizer import from_bytes as detect_charset
+    _HAS_CHARSET_NORMALIZER = True
+except Exception:
+    detect_charset = None
+    _HAS_CHARSET_NORMALIZER = False
+
+try:
+    import ijson
+    _HAS_IJSON = True
+except Exception:
+    ijson = None
+    _HAS_IJSON = False
+
+# Bounded reads for text-like files. Nothing here holds more than the byte
+# cap of a file in memory, whatever the file's size. Every reader takes a
+# path or a seekable binary file object, such as an archive member in memory.
+DEFAULT_MAX_TEXT_BYTES = 8 * 1024 * 1024
+SNIFF_BYTES = 8192
+READ_CHUNK_BYTES = 256 * 1024
+# Share of control characters in the sniffed sample above which a file
+# is treated as binary.
+MAX_CONTROL_SHARE = 0.1
+PREFERRED_FALLBACK = "cp1252"
+CSV_PREVIEW_ROWS = 102
+# Without ijson, notebooks up to this size are parsed whole.
+NOTEBOOK_LOAD_LIMIT = 64 * 1024 * 1024
+
+_TEXT_CONTROLS = {9, 10, 12, 13, 27}
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def max_text_bytes() -> int:
+    """``DOC_HUB_MAX_TEXT_BYTES`` caps the text kept per file."""
+    try:
+        return max(1024, int(os.getenv("DOC_HUB_MAX_TEXT_BYTES", DEFAULT_MAX_TEXT_BYTES)))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_TEXT_BYTES
+
+
+def utf8_size(text: str) -> int:
+    """Size of ``text`` as stored, in UTF-8 bytes; the unit of the text cap."""
+    return len(text.encode("utf-8", errors="replace"))
+
+
+def clip_text(text: str, max_bytes: int) -> tuple[str, bool]:
+    """``text`` cut to at most ``max_bytes`` UTF-8 bytes; returns ``(text, truncated)``."""
+    # No character encodes to more than four bytes.
+    if len(text) * 4 <= max_bytes:
+        return text, False
+    raw = text.encode("utf-8", errors="replace")
+    if len(raw) <= max_bytes:
+        return text, False
+    # A character cut in half at the cap is dropped.
+    return raw[:max_bytes].decode("utf-8", errors="ignore"), True
+
+
+def _open_binary(source):
+    if hasattr(source, "read"):
+        source.seek(0)
+        return nullcontext(source)
+    return open(source, "rb")
+
+
+@contextmanager
+def _open_text(source, encoding: str):
+    with _open_binary(source) as raw:
+        f = io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline="")
+        try:
+            yield f
+        finally:
+            # Leave closing the underlying file to whoever opened it.
+            f.detach()
+
+
+def _size(source) -> int:
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer().nbytes
+    return os.path.getsize(source)
+
+
+def sniff(path) -> tuple[bool, str]:
+    """``(is_binary, encoding)`` from the first ``SNIFF_BYTES`` of a file."""
+    with _open_binary(path) as f:
+        sample = f.read(SNIFF_BYTES)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return False, encoding
+    if not sample:
+        return False, "utf-8"
+    if b"\0" in sample:
+        return True, ""
+    controls = sum(1 for byte in sample if byte < 32 and byte not in _TEXT_CONTROLS)
+    if controls / len(sample) > MAX_CONTROL_SHARE:
+        return True, ""
+    try:
+        # The sample may end inside a multi-byte character.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return False, "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if _HAS_CHARSET_NORMALIZER:
+        matches = detect_charset(sample)
+        best = matches.best()
+        if best is not None:
+            # Western single-byte text often scores the same under several
+            # code pages; prefer the most common one when it is a candidate.
+            candidates = set(best.could_be_from_charset)
+            candidates.update(
+                m.encoding for m in matches if m.chaos == best.chaos and m.coherence == best.coherence
+            )
+            return False, PREFERRED_FALLBACK if PREFERRED_FALLBACK in candidates else best.encoding
+    return False, "latin-1"
+
+
+def read_text(path, encoding: str, max_bytes: int) -> tuple[str, bool]:
+    """Decodes at most ``max_bytes`` of the file; returns ``(text, truncated)``."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parts = []
+    remaining = max_bytes
+    with _open_binary(path) as f:
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK_BYTES, remaining))
+            if not chunk:
+                parts.append(decoder.decode(b"", final=True))
+                return "".join(parts), False
+            remaining -= len(chunk)
+            parts.append(decoder.decode(chunk))
+        truncated = bool(f.read(1))
+    # A character cut in half at the cap is dropped rather than replaced.
+    return "".join(parts), truncated
+
+
+def read_csv_preview(path, encoding: str, max_bytes: int) -> tuple[str, bool]:
+    """The first ``CSV_PREVIEW_ROWS`` rows, within ``max_bytes``."""
+    rows = []
+    size = 0
+    truncated = False
+    with _open_text(path, encoding) as f:
+        reader = csv.reader(f)
+        try:
+            for row in reader:
+                line = ", ".join(row)
+                size += utf8_size(line) + 1
+                if len(rows) >= CSV_PREVIEW_ROWS or size > max_bytes:
+                    truncated = True
+                    break
+                rows.append(line)
+        except csv.Error:
+            # Typically a field past csv.field_size_limit; keep what was read.
+            if not rows:
+                raise
+            truncated = True
+    return "\n".join(rows), truncated
+
+
+def read_notebook_sources(path, max_bytes: int) -> tuple[str, bool]:
+    """Joined cell sources. Outputs, often large embedded images, are never loaded with ijson."""
+    cells = []
+    size = 0
+    if _HAS_IJSON:
+        with _open_binary(path) as f:
+            for source in ijson.items(f, "cells.item.source"):
+                text = "".join(source) if isinstance(source, list) else str(source)
+                size += utf8_size(text) + 1
+                if size > max_bytes:
+                    return "\n".join(cells), True
+                cells.append(text)
+        return "\n".join(cells), False
+    if _size(path) > NOTEBOOK_LOAD_LIMIT:
+        # Too big to parse whole without a streaming parser; index the raw JSON.
+        text, _ = read_text(path, "utf-8", max_bytes)
+        return text, True
+    with _open_text(path, "utf-8") as f:
+        data = json.load(f)
+    for cell in data.get("cells", []):
+        source = cell.get("source", [])
+        text = "".join(source) if isinstance(source, list) else str(source)
+        size += utf8_size(text) + 1
+        if size > max_bytes:
+            return "\n".join(cells), True
+        cells.append(text)
+    return "\n".join(cells), False
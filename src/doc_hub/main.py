@@ -1,7 +1,9 @@
+import multiprocessing
 import sys
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import QApplication
 from src.doc_hub.app.main_window import MainWindow
+from src.doc_hub.core.catalog_upgrade import upgrade_catalog
 
 from core.resource_utils import resource_path
 import warnings
@@ -12,7 +14,9 @@ warnings.filterwarnings("ignore", category=UserWarning, module="tika")
 
 
 def main():
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
+    upgrade_catalog()
 
     qss_path = resource_path("style.qss")
 
@@ -1,6 +1,9 @@
 from PySide6.QtCore import QObject, Signal, Slot
-from src.doc_hub.core.database import get_session, WatchedFolder, IndexedFile
+from src.doc_hub.core.database import get_session, Directory, EnrichmentTask, WatchedFolder, IndexedFile
+from src.doc_hub.core.path_index import in_subtree
 from src.doc_hub.core.search_index_service import SearchIndexService
+from src.doc_hub.core.skip_cache import SkipCache
+from src.doc_hub.core.tag_store import TagStore
 
 
 class DeleteFolderWorker(QObject):
@@ -14,17 +17,16 @@ class DeleteFolderWorker(QObject):
     @Slot(str)
     def run_delete(self, folder_path: str):
         self.progress.emit("Starting deletion...")
-        writer = self.index_service.get_writer()
         session = get_session()
+        writer = self.index_service.get_writer(session=session)
 
         try:
-            search_pattern = f"{folder_path}%"
             self.progress.emit(f"Querying files in {folder_path}...")
 
             files_to_delete_query = session.query(IndexedFile).filter(
-                IndexedFile.file_path.like(search_pattern)
+                in_subtree(IndexedFile.file_path, folder_path)
             )
-            file_paths_to_delete = [f.file_path for f in files_to_delete_query.all()]
+            file_paths_to_delete = [path for (path,) in files_to_delete_query.with_entities(IndexedFile.file_path)]
 
             if not file_paths_to_delete:
                 self.progress.emit("No files found to delete.")
@@ -38,6 +40,15 @@ class DeleteFolderWorker(QObject):
 
             self.progress.emit("Deleting files from database...")
             files_to_delete_query.delete(synchronize_session=False)
+            session.query(Directory).filter(
+                in_subtree(Directory.path, folder_path, include_root=True)
+            ).delete(synchronize_session=False)
+            TagStore.prune_unused(session)
+            # Neither table references indexed_file, so nothing cascades to them.
+            SkipCache.forget_subtree(session, folder_path)
+            session.query(EnrichmentTask).filter(
+                in_subtree(EnrichmentTask.file_path, folder_path)
+            ).delete(synchronize_session=False)
 
             folder_to_delete = session.query(WatchedFolder).filter_by(file_path=folder_path).first()
             if folder_to_delete:
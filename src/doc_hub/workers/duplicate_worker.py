@@ -1,22 +1,28 @@
 from PySide6.QtCore import QThread, Signal
-from src.doc_hub.core.duplicate_detector import DuplicateDetector
+from src.doc_hub.core.database import get_read_session, release_read_session
+from src.doc_hub.core.duplicate_index import DuplicateIndex
 import traceback
 
 class DuplicateWorker(QThread):
+    """Fills in content hashes the catalog is still missing, then reports the duplicate totals."""
     progress = Signal(str)
-    finished = Signal(bool, str, str)
-
-    def __init__(self, paths):
-        super().__init__()
-        self.paths = paths
+    finished = Signal(bool, str)
 
     def run(self):
         try:
-            self.progress.emit("Scanning for duplicates...")
-            detector = DuplicateDetector(self.paths)
-            report_path, group_count = detector.find_duplicates()
-            msg = f"Found {group_count} duplicate group(s)."
-            self.finished.emit(True, msg, str(report_path))
+            self.progress.emit("Checking catalog hashes...")
+            hashed = DuplicateIndex.backfill_hashes(progress=self.progress.emit)
+            session = get_read_session()
+            try:
+                groups, files, _ = DuplicateIndex.summary(session)
+            finally:
+                session.close()
+            msg = f"Found {groups} duplicate group(s) covering {files} files."
+            if hashed:
+                msg += f" Hashed {hashed} previously unhashed file(s)."
+            self.finished.emit(True, msg)
         except Exception as e:
             traceback.print_exc()
-            self.finished.emit(False, str(e), "")
+            self.finished.emit(False, str(e))
+        finally:
+            release_read_session()
@@ -0,0 +1,160 @@
+import os
+import queue
+import threading
+from datetime import datetime, UTC
+
+from PySide6.QtCore import QObject, Signal, Slot
+from sqlalchemy.exc import OperationalError
+
+from src.doc_hub.core.ai_service import AIService
+from src.doc_hub.core.content_store import ContentStore
+from src.doc_hub.core.database import get_session, get_read_session, release_read_session, IndexedFile
+from src.doc_hub.core.enrichment_queue import EnrichmentQueue
+from src.doc_hub.core.search_index_service import SearchIndexService
+from src.doc_hub.core.tag_store import TagStore
+
+POLL_INTERVAL = 10.0
+DB_RETRY_SECONDS = 5.0
+
+
+class EnrichmentWorker(QObject):
+    progress = Signal(str)
+    file_enriched = Signal(str)
+    finished = Signal()
+
+    def __init__(self, max_concurrency: int | None = None):
+        super().__init__()
+        self.ai_service = AIService()
+        self.index_service = SearchIndexService()
+        try:
+            default = int(os.getenv("DOC_HUB_AI_CONCURRENCY", 2))
+        except ValueError:
+            default = 2
+        self.max_concurrency = max(1, max_concurrency or default)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    @Slot()
+    def run(self):
+        session = get_session()
+        results = queue.Queue()
+        running = set()
+        released = False
+        try:
+            while not self._stop.is_set():
+                # A locked or busy database must not end the worker: roll back,
+                # wait, and retry the same step.
+                try:
+                    if not released:
+                        EnrichmentQueue.release_running(session)
+                        released = True
+
+                    free = self.max_concurrency - len(running)
+                    for task_id, path in EnrichmentQueue.claim(session, free):
+                        running.add(task_id)
+                        # Daemon threads: a slow model call must not hold up application exit.
+                        threading.Thread(
+                            target=self._generate, args=(task_id, path, results), name="ai-enrich", daemon=True
+                        ).start()
+
+                    if not running:
+                        self._wake.wait(POLL_INTERVAL)
+                        self._wake.clear()
+                        continue
+
+                    try:
+                        item = results.get(timeout=1.0)
+                    except queue.Empty:
+                        continue
+                    try:
+                        self._store(session, *item)
+                    except OperationalError:
+                        # Keep the result; it is stored once the database is available.
+                        results.put(item)
+                        raise
+                    running.discard(item[0])
+                except OperationalError as e:
+                    print(f"Enrichment queue unavailable, retrying in {DB_RETRY_SECONDS:.0f}s: {e}")
+                    try:
+                        session.rollback()
+                    except Exception:
+                        pass
+                    self._stop.wait(DB_RETRY_SECONDS)
+        except Exception as e:
+            print(f"Enrichment worker stopped: {e}")
+        finally:
+            if running:
+                try:
+                    session.rollback()
+                    EnrichmentQueue.release_running(session)
+                except Exception as e:
+                    print(f"Failed to release enrichment tasks: {e}")
+            session.close()
+            self.finished.emit()
+
+    def _generate(self, task_id: int, file_path: str, results: queue.Queue):
+        try:
+            session = get_read_session()
+            try:
+                content = ContentStore.load_by_path(session, file_path)
+            finally:
+                session.close()
+            if content is None:
+                results.put((task_id, file_path, None, None))
+                return
+            tags, summary = self.ai_service.get_tags_and_summary(content)
+            if not summary:
+                raise RuntimeError("AI returned an empty summary")
+            results.put((task_id, file_path, (tags, summary, content), None))
+        except Exception as e:
+            results.put((task_id, file_path, None, str(e)))
+        finally:
+            release_read_session()
+
+    def _store(self, session, task_id: int, file_path: str, result, error: str | None):
+        # Raises OperationalError for the caller to retry; other errors count as a failed attempt.
+        if error:
+            print(f"AI enrichment failed for {file_path}: {error}")
+            EnrichmentQueue.fail(session, task_id, error)
+            session.commit()
+            return
+
+        try:
+            # The file may have been moved (task re-keyed) or removed while the model ran.
+            file_path = EnrichmentQueue.current_path(session, task_id)
+            if file_path is None:
+                return
+            record = session.query(IndexedFile).filter_by(file_path=file_path).first()
+            if result is None or record is None:
+                EnrichmentQueue.complete(session, task_id)
+                session.commit()
+                return
+
+            record.ai_tags, record.ai_summary, content = result
+            record.date_indexed = datetime.now(UTC)
+            TagStore.set_file_tags(session, record.id, record.ai_tags)
+            EnrichmentQueue.complete(session, task_id)
+            session.flush()
+
+            writer = self.index_service.get_writer(session=session)
+            self.index_service.add_or_update_document(writer, record, record.ai_tags, record.ai_summary, content)
+            self.index_service.commit_writer(writer)
+            session.commit()
+        except OperationalError:
+            raise
+        except Exception as e:
+            print(f"Failed to store AI enrichment for {file_path}: {e}")
+            session.rollback()
+            EnrichmentQueue.fail(session, task_id, str(e))
+            session.commit()
+            return
+
+        self.progress.emit(f"AI tags ready for {os.path.basename(file_path)}.")
+        self.file_enriched.emit(file_path)
@@ -13,12 +13,9 @@ class IndexWorker(QThread):
 
     def run(self):
         try:
-            indexer = IncrementalIndexer(self.paths)
+            indexer = IncrementalIndexer(self.paths, progress=self.progress.emit)
             self.progress.emit("Reindexing started...")
-            indexer.reindex()
-            if self.drop_removed:
-                self.progress.emit("Removing deleted files...")
-                indexer.drop_removed()
+            indexer.reindex(drop_removed=self.drop_removed)
             self.finished.emit(True, "Reindexing completed successfully.")
         except Exception as e:
             traceback.print_exc()
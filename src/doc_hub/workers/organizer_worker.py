@@ -31,7 +31,7 @@ class OrganizerWorker(QObject):
 
                     self.analysis_progress.emit(f"Analyzing: {file_name}")
 
-                    display_type, content = extract_content_from_file(file_path)
+                    display_type, content = extract_content_from_file(file_path)[:2]
 
                     ai_category = self.ai_service.get_file_category(file_name, content)
 
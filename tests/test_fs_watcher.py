@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from PySide6.QtCore import QCoreApplication
+
+from src.doc_hub.core.fs_watcher import CHANGED, CREATED, REMOVED, RecursiveWatcher
+
+
+class RecursiveWatcherBatchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.watcher = RecursiveWatcher()
+        self.batches = []
+        self.watcher.paths_changed.connect(lambda *batch: self.batches.append(batch))
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def flush(self):
+        self.watcher.flush()
+        self.assertEqual(len(self.batches), 1)
+        return self.batches[0]
+
+    def test_edit_then_rename_moves_the_catalogued_file(self):
+        self.watcher.record(self.root, self.path("a.txt"), CHANGED, False)
+        self.watcher.record_move(self.root, self.path("a.txt"), self.path("z.txt"), False)
+        changed, removed, moves = self.flush()
+        self.assertEqual(moves, [[self.path("a.txt"), self.path("z.txt")]])
+        self.assertEqual(changed, [self.path("z.txt")])
+        self.assertEqual(removed, [])
+
+    def test_create_then_rename_has_nothing_to_move(self):
+        self.watcher.record(self.root, self.path("new.txt"), CREATED, False)
+        self.watcher.record(self.root, self.path("new.txt"), CHANGED, False)
+        self.watcher.record_move(self.root, self.path("new.txt"), self.path("z.txt"), False)
+        changed, removed, moves = self.flush()
+        self.assertEqual(moves, [])
+        self.assertEqual(changed, [self.path("z.txt")])
+
+    def test_replaced_file_is_rescanned_in_place(self):
+        self.watcher.record(self.root, self.path("a.txt"), REMOVED, False)
+        self.watcher.record(self.root, self.path("a.txt"), CREATED, False)
+        self.watcher.record_move(self.root, self.path("a.txt"), self.path("z.txt"), False)
+        changed, removed, moves = self.flush()
+        self.assertEqual(moves, [[self.path("a.txt"), self.path("z.txt")]])
+        self.assertEqual(changed, [self.path("z.txt")])
+
+
+if __name__ == "__main__":
+    unittest.main()
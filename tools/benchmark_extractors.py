@@ -0,0 +1,79 @@
+import argparse
+import os
+import time
+
+from src.doc_hub.core.file_processing import _HAS_TIKA, is_dir_ignored, tika_parser
+from src.doc_hub.core.native_extractors import NATIVE_EXTRACTORS
+
+
+def collect(paths, limit):
+    files = {suffix: [] for suffix in NATIVE_EXTRACTORS}
+    for root in paths:
+        if os.path.isfile(root):
+            candidates = [root]
+        else:
+            candidates = []
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not is_dir_ignored(d)]
+                candidates.extend(os.path.join(dirpath, f) for f in filenames)
+        for path in candidates:
+            suffix = os.path.splitext(path)[1].lower()
+            if suffix in files and len(files[suffix]) < limit:
+                files[suffix].append(path)
+    return {suffix: found for suffix, found in files.items() if found}
+
+
+def run(extract, files):
+    """Returns ``(seconds, files_without_result)``."""
+    failed = 0
+    started = time.perf_counter()
+    for path in files:
+        try:
+            if extract(path) is None:
+                failed += 1
+        except Exception:
+            failed += 1
+    return max(time.perf_counter() - started, 1e-9), failed
+
+
+def tika_extract(path):
+    return tika_parser.from_file(path).get("content")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare native extractor throughput with Tika, per format.")
+    p.add_argument("paths", nargs="+", help="files or folders holding sample documents")
+    p.add_argument("--limit", type=int, default=200, help="most files per format")
+    p.add_argument("--no-tika", action="store_true", help="only time the native extractors")
+    args = p.parse_args()
+
+    use_tika = _HAS_TIKA and not args.no_tika
+    if not use_tika and not args.no_tika:
+        print("Tika is not installed; timing the native extractors only.")
+
+    samples = collect(args.paths, args.limit)
+    if not samples:
+        print("No PDF or Office files found.")
+        return
+
+    header = f"{'format':<7}{'files':>7}{'MB':>9}{'native/s':>11}{'MB/s':>9}{'fallback':>10}"
+    if use_tika:
+        header += f"{'tika/s':>9}{'speedup':>9}"
+    print(header)
+    for suffix, files in sorted(samples.items()):
+        megabytes = sum(os.path.getsize(f) for f in files) / (1024 * 1024)
+        native_time, fallbacks = run(NATIVE_EXTRACTORS[suffix], files)
+        line = (
+            f"{suffix:<7}{len(files):>7}{megabytes:>9.1f}{len(files) / native_time:>11.1f}"
+            f"{megabytes / native_time:>9.1f}{fallbacks:>10}"
+        )
+        if use_tika:
+            # The first request starts the Tika server; keep that out of the timing.
+            run(tika_extract, files[:1])
+            tika_time, _ = run(tika_extract, files)
+            line += f"{len(files) / tika_time:>9.1f}{tika_time / native_time:>8.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
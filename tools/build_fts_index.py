@@ -0,0 +1,39 @@
+import argparse
+import time
+
+from sqlalchemy import text
+
+from src.doc_hub.core.database import get_session
+from src.doc_hub.core.search_backend import FTS_DOC_TABLE, FTS_PAGE_TABLE, FTS_TABLE, Fts5Backend
+from src.doc_hub.core.search_index_service import SearchIndexService
+
+
+def main():
+    p = argparse.ArgumentParser(description="Build the SQLite FTS5 search index from the catalog.")
+    p.add_argument("--rebuild", action="store_true", help="drop existing FTS5 entries first")
+    p.add_argument("--batch-size", type=int, default=500)
+    args = p.parse_args()
+
+    service = SearchIndexService(Fts5Backend())
+    session = get_session()
+    started = time.perf_counter()
+    try:
+        if args.rebuild:
+            session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+            session.execute(text(f"DELETE FROM {FTS_PAGE_TABLE}"))
+            session.execute(text(f"DELETE FROM {FTS_DOC_TABLE}"))
+            session.commit()
+
+        done = service.rebuild_from_catalog(session, args.batch_size, progress=print)
+
+        for table in (FTS_TABLE, FTS_PAGE_TABLE):
+            session.execute(text(f"INSERT INTO {table}({table}) VALUES ('optimize')"))
+        session.commit()
+        print(f"FTS5 index ready: {done} files in {time.perf_counter() - started:.1f}s.")
+        print("Set DOC_HUB_SEARCH_ENGINE=fts5 in .env to search with it.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,69 @@
 import argparse
+import os
+from src.doc_hub.core.catalog_upgrade import upgrade_catalog
+from src.doc_hub.core.database import get_read_session
 from src.doc_hub.core.incremental_indexer import IncrementalIndexer
 from src.doc_hub.core.duplicate_detector import DuplicateDetector
+from src.doc_hub.core.extraction_cache import ExtractionCache
+from src.doc_hub.core.file_processing import EXTRACTOR_VERSIONS
+from src.doc_hub.core.hashing import ALGORITHMS, DEFAULT_ALGORITHM
+from src.doc_hub.core.image_similarity import DEFAULT_MAX_DISTANCE, SimilarImageIndex
+from src.doc_hub.core.near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("paths", nargs="+")
     p.add_argument("--drop-removed", action="store_true")
     p.add_argument("--find-duplicates", action="store_true")
+    p.add_argument("--hash", choices=ALGORITHMS, default=DEFAULT_ALGORITHM,
+                   help="digest used to compare files; blake2b is faster")
+    p.add_argument("--hash-workers", type=int, default=None)
+    p.add_argument("--near-duplicates", action="store_true",
+                   help="list catalog files under the paths with nearly identical text")
+    p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                   help="minimum estimated similarity for --near-duplicates (0-1)")
+    p.add_argument("--similar-images", action="store_true",
+                   help="list catalog images under the paths that look alike")
+    p.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE,
+                   help="largest perceptual hash difference in bits for --similar-images")
+    p.add_argument("--prune-extraction-cache", action="store_true",
+                   help="drop cached extractions made by outdated extractor versions before scanning")
     args = p.parse_args()
+    upgrade_catalog()
+    if args.prune_extraction_cache:
+        print("Pruned cached extractions:", ExtractionCache.prune(EXTRACTOR_VERSIONS))
     idx = IncrementalIndexer(args.paths)
-    idx.reindex()
-    if args.drop_removed:
-        idx.drop_removed()
+    idx.reindex(drop_removed=args.drop_removed)
     if args.find_duplicates:
-        dd = DuplicateDetector(args.paths)
+        dd = DuplicateDetector(args.paths, args.hash, args.hash_workers, progress=print)
         out_path, groups = dd.find_duplicates()
         print("Duplicate report:", out_path, "groups:", groups)
+    prefixes = tuple(os.path.join(os.path.abspath(p), "") for p in args.paths)
+    if args.near_duplicates:
+        NearDuplicateIndex.backfill(progress=print)
+        session = get_read_session()
+        try:
+            groups = NearDuplicateIndex.groups(session, args.threshold)
+        finally:
+            session.close()
+        print_groups(f"Near-duplicate groups (similarity >= {args.threshold})", groups, prefixes)
+    if args.similar_images:
+        SimilarImageIndex.backfill(progress=print)
+        session = get_read_session()
+        try:
+            groups = SimilarImageIndex().groups(session, args.max_distance)
+        finally:
+            session.close()
+        print_groups(f"Similar image groups (distance <= {args.max_distance})", groups, prefixes)
+
+def print_groups(title, groups, prefixes):
+    groups = [[path for path in g if path.startswith(prefixes)] for g in groups]
+    groups = [g for g in groups if len(g) > 1]
+    print(f"{title}: {len(groups)}")
+    for group in groups:
+        print()
+        for path in group:
+            print(" ", path)
 
 if __name__ == "__main__":
     main()